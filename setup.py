@@ -10,6 +10,8 @@ setup(
         "PyYAML>=5.4.1",
         "requests>=2.26.0",
         "TA-Lib>=0.4.24",
+        "pandas>=1.1.0",
+        "numpy>=1.19.0",
     ],
     extras_require={
         "dev": [
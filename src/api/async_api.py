@@ -0,0 +1,135 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import functools
+import logging
+import pandas as pd
+from moomoo import KLType, TrdSide
+from api.moomoo_api import MooMooAPI, SNAPSHOT_MAX_CODES, _chunked
+
+# Calls allowed in flight at once per endpoint. Orders are serialized so they
+# reach OpenD in the order they were made.
+ENDPOINT_CONCURRENCY = {
+    'quote': 4,
+    'snapshot': 4,
+    'kline': 8,
+    'market_state': 2,
+    'order': 1,
+    'account': 2,
+}
+# Limit for endpoints not listed above, e.g. the ones passed to call()
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_WORKERS = 16
+
+
+class AsyncMooMooAPI:
+    """
+    Awaitable facade over MooMooAPI.
+
+    The blocking SDK calls run on a dedicated thread pool and each endpoint has
+    its own semaphore, so a watchlist can be fetched concurrently without one
+    kind of request starving the pool or flooding OpenD.
+    """
+
+    def __init__(self,
+                 api: MooMooAPI,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 concurrency: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            api (MooMooAPI): The synchronous API whose calls are wrapped
+            max_workers (int): Threads available to blocking calls
+            concurrency (Optional[Dict[str, int]]): Per-endpoint overrides for ENDPOINT_CONCURRENCY
+        """
+        self.api = api
+        self.logger = logging.getLogger('AsyncMooMooAPI')
+        self.limits = dict(ENDPOINT_CONCURRENCY, **(concurrency or {}))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='AsyncMooMooAPI')
+        # Semaphores belong to the loop they were created on
+        self._semaphores: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = {}
+
+    async def __aenter__(self) -> 'AsyncMooMooAPI':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self, wait: bool = True):
+        """Shut down the thread pool; the wrapped MooMooAPI stays open"""
+        self._executor.shutdown(wait=wait)
+
+    def _semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        entry = self._semaphores.get(endpoint)
+        if entry is None or entry[0] is not loop:
+            entry = (loop, asyncio.Semaphore(self.limits.get(endpoint, DEFAULT_CONCURRENCY)))
+            self._semaphores[endpoint] = entry
+        return entry[1]
+
+    async def call(self, endpoint: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking call on the thread pool within the concurrency limit of `endpoint`.
+
+        Args:
+            endpoint (str): Key into the concurrency limits
+            func (Callable): Blocking function to run
+        """
+        async with self._semaphore(endpoint):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def get_stock_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Awaitable MooMooAPI.get_stock_quote"""
+        return await self.call('quote', self.api.get_stock_quote, symbol)
+
+    async def get_stock_quotes(self, symbols: List[str]) -> Optional[pd.DataFrame]:
+        """
+        Awaitable MooMooAPI.get_stock_quotes. Lists longer than one snapshot
+        request are split and fetched concurrently.
+        """
+        codes = list(dict.fromkeys(symbols))
+        chunks = list(_chunked(codes, SNAPSHOT_MAX_CODES))
+        if len(chunks) <= 1:
+            return await self.call('quote', self.api.get_stock_quotes, codes)
+        frames = await asyncio.gather(*(self.call('quote', self.api.get_stock_quotes, chunk) for chunk in chunks))
+        frames = [frame for frame in frames if frame is not None]
+        return pd.concat(frames) if frames else None
+
+    async def get_market_snapshot(self, codes: List[str]) -> Optional[pd.DataFrame]:
+        """
+        Get raw market snapshots for `codes`, one request per SNAPSHOT_MAX_CODES
+        codes, run concurrently.
+        """
+        chunks = _chunked(list(dict.fromkeys(codes)), SNAPSHOT_MAX_CODES)
+        frames = await asyncio.gather(*(self.call('snapshot', self.api.get_market_snapshot, chunk) for chunk in chunks))
+        frames = [frame for frame in frames if frame is not None]
+        if not frames:
+            return None
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    async def get_historical_k_lines(self, symbol: str, num: int, ktype: str = KLType.K_DAY) -> Optional[pd.DataFrame]:
+        """Awaitable MooMooAPI.get_historical_k_lines"""
+        return await self.call('kline', self.api.get_historical_k_lines, symbol, num, ktype)
+
+    async def get_historical_k_lines_many(self, symbols: List[str], num: int,
+                                          ktype: str = KLType.K_DAY) -> Dict[str, Optional[pd.DataFrame]]:
+        """Fetch the latest `num` bars of several symbols concurrently"""
+        symbols = list(dict.fromkeys(symbols))
+        frames = await asyncio.gather(*(self.get_historical_k_lines(symbol, num, ktype) for symbol in symbols))
+        return dict(zip(symbols, frames))
+
+    async def get_market_state(self, codes: list) -> Optional[Dict[str, Any]]:
+        """Awaitable MooMooAPI.get_market_state"""
+        return await self.call('market_state', self.api.get_market_state, codes)
+
+    async def place_order(self, code: str, price: float, qty: int, trd_side: TrdSide) -> Optional[Dict[str, Any]]:
+        """Awaitable MooMooAPI.place_order"""
+        return await self.call('order', self.api.place_order, code, price, qty, trd_side)
+
+    async def cancel_order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Awaitable MooMooAPI.cancel_order"""
+        return await self.call('order', self.api.cancel_order, order_id)
+
+    async def query_account_info(self, *args, **kwargs) -> Optional[List[Any]]:
+        """Awaitable MooMooAPI.query_account_info"""
+        return await self.call('account', self.api.query_account_info, *args, **kwargs)
@@ -0,0 +1,228 @@
+from moomoo import ContextStatus, OpenQuoteContext, OpenSecTradeContext, SecurityFirm, TrdMarket
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import atexit
+import logging
+import threading
+import time
+
+# Seconds before a context that failed to open is tried again, doubled after
+# every further failure up to MAX_RECONNECT_BACKOFF
+RECONNECT_BACKOFF = 1.0
+MAX_RECONNECT_BACKOFF = 60.0
+
+
+class PooledContext:
+    """
+    Stands in for one shared quote or trade context, opening it on first use.
+
+    Attribute access is forwarded to the open context, so it can be passed
+    wherever an OpenQuoteContext or OpenSecTradeContext is expected. Push
+    handlers set through it are remembered and set again on a reopened
+    context. OpenD disconnects are handled by the SDK, which reconnects the
+    same context; a context that was closed, or failed to open, is opened
+    again on the next use, backing off exponentially after failures.
+    """
+
+    def __init__(self, name: str, opener: Callable[[], Any],
+                 backoff: float = RECONNECT_BACKOFF,
+                 max_backoff: float = MAX_RECONNECT_BACKOFF,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            name (str): Name used in log messages and errors
+            opener (Callable[[], Any]): Opens a new context
+            backoff (float): Seconds to wait after the first failed open
+            max_backoff (float): Upper bound of the doubling wait
+            clock (Callable[[], float]): Time source, injectable for tests
+        """
+        self.name = name
+        self.logger = logging.getLogger('ContextPool')
+        self._opener = opener
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._context: Any = None
+        self._handlers: List[Any] = []
+        self._failures = 0
+        self._retry_at = 0.0
+        self._shared: Dict[str, Any] = {}
+        self._closed = False
+
+    @property
+    def is_open(self) -> bool:
+        """Whether the context has been opened and not closed"""
+        context = self._context
+        return context is not None and getattr(context, 'status', None) != ContextStatus.CLOSED
+
+    @property
+    def context(self) -> Any:
+        """The open context, opened now if needed"""
+        context = self._context
+        if context is not None and getattr(context, 'status', None) != ContextStatus.CLOSED:
+            return context
+        return self._open()
+
+    def _open(self) -> Any:
+        with self._lock:
+            if self._closed:
+                raise ConnectionError(f"{self.name} context pool is closed")
+            context = self._context
+            if context is not None and getattr(context, 'status', None) != ContextStatus.CLOSED:
+                return context
+            now = self._clock()
+            if now < self._retry_at:
+                raise ConnectionError(
+                    f"{self.name} context unavailable, retrying in {self._retry_at - now:.1f}s")
+            try:
+                context = self._opener()
+                for handler in self._handlers:
+                    context.set_handler(handler)
+            except Exception as e:
+                self._failures += 1
+                delay = min(self._max_backoff, self._backoff * 2 ** (self._failures - 1))
+                self._retry_at = now + delay
+                self.logger.error("Failed to open %s context (attempt %d), retrying in %.1fs: %s",
+                                  self.name, self._failures, delay, e)
+                raise ConnectionError(f"Failed to open {self.name} context: {e}") from e
+            if self._context is not None:
+                self.logger.info("Reopened %s context", self.name)
+            else:
+                self.logger.info("Opened %s context", self.name)
+            self._context = context
+            self._failures = 0
+            self._retry_at = 0.0
+            return context
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes PooledContext lacks; never open for private ones
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.context, name)
+
+    def set_handler(self, handler: Any):
+        """Set a push handler now if the context is open, and on every (re)open"""
+        with self._lock:
+            self._handlers.append(handler)
+            context = self._context
+        if context is not None:
+            context.set_handler(handler)
+
+    def shared(self, name: str, factory: Callable[['PooledContext'], Any]) -> Any:
+        """
+        The object registered as `name` on this context, created by factory(self)
+        on first use. Used for what must exist once per context, such as the
+        owners of its push handlers, which the SDK keeps one of per push type.
+        """
+        with self._lock:
+            if name not in self._shared:
+                self._shared[name] = factory(self)
+            return self._shared[name]
+
+    def close(self):
+        """Close the context and its shared objects; it cannot be reopened"""
+        with self._lock:
+            shared = list(self._shared.values())
+            self._shared.clear()
+        # Shared objects may still release subscriptions through the context
+        for obj in shared:
+            close = getattr(obj, 'close', None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    self.logger.error("Error closing %s of %s context: %s", type(obj).__name__, self.name, e)
+        with self._lock:
+            self._closed = True
+            context, self._context = self._context, None
+        if context is not None:
+            context.close()
+
+
+class ContextPool:
+    """
+    Process-wide quote and trade contexts, one per OpenD connection setting,
+    shared by every MooMooAPI and feature and opened only when first used.
+
+    Closing the pool, or leaving its with block, closes every context.
+    """
+
+    def __init__(self,
+                 quote_opener: Optional[Callable[..., Any]] = None,
+                 trade_opener: Optional[Callable[..., Any]] = None,
+                 backoff: float = RECONNECT_BACKOFF,
+                 max_backoff: float = MAX_RECONNECT_BACKOFF,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            quote_opener (Optional[Callable[..., Any]]): Called with the quote
+                settings to open a quote context, OpenQuoteContext if None
+            trade_opener (Optional[Callable[..., Any]]): Called with the trade
+                settings to open a trade context, OpenSecTradeContext if None
+            backoff (float): Seconds to wait after a context first fails to open
+            max_backoff (float): Upper bound of the doubling wait
+            clock (Callable[[], float]): Time source, injectable for tests
+        """
+        self._quote_opener = quote_opener or OpenQuoteContext
+        self._trade_opener = trade_opener or OpenSecTradeContext
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._contexts: Dict[Hashable, PooledContext] = {}
+
+    def _get(self, key: Tuple, name: str, opener: Callable[[], Any]) -> PooledContext:
+        with self._lock:
+            pooled = self._contexts.get(key)
+            if pooled is None:
+                pooled = PooledContext(name, opener, self._backoff, self._max_backoff, self._clock)
+                self._contexts[key] = pooled
+            return pooled
+
+    def quote(self, host: str = '127.0.0.1', port: int = 11111, is_encrypt: bool = False) -> PooledContext:
+        """The shared quote context of an OpenD address"""
+        return self._get(('quote', host, port, is_encrypt), f'quote {host}:{port}',
+                         lambda: self._quote_opener(host=host, port=port, is_encrypt=is_encrypt))
+
+    def trade(self, host: str = '127.0.0.1', port: int = 11111,
+              trd_market: str = TrdMarket.US, security_firm: str = SecurityFirm.FUTUSG) -> PooledContext:
+        """The shared trade context of an OpenD address, market and broker"""
+        return self._get(('trade', host, port, trd_market, security_firm), f'trade {host}:{port} {trd_market}',
+                         lambda: self._trade_opener(filter_trdmarket=trd_market, security_firm=security_firm,
+                                                    host=host, port=port))
+
+    def stats(self) -> Dict[str, bool]:
+        """Whether each pooled context is currently open, by name"""
+        with self._lock:
+            return {pooled.name: pooled.is_open for pooled in self._contexts.values()}
+
+    def close(self):
+        """Close every context; later requests for a context get a new one"""
+        with self._lock:
+            contexts = list(self._contexts.values())
+            self._contexts.clear()
+        for pooled in contexts:
+            try:
+                pooled.close()
+            except Exception as e:
+                pooled.logger.error("Error closing %s context: %s", pooled.name, e)
+
+    def __enter__(self) -> 'ContextPool':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+_shared_pool: Optional[ContextPool] = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool() -> ContextPool:
+    """The process-wide pool, closed at interpreter exit"""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = ContextPool()
+            atexit.register(_shared_pool.close)
+        return _shared_pool
@@ -0,0 +1,148 @@
+from moomoo import KLType, RET_OK
+from models.quote import BAR_DTYPE, bars_to_frame, frame_to_bars
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import functools
+import logging
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+# Calendar days fetched the first time a symbol is synced
+INITIAL_SYNC_DAYS = 3 * 365
+# Seconds before a symbol is synced with OpenD again
+SYNC_INTERVAL = 60
+HISTORY_PAGE_SIZE = 1000
+
+DEFAULT_KLINE_DIR = Path(__file__).parent.parent.parent / 'data' / 'klines'
+
+
+class KLineStore:
+    """
+    Append-only on-disk bar store, one binary file of BAR_DTYPE records per
+    symbol and K-line type.
+
+    Reads are memory-mapped, so scanning years of bars costs no copy and no
+    network I/O. sync() only asks OpenD for the bars after the last stored one;
+    the last stored bar is rewritten in place if it was still forming.
+    """
+
+    def __init__(self, quote_ctx, root: Optional[Path] = None, sync_interval: float = SYNC_INTERVAL,
+                 scheduler=None):
+        """
+        Args:
+            quote_ctx: An OpenQuoteContext (or compatible) used for request_history_kline
+            root (Optional[Path]): Directory for the bar files, DEFAULT_KLINE_DIR if None
+            sync_interval (float): Seconds during which a synced symbol is served from disk
+            scheduler: Optional RequestScheduler pacing request_history_kline
+        """
+        self.quote_ctx = quote_ctx
+        self.root = Path(root) if root is not None else DEFAULT_KLINE_DIR
+        self.sync_interval = sync_interval
+        self.scheduler = scheduler
+        self.logger = logging.getLogger('KLineStore')
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._synced_at: Dict[Tuple[str, str], float] = {}
+
+    def path(self, symbol: str, ktype: str = KLType.K_DAY) -> Path:
+        return self.root / ktype / f"{symbol}.bin"
+
+    def _lock(self, symbol: str, ktype: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault((symbol, ktype), threading.Lock())
+
+    def read(self, symbol: str, ktype: str = KLType.K_DAY) -> np.ndarray:
+        """
+        Return every stored bar as a read-only memory-mapped record array,
+        oldest first. A trailing partial record from an interrupted write is ignored.
+        """
+        path = self.path(symbol, ktype)
+        if not path.exists():
+            return np.empty(0, dtype=BAR_DTYPE)
+        count = path.stat().st_size // BAR_DTYPE.itemsize
+        if count == 0:
+            return np.empty(0, dtype=BAR_DTYPE)
+        return np.memmap(path, dtype=BAR_DTYPE, mode='r', shape=(count,))
+
+    def append(self, symbol: str, bars: np.ndarray, ktype: str = KLType.K_DAY) -> int:
+        """
+        Store bars newer than the last stored one. A bar with the same time as
+        the last stored bar replaces it. Returns the number of bars written.
+        """
+        if len(bars) == 0:
+            return 0
+        path = self.path(symbol, ktype)
+        with self._lock(symbol, ktype):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            stored = self.read(symbol, ktype)
+            written = 0
+            if len(stored):
+                last_time = stored['time'][-1]
+                same = bars[bars['time'] == last_time]
+                if len(same):
+                    with open(path, 'r+b') as f:
+                        f.seek((len(stored) - 1) * BAR_DTYPE.itemsize)
+                        f.write(same[-1:].tobytes())
+                    written += 1
+                bars = bars[bars['time'] > last_time]
+                # Drop a torn record so new bars stay aligned
+                if path.stat().st_size != len(stored) * BAR_DTYPE.itemsize:
+                    with open(path, 'r+b') as f:
+                        f.truncate(len(stored) * BAR_DTYPE.itemsize)
+            if len(bars):
+                with open(path, 'ab') as f:
+                    f.write(np.ascontiguousarray(bars, dtype=BAR_DTYPE).tobytes())
+                written += len(bars)
+            return written
+
+    def sync(self, symbol: str, ktype: str = KLType.K_DAY) -> Optional[int]:
+        """
+        Fetch the bars after the last stored one from OpenD, paging through
+        request_history_kline. Returns the number of bars written, None on error.
+        """
+        stored = self.read(symbol, ktype)
+        end = date.today()
+        if len(stored):
+            start = pd.to_datetime(int(stored['time'][-1]), unit='s').date()
+        else:
+            start = end - timedelta(days=INITIAL_SYNC_DAYS)
+
+        written = 0
+        page_req_key = None
+        while True:
+            request = self.quote_ctx.request_history_kline
+            if self.scheduler is not None:
+                request = functools.partial(self.scheduler.run, 'request_history_kline', request)
+            ret, data, page_req_key = request(
+                symbol,
+                start=start.strftime('%Y-%m-%d'),
+                end=end.strftime('%Y-%m-%d'),
+                ktype=ktype,
+                max_count=HISTORY_PAGE_SIZE,
+                page_req_key=page_req_key
+            )
+            if ret != RET_OK:
+                self.logger.error(f"Failed to sync K-lines for {symbol}: {data}")
+                return None
+            if not data.empty:
+                written += self.append(symbol, frame_to_bars(data), ktype)
+            if page_req_key is None:
+                break
+        self._synced_at[(symbol, ktype)] = time.monotonic()
+        self.logger.debug(f"Synced {written} {ktype} bars for {symbol}")
+        return written
+
+    def tail(self, symbol: str, num: int, ktype: str = KLType.K_DAY) -> np.ndarray:
+        """
+        Return the latest `num` bars, syncing first if the symbol was not synced
+        within `sync_interval` seconds. The result is a view on the mapped file.
+        """
+        if num <= 0:
+            return np.empty(0, dtype=BAR_DTYPE)
+        synced_at = self._synced_at.get((symbol, ktype))
+        if synced_at is None or time.monotonic() - synced_at >= self.sync_interval:
+            self.sync(symbol, ktype)
+        return self.read(symbol, ktype)[-num:]
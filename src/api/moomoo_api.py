@@ -1,8 +1,54 @@
 from moomoo import *  # MooMoo is the correct package name according to docs
-from typing import Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any, List
 import logging
 from pathlib import Path
 import time  # Added for subscription handling
+import pandas as pd
+from api.cache import TTLCache
+from api.subscription import SubscriptionManager
+from api.kline_store import KLineStore
+from models.quote import BarSeries, QuoteBatch, bars_to_frame
+from api.scheduler import RequestScheduler
+from api.order_tracker import OrderTracker
+from api.singleflight import SingleFlight
+from api.connection_pool import ContextPool, shared_pool
+from utils.metrics import Metrics, shared_metrics
+
+# OpenD accepts at most this many codes per get_market_snapshot request
+SNAPSHOT_MAX_CODES = 400
+
+# Seconds each cached endpoint stays fresh. Basic info only changes on listings
+# and delistings; market state changes at session boundaries, so callers should
+# also invalidate it explicitly when they see a session change.
+CACHE_TTLS = {
+    'stock_basicinfo': 6 * 60 * 60,
+    'market_state': 5 * 60,
+}
+CACHE_MAXSIZE = 50000
+
+# Seconds a code missing from basic info stays cached as unknown. Kept short so
+# a transient gap or a new listing does not hide the code for hours.
+NEGATIVE_CACHE_TTL = 60
+
+# Code prefix to the market get_stock_basicinfo expects
+CODE_MARKETS = {
+    'HK': Market.HK,
+    'US': Market.US,
+    'SH': Market.SH,
+    'SZ': Market.SZ,
+    'SG': Market.SG,
+    'JP': Market.JP,
+    'AU': Market.AU,
+    'MY': Market.MY,
+    'CA': Market.CA,
+}
+
+
+def _chunked(items: List[str], size: int):
+    """Yield successive slices of at most `size` items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 
 class MooMooAPI:
     """
@@ -14,7 +60,15 @@ class MooMooAPI:
                  host: str = '127.0.0.1', 
                  port: int = 11111, 
                  is_encrypt: bool = False,
-                 api_key: Optional[str] = None):
+                 api_key: Optional[str] = None,
+                 cache_ttls: Optional[Dict[str, float]] = None,
+                 kline_dir: Optional[str] = None,
+                 rate_limits: Optional[Dict[str, tuple]] = None,
+                 quote_ctx=None,
+                 trade_ctx=None,
+                 news_source: Optional[Callable[[str], List[Dict[str, Any]]]] = None,
+                 metrics: Optional[Metrics] = None,
+                 pool: Optional[ContextPool] = None):
         """
         Initialize MooMoo API connections.
         
@@ -23,78 +77,281 @@ class MooMooAPI:
             port (int): OpenD listening port
             is_encrypt (bool): Whether to enable encryption
             api_key (Optional[str]): API key for authentication
+            cache_ttls (Optional[Dict[str, float]]): Per-endpoint overrides for CACHE_TTLS
+            kline_dir (Optional[str]): Directory of the local K-line store, data/klines if None
+            rate_limits (Optional[Dict[str, tuple]]): Per-endpoint (requests, seconds) overrides
+                for the scheduler's RATE_LIMITS
+            quote_ctx: Quote context to use instead of connecting to OpenD, e.g. a SimulatedQuoteContext
+            trade_ctx: Trade context to use instead of connecting to OpenD, e.g. a SimulatedTradeContext
+            news_source (Optional[Callable[[str], List[Dict[str, Any]]]]): Returns the news
+                articles of a code; OpenD has no news endpoint, so there is no news if None
+            metrics (Optional[Metrics]): Records latency, errors and throttling of every
+                OpenD request, the process-wide shared_metrics() if None
+            pool (Optional[ContextPool]): Pool providing the contexts not passed in,
+                the process-wide shared_pool() if None. Pooled contexts are opened on
+                first use and shared with every other MooMooAPI on the same pool.
         """
         # Initialize logger first
         self.logger = logging.getLogger('MooMooAPI')
+
+        ttls = dict(CACHE_TTLS, **(cache_ttls or {}))
+        self.cache = {
+            endpoint: TTLCache(maxsize=CACHE_MAXSIZE, ttl=ttl)
+            for endpoint, ttl in ttls.items()
+        }
+
+        # Every OpenD request is paced, and measured, by the scheduler
+        self.metrics = metrics or shared_metrics()
+        self.scheduler = RequestScheduler(rate_limits, metrics=self.metrics)
+        # Identical reads issued at the same time by different features share one request
+        self.inflight = SingleFlight()
+        self.news_source = news_source
         
+        pool = pool or shared_pool()
+        # Contexts passed in belong to this instance; pooled ones, and the push
+        # handler owners bound to them, are shared and outlive it
+        self._owns_quote_ctx = quote_ctx is not None
+        self._owns_trade_ctx = trade_ctx is not None
+
         try:
-            # Initialize quote context for market data
-            self.quote_ctx = OpenQuoteContext(
-                host=host,
-                port=port,
-                is_encrypt=is_encrypt
-            )
-            
-            # Initialize trade context with additional parameters
-            self.trade_ctx = OpenSecTradeContext(
-                filter_trdmarket=TrdMarket.US,
-                security_firm=SecurityFirm.FUTUSG,
-                host=host,
-                port=port
-            )
-            
+            # Market data; a pooled context only connects on its first request
+            if self._owns_quote_ctx:
+                self.quote_ctx = quote_ctx
+                self.subscriptions = SubscriptionManager(self.quote_ctx)
+            else:
+                self.quote_ctx = pool.quote(host=host, port=port, is_encrypt=is_encrypt)
+                # The SDK keeps one push handler per type, so pushes need one manager per context
+                self.subscriptions = self.quote_ctx.shared('subscriptions', SubscriptionManager)
+
+            # Local bar store; history is only downloaded once per symbol
+            self.klines = KLineStore(self.quote_ctx, kline_dir, scheduler=self.scheduler)
+
+            # Trading; analysis-only use never opens the pooled trade context
+            if self._owns_trade_ctx:
+                self.trade_ctx = trade_ctx
+                self.orders = OrderTracker(self.trade_ctx)
+            else:
+                self.trade_ctx = pool.trade(host=host, port=port,
+                                            trd_market=TrdMarket.US, security_firm=SecurityFirm.FUTUSG)
+                # Open orders kept current from order and fill pushes
+                self.orders = self.trade_ctx.shared('orders', OrderTracker)
+
             self.logger.info("Successfully initialized MooMoo API connections")
-            
+
         except Exception as e:
-            self.logger.error(f"Failed to initialize MooMoo API connections: {str(e)}")
+            self.logger.error("Failed to initialize MooMoo API connections: %s", e)
             self.cleanup()
             raise
 
     def cleanup(self):
-        """Clean up method to properly close connections"""
+        """Close the contexts passed in and their subscriptions; pooled contexts are left to the pool"""
         try:
-            if hasattr(self, 'quote_ctx'):
+            if self._owns_quote_ctx:
+                if hasattr(self, 'subscriptions'):
+                    self.subscriptions.close()
                 self.quote_ctx.close()
-            if hasattr(self, 'trade_ctx'):
+                self._owns_quote_ctx = False
+            if self._owns_trade_ctx:
                 self.trade_ctx.close()
+                self._owns_trade_ctx = False
         except Exception as e:
-            self.logger.error(f"Error in cleanup: {str(e)}")
+            self.logger.error("Error in cleanup: %s", e)
 
-    def __del__(self):
-        """Destructor to ensure connections are closed"""
+    def __enter__(self) -> 'MooMooAPI':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
         self.cleanup()
 
+    def __del__(self):
+        """Fallback for instances that were neither used in a with block nor cleaned up"""
+        if hasattr(self, '_owns_trade_ctx'):
+            self.cleanup()
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Return hit/miss counters for every cached endpoint"""
+        return {endpoint: cache.stats() for endpoint, cache in self.cache.items()}
+
+    def invalidate_cache(self, endpoint: Optional[str] = None, codes: Optional[List[str]] = None):
+        """
+        Drop cached metadata, e.g. after a market-session change.
+
+        Args:
+            endpoint (Optional[str]): Cache to clear ('market_state', 'stock_basicinfo'), all if None
+            codes (Optional[List[str]]): Only drop these codes, all if None
+        """
+        caches = self.cache.values() if endpoint is None else [self.cache[endpoint]]
+        for cache in caches:
+            cache.invalidate(codes)
+
     def get_stock_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
         """Get real-time quote for a stock"""
+        with self.metrics.span('get_stock_quote') as span:
+            quotes = self.get_stock_quotes([symbol])
+            if quotes is None or symbol not in quotes.index:
+                span.failed = True
+                return None
+            snapshot_data = quotes.loc[symbol].to_dict()
+            snapshot_data['code'] = symbol
+            return snapshot_data
+
+    def get_stock_quotes(self, symbols: List[str]) -> Optional[pd.DataFrame]:
+        """
+        Get real-time quotes for many stocks using batched OpenD requests.
+
+        Market state, basic info and snapshots are each fetched in chunks of at
+        most SNAPSHOT_MAX_CODES codes, so a watchlist costs a handful of round
+        trips instead of three per symbol.
+
+        Args:
+            symbols (List[str]): Stock codes, e.g. ['US.AAPL', 'HK.00700']
+
+        Callers asking for the same codes at the same time share one fetch and
+        the same frame, which must therefore not be modified.
+
+        Returns:
+            Optional[pd.DataFrame]: Snapshot columns plus 'market_state', indexed
+            by code. Codes unknown to OpenD are left out. None if nothing could
+            be fetched.
+        """
+        codes = list(dict.fromkeys(symbols))
+        if not codes:
+            return None
+        return self.inflight.do(('quotes', tuple(codes)), self._fetch_quotes, codes)
+
+    def _fetch_quotes(self, codes: List[str]) -> Optional[pd.DataFrame]:
         try:
-            # Get market state first
-            ret_state, data_state = self.quote_ctx.get_market_state([symbol])
-            if ret_state == RET_OK:
-                market_state = data_state.loc[0, 'market_state']
-                self.logger.info(f"Market state for {symbol}: {market_state}")
-
-            # Get basic stock info
-            ret_info, data_info = self.quote_ctx.get_stock_basicinfo(
-                Market.HK if symbol.startswith('HK.') else Market.US,
-                SecurityType.STOCK,
-                symbol
-            )
-            if ret_info != RET_OK:
-                self.logger.error(f"Failed to get stock info: {data_info}")
+            # Get market state for all codes first, only asking OpenD for stale ones
+            state_cache = self.cache['market_state']
+            market_states, missing = state_cache.get_many(codes)
+            for chunk in _chunked(missing, SNAPSHOT_MAX_CODES):
+                ret_state, data_state = self.scheduler.run(
+                    'get_market_state', self.quote_ctx.get_market_state, chunk)
+                if ret_state == RET_OK:
+                    fetched = dict(zip(data_state['code'], data_state['market_state']))
+                    state_cache.set_many(fetched)
+                    market_states.update(fetched)
+                else:
+                    self.logger.error("Failed to get market state: %s", data_state)
+
+            # Validate codes with basic stock info, grouped by market. Unknown
+            # codes are cached too so they are not looked up on every call.
+            info_cache = self.cache['stock_basicinfo']
+            known, missing = info_cache.get_many(codes)
+            by_market: Dict[str, List[str]] = {}
+            for code in missing:
+                market = CODE_MARKETS.get(code.split('.', 1)[0], Market.US)
+                by_market.setdefault(market, []).append(code)
+
+            for market, market_codes in by_market.items():
+                for chunk in _chunked(market_codes, SNAPSHOT_MAX_CODES):
+                    ret_info, data_info = self.scheduler.run(
+                        'get_stock_basicinfo',
+                        self.quote_ctx.get_stock_basicinfo,
+                        market,
+                        SecurityType.STOCK,
+                        chunk
+                    )
+                    if ret_info != RET_OK:
+                        self.logger.error("Failed to get stock info: %s", data_info)
+                        continue
+                    listed = set(data_info['code'])
+                    fetched = {code: code in listed for code in chunk}
+                    info_cache.set_many({code: True for code in chunk if fetched[code]})
+                    info_cache.set_many({code: False for code in chunk if not fetched[code]},
+                                        ttl=NEGATIVE_CACHE_TTL)
+                    known.update(fetched)
+
+            valid_codes = [code for code in codes if known.get(code)]
+            if not valid_codes:
                 return None
 
-            # Get snapshot directly without subscription
-            ret_snap, data_snap = self.quote_ctx.get_market_snapshot([symbol])
+            # Get snapshots directly without subscription
+            quotes = self.get_market_snapshot(valid_codes)
+            if quotes is None:
+                return None
+            quotes = quotes.set_index('code')
+            quotes['market_state'] = quotes.index.map(market_states)
+            self.logger.debug("Got snapshots for %d of %d codes", len(quotes), len(codes))
+            return quotes
+
+        except Exception as e:
+            self.logger.error("Error getting quotes: %s", e)
+            return None
+
+    def get_quote_batch(self, symbols: List[str]) -> Optional[QuoteBatch]:
+        """
+        Get real-time quotes as a QuoteBatch: one structured array instead of
+        a frame, for screening or storing many quotes without per-row objects.
+        """
+        quotes = self.get_stock_quotes(symbols)
+        if quotes is None:
+            return None
+        return QuoteBatch.from_frame(quotes)
+
+    def get_market_snapshot(self, codes: List[str], priority: Optional[int] = None) -> Optional[pd.DataFrame]:
+        """
+        Get raw market snapshots, one paced request per SNAPSHOT_MAX_CODES codes.
+
+        Args:
+            codes (List[str]): Stock codes
+            priority (Optional[int]): Scheduler priority, Priority.QUOTE if None
+
+        Returns:
+            Optional[pd.DataFrame]: One row per code OpenD returned, None if every request failed
+        """
+        frames = []
+        for chunk in _chunked(codes, SNAPSHOT_MAX_CODES):
+            ret_snap, data_snap = self.scheduler.run(
+                'get_market_snapshot', self.quote_ctx.get_market_snapshot, chunk, priority=priority)
             if ret_snap == RET_OK and not data_snap.empty:
-                snapshot_data = data_snap.iloc[0].to_dict()
-                self.logger.debug(f"Got snapshot for {symbol}: {snapshot_data}")
-                return snapshot_data
-            
-            self.logger.error(f"Failed to get snapshot data: {data_snap}")
+                frames.append(data_snap)
+            else:
+                self.logger.error("Failed to get snapshot data: %s", data_snap)
+        if not frames:
             return None
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+    def get_market_stock_list(self, markets: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Get the listed stock universe of whole markets with snapshot fields,
+        one row per stock, for columnar screening.
+
+        Args:
+            markets (Optional[List[str]]): Markets to list, US and HK if None
+
+        Returns:
+            Optional[pd.DataFrame]: Snapshot columns plus 'symbol' (the code) and
+            'name'. None if nothing could be fetched.
+        """
+        markets = [Market.US, Market.HK] if markets is None else markets
+        try:
+            listings = []
+            for market in markets:
+                ret_info, data_info = self.scheduler.run(
+                    'get_stock_basicinfo', self.quote_ctx.get_stock_basicinfo, market, SecurityType.STOCK)
+                if ret_info == RET_OK:
+                    listings.append(data_info[['code', 'name']])
+                else:
+                    self.logger.error("Failed to list %s stocks: %s", market, data_info)
+            if not listings:
+                return None
+
+            universe = pd.concat(listings, ignore_index=True)
+            # Listed codes are known to exist; spare get_stock_quotes the lookup
+            self.cache['stock_basicinfo'].set_many({code: True for code in universe['code']})
+
+            snapshots = self.get_market_snapshot(universe['code'].tolist())
+            if snapshots is None:
+                return None
+            snapshots = snapshots.drop(columns=['name'], errors='ignore')
+            stocks = universe.merge(snapshots, on='code', how='inner')
+            stocks.insert(0, 'symbol', stocks['code'])
+            self.logger.debug("Listed %d stocks in %d markets", len(stocks), len(markets))
+            return stocks
 
         except Exception as e:
-            self.logger.error(f"Error getting quote: {str(e)}")
+            self.logger.error("Error listing market stocks: %s", e)
             return None
 
     def place_order(self, 
@@ -103,35 +360,121 @@ class MooMooAPI:
                    qty: int,
                    trd_side: TrdSide) -> Optional[Dict[str, Any]]:
         """Place a trading order"""
+        with self.metrics.span('place_order') as span:
+            try:
+                ret, data = self.scheduler.run(
+                    'place_order',
+                    self.trade_ctx.place_order,
+                    price=price,
+                    qty=qty,
+                    code=code,
+                    trd_side=trd_side,
+                    order_type=OrderType.NORMAL,
+                    trd_env=TrdEnv.SIMULATE
+                )
+
+                if ret == RET_OK:
+                    self.logger.debug("Order placed: %s", data)
+                    order = data.iloc[0].to_dict()
+                    self.orders.track(order)
+                    return order
+                self.logger.error("Failed to place order: %s", data)
+            except Exception as e:
+                self.logger.error("Error placing order: %s", e)
+            span.failed = True
+            return None
+
+    def cancel_order(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel an open order; scheduled ahead of all quote traffic"""
         try:
-            ret, data = self.trade_ctx.place_order(
-                price=price,
-                qty=qty,
-                code=code,
-                trd_side=trd_side,
-                order_type=OrderType.NORMAL,
+            ret, data = self.scheduler.run(
+                'modify_order',
+                self.trade_ctx.modify_order,
+                ModifyOrderOp.CANCEL,
+                order_id,
+                0,
+                0,
                 trd_env=TrdEnv.SIMULATE
             )
-            
+
             if ret == RET_OK:
-                self.logger.debug(f"Order placed: {data}")
-                return data
-            self.logger.error(f"Failed to place order: {data}")
+                self.logger.debug("Order cancelled: %s", data)
+                return data.iloc[0].to_dict()
+            self.logger.error("Failed to cancel order %s: %s", order_id, data)
             return None
         except Exception as e:
-            self.logger.error(f"Error placing order: {str(e)}")
+            self.logger.error("Error cancelling order: %s", e)
+            return None
+
+    def get_company_news(self, symbol: str) -> List[Dict[str, Any]]:
+        """
+        Get recent news articles for a stock from the configured news source.
+
+        Returns:
+            List[Dict[str, Any]]: Articles with at least a 'title', empty if there is
+            no news source or it failed
+        """
+        if self.news_source is None:
+            return []
+        try:
+            return list(self.inflight.do(('news', symbol), self.news_source, symbol) or [])
+        except Exception as e:
+            self.logger.error("Error getting news for %s: %s", symbol, e)
+            return []
+
+    def get_historical_k_lines(self,
+                               symbol: str,
+                               num: int,
+                               ktype: KLType = KLType.K_DAY) -> Optional[pd.DataFrame]:
+        """
+        Get the latest `num` K-line bars for a stock, oldest first.
+
+        Bars come from the local K-line store, which only fetches the bars it
+        is missing from OpenD. Use self.klines.read() for zero-copy arrays.
+
+        Args:
+            symbol (str): Stock code
+            num (int): Number of bars to return
+            ktype (KLType): Bar period
+
+        Returns:
+            Optional[pd.DataFrame]: Columns time_key, open, high, low, close, volume, turnover
+        """
+        try:
+            bars = self.inflight.do(('kline', symbol, num, ktype), self.klines.tail, symbol, num, ktype)
+            if len(bars) == 0:
+                self.logger.error("No K-lines available for %s", symbol)
+                return None
+            return bars_to_frame(bars)
+        except Exception as e:
+            self.logger.error("Error getting K-lines: %s", e)
+            return None
+
+    def get_bar_series(self, symbol: str, num: int, ktype: KLType = KLType.K_DAY) -> Optional[BarSeries]:
+        """
+        Get the latest `num` bars as a BarSeries viewing the K-line store's
+        memory-mapped file, without building a frame.
+        """
+        try:
+            bars = self.inflight.do(('kline', symbol, num, ktype), self.klines.tail, symbol, num, ktype)
+            if len(bars) == 0:
+                self.logger.error("No K-lines available for %s", symbol)
+                return None
+            return BarSeries(bars)
+        except Exception as e:
+            self.logger.error("Error getting K-lines: %s", e)
             return None
 
     def get_market_state(self, codes: list) -> Optional[Dict[str, Any]]:
         """Get market state for given stock codes"""
         try:
-            ret, data = self.quote_ctx.get_market_state(codes)
+            ret, data = self.scheduler.run('get_market_state', self.quote_ctx.get_market_state, codes)
             if ret == RET_OK:
                 return data
-            self.logger.error(f"Failed to get market state: {data}")
+            self.logger.error("Failed to get market state: %s", data)
             return None
         except Exception as e:
-            self.logger.error(f"Error getting market state: {str(e)}")
+            self.logger.error("Error getting market state: %s", e)
             return None
 
     def query_account_info(self, currency: Currency = Currency.USD) -> Optional[List[Any]]:
@@ -148,16 +491,14 @@ class MooMooAPI:
             Exception: If the account information query fails.
         """
         try:
-            ret, data = self.trade_ctx.accinfo_query(currency=currency)
+            ret, data = self.scheduler.run('accinfo_query', self.trade_ctx.accinfo_query, currency=currency)
             if ret == RET_OK:
-                print(data)
-                print(data['power'][0])  # 取第一行的购买力
+                self.logger.debug("Account info: %s", data)
                 return data['power'].values.tolist()  # 转为 list
             else:
-                print('accinfo_query error:', data)
                 raise Exception(f'accinfo_query error: {data}')
         except Exception as e:
-            self.logger.error(f"Error querying account info: {str(e)}")
+            self.logger.error("Error querying account info: %s", e)
             return None
 
 if __name__ == "__main__":
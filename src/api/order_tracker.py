@@ -0,0 +1,215 @@
+from moomoo import (
+    TradeOrderHandlerBase,
+    TradeDealHandlerBase,
+    OrderStatus,
+    TrdEnv,
+    RET_OK,
+)
+from api.cache import TTLCache
+from typing import Any, Callable, Dict, List, Optional, Set
+import logging
+import threading
+
+# Statuses after which OpenD sends no further updates for an order
+FINAL_STATUSES = frozenset({
+    OrderStatus.FILLED_ALL,
+    OrderStatus.CANCELLED_ALL,
+    OrderStatus.CANCELLED_PART,
+    OrderStatus.FAILED,
+    OrderStatus.DISABLED,
+    OrderStatus.DELETED,
+    OrderStatus.SUBMIT_FAILED,
+    OrderStatus.FILL_CANCELLED,
+})
+
+# IDs of finished orders remembered so late or repeated pushes are ignored
+FINISHED_ORDERS = 4096
+
+# Called as callback(order, old_status, new_status); old_status is None for a new order
+TransitionCallback = Callable[[Dict[str, Any], Optional[str], str], None]
+# Called as callback(deal)
+DealCallback = Callable[[Dict[str, Any]], None]
+
+
+class _OrderPushHandler(TradeOrderHandlerBase):
+    """Forwards pushed order updates to the OrderTracker"""
+
+    def __init__(self, tracker: 'OrderTracker'):
+        super().__init__()
+        self.tracker = tracker
+
+    def on_recv_rsp(self, rsp_pb):
+        ret_code, data = super().on_recv_rsp(rsp_pb)
+        if ret_code != RET_OK:
+            self.tracker.logger.error(f"Order push error: {data}")
+            return ret_code, data
+        self.on_frame(data)
+        return RET_OK, data
+
+    def on_frame(self, frame):
+        self.tracker.on_order_frame(frame)
+
+
+class _DealPushHandler(TradeDealHandlerBase):
+    """Forwards pushed fills to the OrderTracker"""
+
+    def __init__(self, tracker: 'OrderTracker'):
+        super().__init__()
+        self.tracker = tracker
+
+    def on_recv_rsp(self, rsp_pb):
+        ret_code, data = super().on_recv_rsp(rsp_pb)
+        if ret_code != RET_OK:
+            self.tracker.logger.error(f"Deal push error: {data}")
+            return ret_code, data
+        self.on_frame(data)
+        return RET_OK, data
+
+    def on_frame(self, frame):
+        self.tracker.on_deal_frame(frame)
+
+
+class OrderTracker:
+    """
+    Keeps the state of open orders from OpenD order and fill pushes.
+
+    Open orders are indexed by order ID and by code, so looking up an order
+    costs no request. Callbacks registered with add_callback are called on
+    every status change, on the SDK push thread, and must not block.
+    """
+
+    def __init__(self, trade_ctx):
+        """
+        Args:
+            trade_ctx: An OpenSecTradeContext (or compatible) delivering the pushes
+        """
+        self.trade_ctx = trade_ctx
+        self.logger = logging.getLogger('OrderTracker')
+        self._lock = threading.Lock()
+        self._open: Dict[str, Dict[str, Any]] = {}
+        self._by_symbol: Dict[str, Set[str]] = {}
+        self._finished = TTLCache(maxsize=FINISHED_ORDERS)
+        self._callbacks: List[TransitionCallback] = []
+        self._symbol_callbacks: Dict[str, List[TransitionCallback]] = {}
+        self._deal_callbacks: List[DealCallback] = []
+        self._handlers = (_OrderPushHandler(self), _DealPushHandler(self))
+        for handler in self._handlers:
+            self.trade_ctx.set_handler(handler)
+
+    def add_callback(self, callback: TransitionCallback, symbol: Optional[str] = None):
+        """Call `callback` on status changes of every order, or only those of `symbol`"""
+        with self._lock:
+            if symbol is None:
+                self._callbacks.append(callback)
+            else:
+                self._symbol_callbacks.setdefault(symbol, []).append(callback)
+
+    def remove_callback(self, callback: TransitionCallback, symbol: Optional[str] = None):
+        """Undo add_callback"""
+        with self._lock:
+            callbacks = self._callbacks if symbol is None else self._symbol_callbacks.get(symbol, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def add_deal_callback(self, callback: DealCallback):
+        """Call `callback` with every pushed fill"""
+        with self._lock:
+            self._deal_callbacks.append(callback)
+
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Return the latest state of an open order"""
+        with self._lock:
+            order = self._open.get(order_id)
+            return dict(order) if order is not None else None
+
+    def status(self, order_id: str) -> Optional[str]:
+        """Return the latest status of an open or recently finished order"""
+        with self._lock:
+            order = self._open.get(order_id)
+            if order is not None:
+                return order.get('order_status')
+            return self._finished.get(order_id)
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return the open orders, optionally only those for `symbol`"""
+        with self._lock:
+            if symbol is None:
+                return [dict(order) for order in self._open.values()]
+            return [dict(self._open[order_id]) for order_id in self._by_symbol.get(symbol, ())]
+
+    def track(self, order: Dict[str, Any]):
+        """
+        Start tracking an order from a place_order response. A push that
+        arrived before the response already created the entry and is kept.
+        """
+        with self._lock:
+            if str(order['order_id']) in self._open:
+                return
+        self._apply(order)
+
+    def sync(self, trd_env: str = TrdEnv.SIMULATE) -> bool:
+        """
+        Load the current open orders with one order_list_query, e.g. at start-up
+        or after a reconnect when pushes may have been missed.
+        """
+        ret, data = self.trade_ctx.order_list_query(trd_env=trd_env)
+        if ret != RET_OK:
+            self.logger.error(f"Failed to query orders: {data}")
+            return False
+        self.on_order_frame(data)
+        return True
+
+    def on_order_frame(self, frame):
+        """Apply pushed or queried order rows"""
+        if frame is None or frame.empty:
+            return
+        for order in frame.to_dict('records'):
+            self._apply(order)
+
+    def on_deal_frame(self, frame):
+        """Deliver pushed fills to the deal callbacks"""
+        if frame is None or frame.empty:
+            return
+        with self._lock:
+            callbacks = list(self._deal_callbacks)
+        for deal in frame.to_dict('records'):
+            self.logger.debug(f"Fill {deal.get('deal_id')} for order {deal.get('order_id')}: "
+                              f"{deal.get('qty')} @ {deal.get('price')}")
+            for callback in callbacks:
+                try:
+                    callback(deal)
+                except Exception as e:
+                    self.logger.error(f"Error in deal callback for {deal.get('code')}: {str(e)}")
+
+    def _apply(self, order: Dict[str, Any]):
+        order_id = str(order['order_id'])
+        symbol = order.get('code')
+        new_status = order.get('order_status')
+        with self._lock:
+            if order_id in self._finished:
+                return
+            current = self._open.get(order_id)
+            old_status = current.get('order_status') if current is not None else None
+            merged = dict(current or {}, **order)
+            merged['order_id'] = order_id
+            if new_status in FINAL_STATUSES:
+                self._finished.set(order_id, new_status)
+                self._open.pop(order_id, None)
+                ids = self._by_symbol.get(symbol)
+                if ids is not None:
+                    ids.discard(order_id)
+                    if not ids:
+                        del self._by_symbol[symbol]
+            else:
+                self._open[order_id] = merged
+                self._by_symbol.setdefault(symbol, set()).add(order_id)
+            if new_status == old_status:
+                return
+            callbacks = self._callbacks + self._symbol_callbacks.get(symbol, [])
+
+        self.logger.debug(f"Order {order_id} for {symbol}: {old_status} -> {new_status}")
+        for callback in callbacks:
+            try:
+                callback(merged, old_status, new_status)
+            except Exception as e:
+                self.logger.error(f"Error in order callback for {symbol}: {str(e)}")
@@ -0,0 +1,217 @@
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from utils.metrics import EXCEPTION, OK, Metrics
+import bisect
+import itertools
+import logging
+import threading
+import time
+
+
+class Priority(IntEnum):
+    """Request classes, lowest value first. Trading always goes before analytics."""
+    TRADING = 0
+    ACCOUNT = 1
+    QUOTE = 2
+    ANALYTICS = 3
+
+
+# OpenD limits as (requests, seconds). Endpoints not listed are not paced.
+RATE_LIMITS = {
+    'place_order': (15, 30),
+    'modify_order': (20, 30),
+    'accinfo_query': (10, 30),
+    'position_list_query': (10, 30),
+    'order_list_query': (10, 30),
+    'deal_list_query': (10, 30),
+    'get_market_snapshot': (60, 30),
+    'request_history_kline': (60, 30),
+    'get_stock_basicinfo': (10, 30),
+    'get_market_state': (10, 30),
+}
+
+ENDPOINT_PRIORITIES = {
+    'place_order': Priority.TRADING,
+    'modify_order': Priority.TRADING,
+    'accinfo_query': Priority.ACCOUNT,
+    'position_list_query': Priority.ACCOUNT,
+    'order_list_query': Priority.ACCOUNT,
+    'deal_list_query': Priority.ACCOUNT,
+    'request_history_kline': Priority.ANALYTICS,
+}
+
+# Requests sent to OpenD at the same time; queued requests take free slots in
+# priority order, so an order never waits behind a backlog of snapshots.
+DEFAULT_MAX_IN_FLIGHT = 4
+
+
+class TokenBucket:
+    """Allows `capacity` requests per `period` seconds, refilled continuously"""
+
+    def __init__(self, capacity: int, period: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_take(self) -> bool:
+        """Take a token if one is available"""
+        self._refill()
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+    def time_until_token(self) -> float:
+        """Seconds until a token is available, 0 if one is"""
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+
+class _EndpointStats:
+    __slots__ = ('queued', 'requests', 'total_wait', 'max_wait')
+
+    def __init__(self):
+        self.queued = 0
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+
+class RequestScheduler:
+    """
+    Paces OpenD requests with a token bucket per endpoint and hands out
+    request slots by priority.
+
+    run() queues the caller until its endpoint has a token and a slot is free,
+    instead of sending a request OpenD would reject. Among queued requests the
+    highest priority that can go, goes first; requests of equal priority go in
+    arrival order.
+    """
+
+    def __init__(self,
+                 rate_limits: Optional[Dict[str, Tuple[int, float]]] = None,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 clock: Callable[[], float] = time.monotonic,
+                 metrics: Optional[Metrics] = None):
+        """
+        Args:
+            rate_limits (Optional[Dict[str, Tuple[int, float]]]): Per-endpoint overrides for RATE_LIMITS
+            max_in_flight (int): Requests allowed to run at once
+            clock (Callable[[], float]): Time source, injectable for tests
+            metrics (Optional[Metrics]): Records the latency, return code and throttling of every request
+        """
+        self.max_in_flight = max_in_flight
+        self.metrics = metrics
+        self.logger = logging.getLogger('RequestScheduler')
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._buckets = {
+            endpoint: TokenBucket(capacity, period, clock)
+            for endpoint, (capacity, period) in dict(RATE_LIMITS, **(rate_limits or {})).items()
+        }
+        self._stats: Dict[str, _EndpointStats] = {}
+        # Sorted (priority, seq, endpoint) of queued requests
+        self._waiting: List[Tuple[int, int, str]] = []
+        self._granted = set()
+        self._seq = itertools.count()
+        self._in_flight = 0
+
+    def run(self, endpoint: str, func: Callable, *args, priority: Optional[int] = None, **kwargs) -> Any:
+        """
+        Call func(*args, **kwargs) once `endpoint` may be called.
+
+        Args:
+            endpoint (str): OpenD endpoint name, e.g. 'get_market_snapshot'
+            func (Callable): The SDK call
+            priority (Optional[int]): A Priority, ENDPOINT_PRIORITIES or QUOTE if None
+        """
+        self._acquire(endpoint, priority)
+        started = time.perf_counter()
+        code = EXCEPTION
+        try:
+            result = func(*args, **kwargs)
+            # SDK calls return (ret, data, ...)
+            code = result[0] if isinstance(result, tuple) and result else OK
+            return result
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe_call(endpoint, time.perf_counter() - started, code)
+            with self._cond:
+                self._in_flight -= 1
+                self._dispatch_locked()
+
+    def _acquire(self, endpoint: str, priority: Optional[int]):
+        if priority is None:
+            priority = ENDPOINT_PRIORITIES.get(endpoint, Priority.QUOTE)
+        entry = (int(priority), next(self._seq), endpoint)
+        enqueued_at = self._clock()
+        with self._cond:
+            stats = self._stats.setdefault(endpoint, _EndpointStats())
+            stats.queued += 1
+            bisect.insort(self._waiting, entry)
+            self._dispatch_locked()
+            if (self.metrics is not None and entry not in self._granted
+                    and endpoint in self._buckets and self._buckets[endpoint].time_until_token() > 0):
+                self.metrics.count_throttled(endpoint)
+            while entry not in self._granted:
+                self._cond.wait(self._next_token_wait_locked())
+                self._dispatch_locked()
+            self._granted.discard(entry)
+
+            waited = self._clock() - enqueued_at
+            stats.queued -= 1
+            stats.requests += 1
+            stats.total_wait += waited
+            stats.max_wait = max(stats.max_wait, waited)
+            if waited > 1:
+                self.logger.debug(f"{endpoint} waited {waited:.2f}s for its turn")
+
+    def _dispatch_locked(self):
+        """Grant free slots to the best queued requests whose endpoint has a token"""
+        granted = False
+        position = 0
+        while self._in_flight < self.max_in_flight and position < len(self._waiting):
+            entry = self._waiting[position]
+            bucket = self._buckets.get(entry[2])
+            if bucket is None or bucket.try_take():
+                del self._waiting[position]
+                self._granted.add(entry)
+                self._in_flight += 1
+                granted = True
+            else:
+                position += 1
+        if granted:
+            self._cond.notify_all()
+
+    def _next_token_wait_locked(self) -> Optional[float]:
+        if self._in_flight >= self.max_in_flight:
+            # A finishing request wakes the queue
+            return None
+        waits = [self._buckets[endpoint].time_until_token()
+                 for _, _, endpoint in self._waiting if endpoint in self._buckets]
+        return min(waits) if waits else None
+
+    def queue_depth(self) -> int:
+        """Requests currently waiting"""
+        with self._cond:
+            return len(self._waiting)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-endpoint queue depth, request count and average/max wait in seconds"""
+        with self._cond:
+            return {
+                endpoint: {
+                    'queued': s.queued,
+                    'requests': s.requests,
+                    'avg_wait': s.total_wait / s.requests if s.requests else 0.0,
+                    'max_wait': s.max_wait,
+                }
+                for endpoint, s in self._stats.items()
+            }
@@ -0,0 +1,548 @@
+from moomoo import (
+    StockQuoteHandlerBase,
+    TickerHandlerBase,
+    CurKlineHandlerBase,
+    TradeOrderHandlerBase,
+    TradeDealHandlerBase,
+    KLType,
+    MarketState,
+    ModifyOrderOp,
+    OrderStatus,
+    SubType,
+    TrdSide,
+    RET_OK,
+    RET_ERROR,
+)
+from api.scheduler import RATE_LIMITS
+from api.subscription import DEFAULT_SUBSCRIPTION_QUOTA, UNSUBSCRIBE_MIN_AGE
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import itertools
+import logging
+import threading
+import time
+import numpy as np
+import pandas as pd
+
+# Cash a simulated account starts with
+DEFAULT_CASH = 1_000_000.0
+
+BAR_COLUMNS = ['time_key', 'open', 'high', 'low', 'close', 'volume', 'turnover']
+ORDER_COLUMNS = ['trd_env', 'code', 'stock_name', 'dealt_avg_price', 'dealt_qty', 'qty', 'order_id',
+                 'order_type', 'price', 'order_status', 'create_time', 'updated_time', 'trd_side']
+DEAL_COLUMNS = ['code', 'stock_name', 'deal_id', 'order_id', 'qty', 'price', 'trd_side', 'create_time']
+
+
+def synthetic_ticks(codes: List[str],
+                    count: int,
+                    start: str = '2026-01-02 09:30:00',
+                    interval: float = 1.0,
+                    start_price: float = 100.0,
+                    volatility: float = 0.001,
+                    seed: Optional[int] = None) -> pd.DataFrame:
+    """
+    Generate a random-walk tick stream, `count` ticks per code, interleaved in time.
+
+    Returns:
+        pd.DataFrame: Columns time, code, price, volume, ordered by time
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0, volatility, size=(count, len(codes)))
+    prices = np.round(start_price * np.exp(np.cumsum(returns, axis=0)), 4)
+    times = pd.Timestamp(start) + pd.to_timedelta(np.arange(count) * interval, unit='s')
+    return pd.DataFrame({
+        'time': np.repeat(times.strftime('%Y-%m-%d %H:%M:%S.%f').to_numpy(), len(codes)),
+        'code': np.tile(codes, count),
+        'price': prices.ravel(),
+        'volume': rng.integers(1, 1000, size=count * len(codes)),
+    })
+
+
+def synthetic_bars(days: int,
+                   end: str = '2026-01-01',
+                   start_price: float = 100.0,
+                   volatility: float = 0.02,
+                   seed: Optional[int] = None) -> pd.DataFrame:
+    """Generate `days` daily bars ending on `end`, in request_history_kline's layout"""
+    rng = np.random.default_rng(seed)
+    close = start_price * np.exp(np.cumsum(rng.normal(0.0, volatility, size=days)))
+    open_ = np.concatenate([[start_price], close[:-1]])
+    spread = np.abs(rng.normal(0.0, volatility / 2, size=days)) * close
+    dates = pd.bdate_range(end=end, periods=days)
+    volume = rng.integers(1_000, 1_000_000, size=days)
+    return pd.DataFrame({
+        'time_key': dates.strftime('%Y-%m-%d 00:00:00'),
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': volume,
+        'turnover': volume * close,
+    })
+
+
+class SimulatedMarket:
+    """
+    In-process stand-in for OpenD, shared by a SimulatedQuoteContext and a
+    SimulatedTradeContext.
+
+    Requests pay `latency` seconds and count against OpenD's per-endpoint rate
+    limits (scaled by `rate_scale`), and are refused with RET_ERROR like OpenD
+    refuses them. Pushes are delivered to the registered handlers' on_frame on
+    the thread that caused them: the replay thread for quotes, the calling
+    thread for order updates.
+    """
+
+    def __init__(self,
+                 latency: float = 0.0,
+                 rate_limits: Optional[Dict[str, Tuple[int, float]]] = None,
+                 rate_scale: float = 1.0,
+                 subscription_quota: int = DEFAULT_SUBSCRIPTION_QUOTA,
+                 cash: float = DEFAULT_CASH,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            latency (float): Seconds each request takes
+            rate_limits (Optional[Dict[str, Tuple[int, float]]]): (requests, seconds) per endpoint,
+                the scheduler's RATE_LIMITS if None. Pass {} to disable.
+            rate_scale (float): Multiplier on the allowed request counts, e.g. 10 for a 10x load test
+            subscription_quota (int): Subscription units available
+            cash (float): Starting cash of the simulated account
+            clock (Callable[[], float]): Time source for limits and subscription ages
+        """
+        self.latency = latency
+        self.rate_limits = {
+            endpoint: (max(1, int(count * rate_scale)), period)
+            for endpoint, (count, period) in (RATE_LIMITS if rate_limits is None else rate_limits).items()
+        }
+        self.subscription_quota = subscription_quota
+        self.cash = cash
+        self.logger = logging.getLogger('SimulatedMarket')
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._calls: Dict[str, Deque[float]] = {}
+        self.request_counts: Dict[str, int] = {}
+        self.rejections: Dict[str, int] = {}
+
+        self._stocks: Dict[str, Dict[str, Any]] = {}
+        self._bars: Dict[str, pd.DataFrame] = {}
+        # Today's bar per code, kept as a dict so ticks stay cheap
+        self._forming: Dict[str, Dict[str, Any]] = {}
+        self._subscriptions: Dict[Tuple[str, str], float] = {}
+        self._handlers: List[Any] = []
+
+        self._order_ids = itertools.count(1)
+        self._deal_ids = itertools.count(1)
+        self.orders: Dict[str, Dict[str, Any]] = {}
+        # Code to its unfilled orders, so a tick only checks orders on its code
+        self._resting: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.deals: List[Dict[str, Any]] = []
+        self.positions: Dict[str, float] = {}
+
+    # Market data
+
+    def add_stock(self, code: str, price: float, name: Optional[str] = None, **fields):
+        """
+        List a stock at `price`. Extra fields (e.g. pe_ratio) are returned in
+        its snapshots.
+        """
+        with self._lock:
+            self._stocks[code] = dict(fields, code=code, name=name or code, last_price=price,
+                                      open_price=price, high_price=price, low_price=price,
+                                      prev_close_price=price, volume=0, turnover=0.0,
+                                      update_time='')
+
+    def add_bars(self, code: str, bars: pd.DataFrame):
+        """Set the daily history request_history_kline serves for `code`"""
+        with self._lock:
+            self._bars[code] = bars.reset_index(drop=True)
+            self._forming.pop(code, None)
+            if code not in self._stocks and len(bars):
+                self.add_stock(code, float(bars['close'].iloc[-1]))
+
+    def codes(self) -> List[str]:
+        with self._lock:
+            return list(self._stocks)
+
+    def tick(self, code: str, price: float, volume: int = 0, time_str: Optional[str] = None):
+        """
+        Apply one trade tick: update the quote and today's bar, push to
+        subscribers and fill resting orders the price crossed.
+        """
+        time_str = time_str or pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            stock = self._stocks.get(code)
+            if stock is None:
+                self.add_stock(code, price)
+                stock = self._stocks[code]
+            stock['last_price'] = price
+            stock['high_price'] = max(stock['high_price'], price)
+            stock['low_price'] = min(stock['low_price'], price)
+            stock['volume'] += volume
+            stock['turnover'] += volume * price
+            stock['update_time'] = time_str
+            bar = self._update_bar(code, price, volume, time_str)
+            bar = dict(bar)
+            pushes = []
+            if (code, SubType.QUOTE) in self._subscriptions:
+                pushes.append((StockQuoteHandlerBase, pd.DataFrame([self._snapshot(code)])))
+            if (code, SubType.TICKER) in self._subscriptions:
+                pushes.append((TickerHandlerBase, pd.DataFrame(
+                    [{'code': code, 'time': time_str, 'price': price, 'volume': volume}])))
+            if (code, SubType.K_DAY) in self._subscriptions:
+                pushes.append((CurKlineHandlerBase, pd.DataFrame([dict(bar, code=code, k_type=SubType.K_DAY)])))
+        for kind, frame in pushes:
+            self._push(kind, frame)
+        self._match(code, price, time_str)
+
+    def _update_bar(self, code: str, price: float, volume: int, time_str: str) -> Dict[str, Any]:
+        time_key = time_str[:10] + ' 00:00:00'
+        bar = self._forming.get(code)
+        if bar is not None and bar['time_key'] == time_key:
+            bar['high'] = max(bar['high'], price)
+            bar['low'] = min(bar['low'], price)
+            bar['close'] = price
+            bar['volume'] += volume
+            bar['turnover'] += volume * price
+            return bar
+        bars = self._bars.get(code)
+        if bar is not None:
+            # The previous day is complete
+            bars = pd.DataFrame([bar]) if bars is None else pd.concat([bars, pd.DataFrame([bar])], ignore_index=True)
+            self._bars[code] = bars
+        elif bars is not None and len(bars) and bars['time_key'].iloc[-1] == time_key:
+            # The history already holds part of today; keep building on it
+            self._forming[code] = bars.iloc[-1].to_dict()
+            self._bars[code] = bars.iloc[:-1]
+            return self._update_bar(code, price, volume, time_str)
+        bar = {'time_key': time_key, 'open': price, 'high': price, 'low': price,
+               'close': price, 'volume': volume, 'turnover': volume * price}
+        self._forming[code] = bar
+        return bar
+
+    def history(self, code: str) -> pd.DataFrame:
+        """Daily bars of `code` including today's forming bar"""
+        with self._lock:
+            bars = self._bars.get(code)
+            frames = [bars] if bars is not None else []
+            forming = self._forming.get(code)
+            if forming is not None:
+                frames.append(pd.DataFrame([forming]))
+        if not frames:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].copy()
+
+    def _snapshot(self, code: str) -> Dict[str, Any]:
+        return dict(self._stocks[code])
+
+    # Requests
+
+    def request(self, endpoint: str) -> Optional[str]:
+        """
+        Account for one request: wait the latency, then return an error message
+        if the endpoint's rate limit is exhausted, None otherwise.
+        """
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.request_counts[endpoint] = self.request_counts.get(endpoint, 0) + 1
+            limit = self.rate_limits.get(endpoint)
+            if limit is None:
+                return None
+            count, period = limit
+            now = self._clock()
+            calls = self._calls.setdefault(endpoint, deque())
+            while calls and now - calls[0] >= period:
+                calls.popleft()
+            if len(calls) >= count:
+                self.rejections[endpoint] = self.rejections.get(endpoint, 0) + 1
+                return f"{endpoint}: too frequent, at most {count} requests per {period} seconds"
+            calls.append(now)
+            return None
+
+    # Pushes
+
+    def set_handler(self, handler):
+        with self._lock:
+            self._handlers.append(handler)
+
+    def _push(self, kind: type, frame: pd.DataFrame):
+        with self._lock:
+            handlers = [handler for handler in self._handlers if isinstance(handler, kind)]
+        for handler in handlers:
+            if not hasattr(handler, 'on_frame'):
+                self.logger.debug(f"{type(handler).__name__} has no on_frame, push dropped")
+                continue
+            try:
+                handler.on_frame(frame)
+            except Exception as e:
+                self.logger.error(f"Error in {type(handler).__name__}: {str(e)}")
+
+    # Orders
+
+    def place(self, code: str, price: float, qty: float, trd_side: str) -> Dict[str, Any]:
+        now = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self._lock:
+            order = {
+                'trd_env': 'SIMULATE', 'code': code, 'stock_name': code, 'dealt_avg_price': 0.0,
+                'dealt_qty': 0.0, 'qty': qty, 'order_id': str(next(self._order_ids)),
+                'order_type': 'NORMAL', 'price': price, 'order_status': OrderStatus.SUBMITTED,
+                'create_time': now, 'updated_time': now, 'trd_side': trd_side,
+            }
+            self.orders[order['order_id']] = order
+            self._resting.setdefault(code, {})[order['order_id']] = order
+            last_price = self._stocks.get(code, {}).get('last_price')
+            response = dict(order)
+        self._push(TradeOrderHandlerBase, pd.DataFrame([response], columns=ORDER_COLUMNS))
+        if last_price is not None:
+            self._match(code, last_price, now)
+        return response
+
+    def cancel(self, order_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            order = self.orders.get(str(order_id))
+            if order is None or order['order_status'] != OrderStatus.SUBMITTED:
+                return None
+            order['order_status'] = OrderStatus.CANCELLED_ALL
+            self._resting.get(order['code'], {}).pop(order['order_id'], None)
+            order['updated_time'] = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+            cancelled = dict(order)
+        self._push(TradeOrderHandlerBase, pd.DataFrame([cancelled], columns=ORDER_COLUMNS))
+        return cancelled
+
+    def _match(self, code: str, price: float, time_str: str):
+        """Fill resting limit orders on `code` that `price` reached, at `price`"""
+        fills = []
+        with self._lock:
+            resting = self._resting.get(code)
+            for order in list(resting.values()) if resting else ():
+                buy = order['trd_side'] == TrdSide.BUY
+                if (buy and price > order['price']) or (not buy and price < order['price']):
+                    continue
+                qty = order['qty']
+                del resting[order['order_id']]
+                order.update(order_status=OrderStatus.FILLED_ALL, dealt_qty=qty,
+                             dealt_avg_price=price, updated_time=time_str)
+                deal = {'code': code, 'stock_name': code, 'deal_id': str(next(self._deal_ids)),
+                        'order_id': order['order_id'], 'qty': qty, 'price': price,
+                        'trd_side': order['trd_side'], 'create_time': time_str}
+                self.deals.append(deal)
+                signed = qty if buy else -qty
+                self.positions[code] = self.positions.get(code, 0) + signed
+                self.cash -= signed * price
+                fills.append((dict(order), deal))
+        for order, deal in fills:
+            self._push(TradeOrderHandlerBase, pd.DataFrame([order], columns=ORDER_COLUMNS))
+            self._push(TradeDealHandlerBase, pd.DataFrame([deal], columns=DEAL_COLUMNS))
+
+
+class SimulatedQuoteContext:
+    """OpenQuoteContext stand-in backed by a SimulatedMarket"""
+
+    def __init__(self, market: SimulatedMarket):
+        self.market = market
+
+    def close(self):
+        pass
+
+    def set_handler(self, handler):
+        self.market.set_handler(handler)
+        return RET_OK
+
+    def get_market_state(self, codes: List[str]):
+        error = self.market.request('get_market_state')
+        if error:
+            return RET_ERROR, error
+        return RET_OK, pd.DataFrame({'code': codes, 'market_state': [MarketState.MORNING] * len(codes)})
+
+    def get_stock_basicinfo(self, market, stock_type='STOCK', code_list=None):
+        error = self.market.request('get_stock_basicinfo')
+        if error:
+            return RET_ERROR, error
+        listed = self.market.codes()
+        if code_list is None:
+            prefix = f"{market}."
+            codes = [code for code in listed if code.startswith(prefix)]
+        else:
+            listed = set(listed)
+            codes = [code for code in code_list if code in listed]
+        return RET_OK, pd.DataFrame({'code': codes, 'name': codes, 'lot_size': 1, 'stock_type': stock_type})
+
+    def get_market_snapshot(self, codes: List[str]):
+        error = self.market.request('get_market_snapshot')
+        if error:
+            return RET_ERROR, error
+        with self.market._lock:
+            unknown = [code for code in codes if code not in self.market._stocks]
+            if unknown:
+                return RET_ERROR, f"Unknown stock {unknown[0]}"
+            rows = [self.market._snapshot(code) for code in codes]
+        return RET_OK, pd.DataFrame(rows)
+
+    def request_history_kline(self, code, start=None, end=None, ktype=KLType.K_DAY,
+                              max_count=1000, page_req_key=None, **kwargs):
+        error = self.market.request('request_history_kline')
+        if error:
+            return RET_ERROR, error, None
+        bars = self.market.history(code)
+        if start is not None:
+            bars = bars[bars['time_key'] >= start]
+        if end is not None:
+            bars = bars[bars['time_key'] <= f"{end} 23:59:59"]
+        offset = page_req_key or 0
+        page = bars.iloc[offset:offset + max_count].copy()
+        page.insert(0, 'code', code)
+        next_key = offset + max_count if offset + max_count < len(bars) else None
+        return RET_OK, page.reset_index(drop=True), next_key
+
+    def subscribe(self, code_list: List[str], subtype_list: List[str], **kwargs):
+        market = self.market
+        with market._lock:
+            keys = [(code, subtype) for code in code_list for subtype in subtype_list
+                    if (code, subtype) not in market._subscriptions]
+            if len(market._subscriptions) + len(keys) > market.subscription_quota:
+                return RET_ERROR, "Subscription quota exceeded"
+            now = market._clock()
+            market._subscriptions.update((key, now) for key in keys)
+        return RET_OK, None
+
+    def unsubscribe(self, code_list: List[str], subtype_list: List[str], **kwargs):
+        market = self.market
+        with market._lock:
+            keys = [(code, subtype) for code in code_list for subtype in subtype_list]
+            now = market._clock()
+            if any(now - market._subscriptions.get(key, now - UNSUBSCRIBE_MIN_AGE) < UNSUBSCRIBE_MIN_AGE
+                   for key in keys):
+                return RET_ERROR, f"Unsubscribing is only allowed {UNSUBSCRIBE_MIN_AGE} seconds after subscribing"
+            for key in keys:
+                market._subscriptions.pop(key, None)
+        return RET_OK, None
+
+    def query_subscription(self, is_all_conn=True):
+        market = self.market
+        with market._lock:
+            used = len(market._subscriptions)
+        return RET_OK, {'total_used': used, 'own_used': used, 'remain': market.subscription_quota - used}
+
+
+class SimulatedTradeContext:
+    """OpenSecTradeContext stand-in backed by a SimulatedMarket"""
+
+    def __init__(self, market: SimulatedMarket):
+        self.market = market
+
+    def close(self):
+        pass
+
+    def set_handler(self, handler):
+        self.market.set_handler(handler)
+        return RET_OK
+
+    def place_order(self, price, qty, code, trd_side, order_type='NORMAL', trd_env='REAL', **kwargs):
+        error = self.market.request('place_order')
+        if error:
+            return RET_ERROR, error
+        order = self.market.place(code, price, qty, trd_side)
+        return RET_OK, pd.DataFrame([order], columns=ORDER_COLUMNS)
+
+    def modify_order(self, modify_order_op, order_id, qty, price, trd_env='REAL', **kwargs):
+        error = self.market.request('modify_order')
+        if error:
+            return RET_ERROR, error
+        if modify_order_op != ModifyOrderOp.CANCEL:
+            return RET_ERROR, f"{modify_order_op} is not simulated"
+        order = self.market.cancel(order_id)
+        if order is None:
+            return RET_ERROR, f"Order {order_id} cannot be cancelled"
+        return RET_OK, pd.DataFrame([{'trd_env': trd_env, 'order_id': order['order_id']}])
+
+    def order_list_query(self, trd_env='REAL', **kwargs):
+        error = self.market.request('order_list_query')
+        if error:
+            return RET_ERROR, error
+        with self.market._lock:
+            rows = [dict(order) for order in self.market.orders.values()
+                    if order['order_status'] == OrderStatus.SUBMITTED]
+        return RET_OK, pd.DataFrame(rows, columns=ORDER_COLUMNS)
+
+    def deal_list_query(self, trd_env='REAL', **kwargs):
+        error = self.market.request('deal_list_query')
+        if error:
+            return RET_ERROR, error
+        with self.market._lock:
+            return RET_OK, pd.DataFrame(list(self.market.deals), columns=DEAL_COLUMNS)
+
+    def position_list_query(self, trd_env='REAL', **kwargs):
+        error = self.market.request('position_list_query')
+        if error:
+            return RET_ERROR, error
+        with self.market._lock:
+            rows = [{'code': code, 'qty': qty,
+                     'nominal_price': self.market._stocks.get(code, {}).get('last_price', 0.0)}
+                    for code, qty in self.market.positions.items() if qty]
+        return RET_OK, pd.DataFrame(rows, columns=['code', 'qty', 'nominal_price'])
+
+    def accinfo_query(self, trd_env='REAL', currency='HKD', **kwargs):
+        error = self.market.request('accinfo_query')
+        if error:
+            return RET_ERROR, error
+        with self.market._lock:
+            cash = self.market.cash
+            market_val = sum(qty * self.market._stocks.get(code, {}).get('last_price', 0.0)
+                             for code, qty in self.market.positions.items())
+        return RET_OK, pd.DataFrame([{'power': cash, 'cash': cash, 'market_val': market_val,
+                                      'total_assets': cash + market_val, 'currency': currency}])
+
+
+class TickReplayer:
+    """
+    Replays ticks into a SimulatedMarket at a multiple of their recorded pace.
+
+    Ticks are rows with 'time', 'code' and 'price' (and optionally 'volume'),
+    e.g. from synthetic_ticks() or a recorded CSV.
+    """
+
+    def __init__(self, market: SimulatedMarket, ticks: pd.DataFrame, speed: Optional[float] = 1.0):
+        """
+        Args:
+            market (SimulatedMarket): Market receiving the ticks
+            ticks (pd.DataFrame): Ticks ordered by time
+            speed (Optional[float]): Replay speed relative to the recorded pace,
+                None to replay as fast as possible
+        """
+        self.market = market
+        self.ticks = ticks
+        self.speed = speed
+        self.replayed = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self) -> int:
+        """Replay every tick on the calling thread; returns the number replayed"""
+        times = pd.to_datetime(self.ticks['time']).to_numpy()
+        offsets = (times - times[0]) / np.timedelta64(1, 's') if len(times) else times
+        time_strs = pd.to_datetime(self.ticks['time']).dt.strftime('%Y-%m-%d %H:%M:%S').to_numpy()
+        volumes = self.ticks['volume'].to_numpy() if 'volume' in self.ticks else np.zeros(len(self.ticks), dtype=int)
+        started = time.monotonic()
+        for i, (code, price) in enumerate(zip(self.ticks['code'].to_numpy(), self.ticks['price'].to_numpy())):
+            if self._stop.is_set():
+                break
+            if self.speed:
+                delay = offsets[i] / self.speed - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            self.market.tick(code, float(price), int(volumes[i]), time_strs[i])
+            self.replayed += 1
+        return self.replayed
+
+    def start(self):
+        """Replay on a background thread, like the SDK's push thread"""
+        self._thread = threading.Thread(target=self.run, name='TickReplayer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None):
+        if self._thread is not None:
+            self._thread.join(timeout)
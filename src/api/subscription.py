@@ -0,0 +1,287 @@
+from moomoo import (
+    StockQuoteHandlerBase,
+    TickerHandlerBase,
+    CurKlineHandlerBase,
+    SubType,
+    RET_OK,
+)
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+import logging
+import threading
+import time
+
+# Subscription quota OpenD grants the lowest quote level; each (code, subtype)
+# pair uses one unit. Used when the live quota cannot be queried.
+DEFAULT_SUBSCRIPTION_QUOTA = 100
+
+# OpenD refuses to unsubscribe a code within this many seconds of subscribing it
+UNSUBSCRIBE_MIN_AGE = 60
+
+# Column holding the price in each kind of pushed frame
+PRICE_COLUMNS = {
+    SubType.QUOTE: 'last_price',
+    SubType.TICKER: 'price',
+}
+KLINE_PRICE_COLUMN = 'close'
+
+PriceCallback = Callable[[str, float, Dict[str, Any]], None]
+
+
+class _QuotePushHandler(StockQuoteHandlerBase):
+    """Forwards pushed quotes to the SubscriptionManager"""
+
+    def __init__(self, manager: 'SubscriptionManager'):
+        super().__init__()
+        self.manager = manager
+
+    def on_recv_rsp(self, rsp_pb):
+        ret_code, data = super().on_recv_rsp(rsp_pb)
+        if ret_code != RET_OK:
+            self.manager.logger.error(f"Quote push error: {data}")
+            return ret_code, data
+        self.on_frame(data)
+        return RET_OK, data
+
+    def on_frame(self, frame):
+        self.manager.dispatch_frame(SubType.QUOTE, frame)
+
+
+class _TickerPushHandler(TickerHandlerBase):
+    """Forwards pushed tickers to the SubscriptionManager"""
+
+    def __init__(self, manager: 'SubscriptionManager'):
+        super().__init__()
+        self.manager = manager
+
+    def on_recv_rsp(self, rsp_pb):
+        ret_code, data = super().on_recv_rsp(rsp_pb)
+        if ret_code != RET_OK:
+            self.manager.logger.error(f"Ticker push error: {data}")
+            return ret_code, data
+        self.on_frame(data)
+        return RET_OK, data
+
+    def on_frame(self, frame):
+        self.manager.dispatch_frame(SubType.TICKER, frame)
+
+
+class _KlinePushHandler(CurKlineHandlerBase):
+    """Forwards pushed K-lines of every period to the SubscriptionManager"""
+
+    def __init__(self, manager: 'SubscriptionManager'):
+        super().__init__()
+        self.manager = manager
+
+    def on_recv_rsp(self, rsp_pb):
+        ret_code, data = super().on_recv_rsp(rsp_pb)
+        if ret_code != RET_OK:
+            self.manager.logger.error(f"K-line push error: {data}")
+            return ret_code, data
+        self.on_frame(data)
+        return RET_OK, data
+
+    def on_frame(self, frame):
+        for k_type, bars in frame.groupby('k_type', sort=False):
+            self.manager.dispatch_frame(k_type, bars)
+
+
+class SubscriptionManager:
+    """
+    Subscribes to OpenD quote, ticker and K-line pushes and fans each update out
+    to the callbacks registered for that symbol.
+
+    Callbacks are called as callback(symbol, price, row) on the SDK push thread.
+    Quote and ticker updates are only delivered when the price changed since the
+    previous push for that symbol, so subscribers do no work on repeated prices.
+    """
+
+    def __init__(self, quote_ctx, quota: Optional[int] = None, clock=time.monotonic):
+        """
+        Args:
+            quote_ctx: An OpenQuoteContext (or compatible) to subscribe through
+            quota (Optional[int]): Subscription units this manager may use. Queried
+                from OpenD on first use when None.
+            clock: Time source used for the unsubscribe age check, injectable for tests
+        """
+        self.quote_ctx = quote_ctx
+        self.quota = quota
+        self.logger = logging.getLogger('SubscriptionManager')
+        self._lock = threading.RLock()
+        self._callbacks: Dict[Tuple[str, str], List[PriceCallback]] = {}
+        self._subscribed: Set[Tuple[str, str]] = set()
+        self._subscribed_at: Dict[Tuple[str, str], float] = {}
+        self._clock = clock
+        self._release_timer: Optional[threading.Timer] = None
+        self._idle: Set[Tuple[str, str]] = set()
+        self._last_price: Dict[Tuple[str, str], float] = {}
+        self._handlers: Dict[str, Any] = {}
+
+    @property
+    def used(self) -> int:
+        """Subscription units currently held"""
+        return len(self._subscribed)
+
+    def _ensure_quota(self) -> int:
+        if self.quota is None:
+            ret, data = self.quote_ctx.query_subscription(is_all_conn=True)
+            if ret == RET_OK:
+                self.quota = len(self._subscribed) + data['remain']
+            else:
+                self.logger.error(f"Failed to query subscription quota: {data}")
+                self.quota = DEFAULT_SUBSCRIPTION_QUOTA
+        return self.quota
+
+    def _ensure_handler(self, subtype: str):
+        if subtype == SubType.QUOTE:
+            kind, handler_cls = 'quote', _QuotePushHandler
+        elif subtype == SubType.TICKER:
+            kind, handler_cls = 'ticker', _TickerPushHandler
+        else:
+            kind, handler_cls = 'kline', _KlinePushHandler
+        if kind not in self._handlers:
+            handler = handler_cls(self)
+            self.quote_ctx.set_handler(handler)
+            self._handlers[kind] = handler
+
+    def subscribe(self, symbols: List[str], callback: PriceCallback, subtype: str = SubType.QUOTE) -> bool:
+        """
+        Register `callback` for pushed updates of `symbols`.
+
+        OpenD is only asked to subscribe codes that are not already subscribed
+        for `subtype`, all in one request.
+
+        Args:
+            symbols (List[str]): Stock codes
+            callback (PriceCallback): Called as callback(symbol, price, row)
+            subtype (str): SubType.QUOTE, SubType.TICKER or a K-line SubType
+
+        Returns:
+            bool: False if the quota would be exceeded or OpenD rejected the request
+        """
+        with self._lock:
+            keys = [(symbol, subtype) for symbol in dict.fromkeys(symbols)]
+            new_keys = [key for key in keys if key not in self._subscribed]
+            # Idle codes being reused keep their subscription
+            self._idle.difference_update(keys)
+            if new_keys and self._idle:
+                # Hand back idle codes old enough for OpenD to release first
+                self._release_idle_locked()
+            if new_keys:
+                quota = self._ensure_quota()
+                if len(self._subscribed) + len(new_keys) > quota:
+                    self.logger.error(
+                        f"Subscription quota exhausted: {len(self._subscribed)} used of {quota}, "
+                        f"{len(new_keys)} more requested")
+                    return False
+                self._ensure_handler(subtype)
+                ret, data = self.quote_ctx.subscribe([symbol for symbol, _ in new_keys], [subtype])
+                if ret != RET_OK:
+                    self.logger.error(f"Failed to subscribe {subtype}: {data}")
+                    return False
+                self._subscribed.update(new_keys)
+                now = self._clock()
+                self._subscribed_at.update((key, now) for key in new_keys)
+
+            for key in keys:
+                self._callbacks.setdefault(key, []).append(callback)
+            return True
+
+    def unsubscribe(self, symbols: List[str], callback: PriceCallback, subtype: str = SubType.QUOTE):
+        """
+        Remove `callback` for `symbols`. Codes left without callbacks are released
+        back to OpenD. OpenD rejects unsubscribing within UNSUBSCRIBE_MIN_AGE
+        seconds of subscribing, so younger codes stay idle and a timer releases
+        them once they are old enough.
+        """
+        with self._lock:
+            for symbol in symbols:
+                key = (symbol, subtype)
+                callbacks = self._callbacks.get(key, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+                if not callbacks and key in self._subscribed:
+                    self._callbacks.pop(key, None)
+                    self._idle.add(key)
+            self._release_idle_locked()
+
+    def release_idle(self):
+        """Try to unsubscribe codes that no longer have callbacks"""
+        with self._lock:
+            self._release_idle_locked()
+
+    def _release_idle_locked(self, force: bool = False):
+        now = self._clock()
+        by_subtype: Dict[str, List[str]] = {}
+        wait = None
+        for key in self._idle:
+            age = now - self._subscribed_at.get(key, 0)
+            if force or age >= UNSUBSCRIBE_MIN_AGE:
+                by_subtype.setdefault(key[1], []).append(key[0])
+            else:
+                remaining = UNSUBSCRIBE_MIN_AGE - age
+                wait = remaining if wait is None else min(wait, remaining)
+
+        for subtype, symbols in by_subtype.items():
+            ret, data = self.quote_ctx.unsubscribe(symbols, [subtype])
+            if ret != RET_OK:
+                self.logger.debug(f"Keeping {len(symbols)} idle {subtype} subscriptions: {data}")
+                wait = UNSUBSCRIBE_MIN_AGE if wait is None else wait
+                continue
+            for symbol in symbols:
+                key = (symbol, subtype)
+                self._idle.discard(key)
+                self._subscribed.discard(key)
+                self._subscribed_at.pop(key, None)
+                self._last_price.pop(key, None)
+
+        if wait is not None and not force:
+            self._schedule_release(wait)
+
+    def _schedule_release(self, delay: float):
+        if self._release_timer is not None and self._release_timer.is_alive():
+            return
+        self._release_timer = threading.Timer(delay, self._on_release_timer)
+        self._release_timer.daemon = True
+        self._release_timer.start()
+
+    def _on_release_timer(self):
+        with self._lock:
+            self._release_timer = None
+            self._release_idle_locked()
+
+    def dispatch_frame(self, subtype: str, frame):
+        """
+        Deliver a pushed frame to the registered callbacks.
+
+        Called by the push handlers on the SDK thread; can also be called
+        directly to replay recorded frames.
+        """
+        if frame is None or frame.empty:
+            return
+        price_column = PRICE_COLUMNS.get(subtype, KLINE_PRICE_COLUMN)
+        dedupe = subtype in PRICE_COLUMNS
+        for position, (symbol, price) in enumerate(zip(frame['code'], frame[price_column])):
+            key = (symbol, subtype)
+            with self._lock:
+                if dedupe:
+                    if self._last_price.get(key) == price:
+                        continue
+                    self._last_price[key] = price
+                callbacks = list(self._callbacks.get(key, ()))
+            if not callbacks:
+                continue
+            row = frame.iloc[position].to_dict()
+            for callback in callbacks:
+                try:
+                    callback(symbol, price, row)
+                except Exception as e:
+                    self.logger.error(f"Error in {subtype} callback for {symbol}: {str(e)}")
+
+    def close(self):
+        """Drop every callback and release all subscriptions held by this manager"""
+        with self._lock:
+            if self._release_timer is not None:
+                self._release_timer.cancel()
+            self._callbacks.clear()
+            self._idle.update(self._subscribed)
+            self._release_idle_locked(force=True)
@@ -0,0 +1,63 @@
+"""
+Run the benchmark suite against the simulated OpenD.
+
+    python -m src.benchmarks --output bench/current.json
+    python -m src.benchmarks --quick --only quotes indicators
+    python -m src.benchmarks --output bench/new.json --compare bench/baseline.json
+
+With --compare the exit status is 1 if any metric regressed by more than
+--tolerance, so the suite can gate a change.
+"""
+from pathlib import Path
+import argparse
+import logging
+import sys
+
+# Modules import each other both as api.* and as src.api.*, as under pytest
+_src = Path(__file__).resolve().parent.parent
+for path in (str(_src.parent), str(_src)):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from benchmarks.harness import (  # noqa: E402
+    BENCHMARKS, DEFAULT_TOLERANCE, compare, format_comparison, format_report,
+    load_results, run_benchmarks, save_results,
+)
+import benchmarks.cases  # noqa: E402,F401  registers the benchmarks
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='benchmarks', description='Benchmark the assistant hot paths')
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='Benchmarks to run')
+    parser.add_argument('--quick', action='store_true', help='Small inputs, for a smoke run')
+    parser.add_argument('--output', help='Write the results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON results to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Relative worsening allowed per metric (default %(default)s)')
+    parser.add_argument('--verbose', action='store_true', help='Show the application logs')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    if not args.verbose:
+        # Keep application logging out of the timings
+        logging.disable(logging.INFO)
+
+    report = run_benchmarks(args.only, quick=args.quick)
+    print(format_report(report))
+    if args.output:
+        save_results(report, args.output)
+
+    if args.compare:
+        baseline = load_results(args.compare)
+        if baseline['meta'].get('quick') != report['meta']['quick']:
+            print('warning: comparing a --quick run with a full run; input sizes differ', file=sys.stderr)
+        rows = compare(baseline, report, args.tolerance)
+        print()
+        print(format_comparison(rows))
+        if any(row['regressed'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
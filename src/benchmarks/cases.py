@@ -0,0 +1,247 @@
+from api.moomoo_api import MooMooAPI
+from api.scheduler import RATE_LIMITS
+from api.simulator import SimulatedMarket, SimulatedQuoteContext, SimulatedTradeContext, synthetic_bars
+from benchmarks.harness import LOWER, Metrics, best_rate, latency_metrics, logger, metric, register_benchmark
+from features.automated_trading import AutomatedTrading
+from features.backtest import Backtester
+from features.company_feedback import CompanyFeedback
+from features.stock_recommendation import StockRecommendation
+from utils.indicators import EMA, MACD, RSI, SMA, IndicatorSet, RollingHigh
+from utils.sentiment import SentimentScorer
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+import asyncio
+import tempfile
+import threading
+import time
+import numpy as np
+
+# Lets the scheduler send as fast as the simulator answers, so the benchmarks
+# measure our code rather than OpenD's pacing
+UNLIMITED = {endpoint: (10 ** 9, 1) for endpoint in RATE_LIMITS}
+
+UNIVERSE_SIZES = (1_000, 10_000, 50_000)
+QUICK_UNIVERSE_SIZES = (1_000,)
+
+
+def _codes(count: int, market: str = 'US') -> List[str]:
+    return [f'{market}.S{i:05d}' for i in range(count)]
+
+
+@contextmanager
+def simulated_api(market: SimulatedMarket, trade_ctx=None, **kwargs) -> Iterator[MooMooAPI]:
+    """A MooMooAPI on `market` with pacing disabled and a throwaway K-line store"""
+    with tempfile.TemporaryDirectory() as kline_dir:
+        api = MooMooAPI(kline_dir=kline_dir,
+                        rate_limits=UNLIMITED,
+                        quote_ctx=SimulatedQuoteContext(market),
+                        trade_ctx=trade_ctx or SimulatedTradeContext(market),
+                        **kwargs)
+        try:
+            yield api
+        finally:
+            api.cleanup()
+
+
+@register_benchmark('quotes')
+def bench_quotes(quick: bool) -> Metrics:
+    """get_stock_quote and batched get_stock_quotes throughput with warm metadata caches"""
+    codes = _codes(400)
+    market = SimulatedMarket(rate_limits={})
+    for code in codes:
+        market.add_stock(code, 100.0)
+    number = 200 if quick else 2_000
+    with simulated_api(market) as api:
+        api.get_stock_quotes(codes)
+        cycle = iter(codes * (3 * number // len(codes) + 1))
+        quote_rate = best_rate(lambda: api.get_stock_quote(next(cycle)), number)
+        batch_rate = best_rate(lambda: api.get_stock_quotes(codes), 5 if quick else 20)
+    return {
+        'get_stock_quote_per_s': metric(quote_rate, 'calls/s'),
+        'get_stock_quotes_400_per_s': metric(batch_rate * len(codes), 'quotes/s'),
+    }
+
+
+def _screening_market(size: int, seed: int = 0) -> SimulatedMarket:
+    rng = np.random.default_rng(seed)
+    market = SimulatedMarket(rate_limits={})
+    fields = {
+        'revenue_growth': rng.normal(10, 15, size),
+        'profit_growth': rng.normal(10, 20, size),
+        'pe_ratio': rng.uniform(-10, 60, size),
+        'pb_ratio': rng.uniform(0, 10, size),
+    }
+    half = size // 2
+    codes = _codes(half, 'US') + _codes(size - half, 'HK')
+    for i, code in enumerate(codes):
+        market.add_stock(code, 100.0, **{name: float(values[i]) for name, values in fields.items()})
+    return market
+
+
+@register_benchmark('recommend_stocks')
+def bench_recommend_stocks(quick: bool) -> Metrics:
+    """StockRecommendation.recommend_stocks end to end, listing included, per universe size"""
+    results = {}
+    for size in QUICK_UNIVERSE_SIZES if quick else UNIVERSE_SIZES:
+        with simulated_api(_screening_market(size)) as api:
+            recommender = StockRecommendation(api)
+            samples = []
+            for preference in ('Growth', 'Value', 'Growth'):
+                start = time.perf_counter()
+                recommender.recommend_stocks(preference, sort_by='revenue_growth', top_n=50)
+                samples.append(time.perf_counter() - start)
+        results[f'universe_{size}_ms'] = metric(min(samples) * 1000, 'ms', LOWER)
+    return results
+
+
+@register_benchmark('indicators')
+def bench_indicators(quick: bool) -> Metrics:
+    """Updates per second of the streaming indicators"""
+    count = 10_000 if quick else 200_000
+    prices = (100 + np.cumsum(np.random.default_rng(0).normal(0, 1, count))).tolist()
+    indicators = {
+        'sma20': lambda: SMA(20),
+        'ema20': lambda: EMA(20),
+        'rsi14': lambda: RSI(14),
+        'macd': lambda: MACD(),
+        'rolling_high20': lambda: RollingHigh(20),
+    }
+    results = {}
+    for name, make in indicators.items():
+        def feed():
+            update = make().update
+            for price in prices:
+                update(price)
+        results[f'{name}_updates_per_s'] = metric(best_rate(feed, 1) * count, 'updates/s')
+
+    def tick_set():
+        averages = IndicatorSet(short=SMA(5), long=SMA(20), rsi=RSI(14)).seed(prices[:20])
+        for i, price in enumerate(prices):
+            if i % 10:
+                averages.on_tick(price)
+            else:
+                averages.on_bar(price)
+    results['indicator_set_ticks_per_s'] = metric(best_rate(tick_set, 1) * count, 'ticks/s')
+    return results
+
+
+def _watchlist_market(watchlist: List[str]) -> SimulatedMarket:
+    market = SimulatedMarket(rate_limits={})
+    for i, code in enumerate(watchlist):
+        market.add_bars(code, synthetic_bars(60, end='2026-10-16', seed=i))
+    return market
+
+
+def _news(symbol: str) -> List[Dict[str, str]]:
+    return [{'id': f'{symbol}-{i}', 'title': title} for i, title in enumerate(
+        ('Analysts turn bullish', 'Quarterly revenue beats estimates', 'Bearish options flow'))]
+
+
+@register_benchmark('analyze_stock')
+def bench_analyze_stock(quick: bool) -> Metrics:
+    """CompanyFeedback.analyze_stock latency over a watchlist, first call and repeated"""
+    watchlist = _codes(5 if quick else 25)
+    with simulated_api(_watchlist_market(watchlist), news_source=_news) as api:
+        feedback = CompanyFeedback(api, None)
+        cold, warm = [], []
+        for symbol in watchlist:
+            start = time.perf_counter()
+            feedback.analyze_stock(symbol)
+            cold.append(time.perf_counter() - start)
+        for _ in range(2 if quick else 8):
+            for symbol in watchlist:
+                start = time.perf_counter()
+                feedback.analyze_stock(symbol)
+                warm.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        asyncio.run(feedback.analyze_stocks_async(watchlist))
+        watchlist_async = time.perf_counter() - start
+        feedback.async_api.close()
+
+    results = latency_metrics(cold, 'first_')
+    results.update(latency_metrics(warm))
+    results['watchlist_async_ms'] = metric(watchlist_async * 1000, 'ms', LOWER)
+    return results
+
+
+HEADLINES = (
+    'Apple beats estimates as iPhone demand surges',
+    'Analysts downgrade Tesla after delivery miss',
+    'Chipmakers rally on record high AI spending',
+    'Regulators open probe into bank lending practices',
+    'Oil prices steady ahead of OPEC meeting',
+)
+
+
+@register_benchmark('news_sentiment')
+def bench_news_sentiment(quick: bool) -> Metrics:
+    """Lexicon scoring of distinct headlines, and of headlines already scored"""
+    count = 5_000 if quick else 50_000
+    articles = [{'id': i, 'title': HEADLINES[i % len(HEADLINES)],
+                 'body': HEADLINES[(i + 2) % len(HEADLINES)]} for i in range(count)]
+    scorer = SentimentScorer()
+    start = time.perf_counter()
+    scorer.score_articles(articles)
+    scored = time.perf_counter() - start
+    start = time.perf_counter()
+    scorer.score_articles(articles)
+    cached = time.perf_counter() - start
+    return {
+        'articles_per_s': metric(count / scored, 'articles/s'),
+        'cached_articles_per_s': metric(count / cached, 'articles/s'),
+    }
+
+
+class _TimedTradeContext(SimulatedTradeContext):
+    """Records when each order reaches the broker"""
+
+    def __init__(self, market: SimulatedMarket):
+        super().__init__(market)
+        self.placed = threading.Event()
+        self.placed_at = 0.0
+
+    def place_order(self, price, qty, code, *args, **kwargs):
+        self.placed_at = time.perf_counter()
+        self.placed.set()
+        return super().place_order(price, qty, code, *args, **kwargs)
+
+
+@register_benchmark('tick_to_order')
+def bench_tick_to_order(quick: bool) -> Metrics:
+    """
+    Time from a breakout tick entering the simulator to AutomatedTrading's
+    order reaching the trade context, one strategy per symbol.
+    """
+    symbols = _codes(10 if quick else 50)
+    market = _watchlist_market(symbols)
+    trade_ctx = _TimedTradeContext(market)
+    samples = []
+    with simulated_api(market, trade_ctx=trade_ctx) as api:
+        trading = AutomatedTrading(api, None)
+        for symbol in symbols:
+            trading.execute_strategy({'name': f'breakout-{symbol}', 'type': 'BreakoutBuy',
+                                      'symbol': symbol, 'n_days': 20, 'quantity': 1})
+        for symbol in symbols:
+            breakout = float(market.history(symbol)['high'].max()) * 1.05
+            trade_ctx.placed.clear()
+            start = time.perf_counter()
+            market.tick(symbol, breakout, 100, '2026-10-19 09:30:00')
+            if trade_ctx.placed.wait(5):
+                samples.append(trade_ctx.placed_at - start)
+        trading.shutdown()
+
+    if len(samples) < len(symbols):
+        logger.warning(f"Only {len(samples)} of {len(symbols)} breakouts placed an order")
+    return latency_metrics(samples)
+
+
+@register_benchmark('backtest_sweep')
+def bench_backtest_sweep(quick: bool) -> Metrics:
+    """Moving-average crossover parameter sweep over ten years of daily bars per symbol"""
+    bars = {code: synthetic_bars(2_500, seed=i) for i, code in enumerate(_codes(2 if quick else 10))}
+    grid = {'short_ma': range(2, 42), 'long_ma': range(20, 270, 5 if quick else 1)}
+    backtester = Backtester()
+    start = time.perf_counter()
+    results = backtester.sweep({'type': 'MovingAverageCrossover', 'quantity': 1}, grid, bars)
+    return {'runs_per_s': metric(len(results) / (time.perf_counter() - start), 'runs/s')}
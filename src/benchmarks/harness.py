@@ -0,0 +1,177 @@
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import json
+import logging
+import math
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Relative change beyond which a metric counts as a regression
+DEFAULT_TOLERANCE = 0.10
+
+HIGHER = 'higher'
+LOWER = 'lower'
+
+# A benchmark returns its metrics by name; each is made with metric()
+Metrics = Dict[str, Dict[str, Any]]
+BenchmarkFunc = Callable[[bool], Metrics]
+
+# Benchmark name to the function running it, in registration order
+BENCHMARKS: Dict[str, BenchmarkFunc] = {}
+
+logger = logging.getLogger('Benchmarks')
+
+
+def register_benchmark(name: str) -> Callable[[BenchmarkFunc], BenchmarkFunc]:
+    """Decorator adding a benchmark to BENCHMARKS; it is called as func(quick)"""
+    def register(func: BenchmarkFunc) -> BenchmarkFunc:
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def metric(value: float, unit: str, better: str = HIGHER) -> Dict[str, Any]:
+    """One measured value and whether a higher or a lower value is an improvement"""
+    return {'value': float(value), 'unit': unit, 'better': better}
+
+
+def time_calls(func: Callable[[], Any], number: int) -> float:
+    """Seconds taken by `number` calls of func"""
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+def best_rate(func: Callable[[], Any], number: int, repeat: int = 3) -> float:
+    """Calls per second of the fastest of `repeat` rounds of `number` calls"""
+    return number / min(time_calls(func, number) for _ in range(repeat))
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """The q-th percentile (0-100) of samples, by nearest rank"""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def latency_metrics(samples: List[float], prefix: str = '') -> Metrics:
+    """p50, p95 and max of latency samples given in seconds, reported in milliseconds"""
+    return {
+        f'{prefix}p50_ms': metric(percentile(samples, 50) * 1000, 'ms', LOWER),
+        f'{prefix}p95_ms': metric(percentile(samples, 95) * 1000, 'ms', LOWER),
+        f'{prefix}max_ms': metric(max(samples) * 1000, 'ms', LOWER),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, timeout=5).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(names: Optional[Iterable[str]] = None, quick: bool = False) -> Dict[str, Any]:
+    """
+    Run the registered benchmarks, all of them if `names` is None.
+
+    Args:
+        names (Optional[Iterable[str]]): Benchmarks to run
+        quick (bool): Use small inputs, e.g. for a smoke test
+
+    Returns:
+        Dict[str, Any]: {'meta': {...}, 'results': {benchmark: {metric: {...}}}}
+
+    Raises:
+        KeyError: If a name is not registered
+    """
+    selected = list(BENCHMARKS) if names is None else list(names)
+    results = {}
+    for name in selected:
+        func = BENCHMARKS[name]
+        logger.info(f"Running benchmark {name}")
+        start = time.perf_counter()
+        results[name] = func(quick)
+        logger.info(f"Benchmark {name} took {time.perf_counter() - start:.1f}s")
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def save_results(report: Dict[str, Any], path: str):
+    """Write a run_benchmarks report as JSON"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True))
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Read a report written by save_results"""
+    return json.loads(Path(path).read_text())
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[Dict[str, Any]]:
+    """
+    Compare the metrics two reports have in common.
+
+    Args:
+        baseline (Dict[str, Any]): Earlier report
+        current (Dict[str, Any]): Report to check
+        tolerance (float): Relative worsening allowed before a metric regresses
+
+    Returns:
+        List[Dict[str, Any]]: One row per metric with 'name', 'baseline', 'current',
+        'unit', 'change' (relative, positive means better) and 'regressed'
+    """
+    rows = []
+    for name, metrics in current['results'].items():
+        old_metrics = baseline['results'].get(name, {})
+        for metric_name, new in metrics.items():
+            old = old_metrics.get(metric_name)
+            if old is None:
+                continue
+            if old['value'] == 0:
+                change = 0.0
+            else:
+                change = (new['value'] - old['value']) / abs(old['value'])
+                if new['better'] == LOWER:
+                    change = -change
+            rows.append({
+                'name': f'{name}.{metric_name}',
+                'baseline': old['value'],
+                'current': new['value'],
+                'unit': new['unit'],
+                'change': change,
+                'regressed': change < -tolerance,
+            })
+    return rows
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a report's metrics as an aligned text table"""
+    lines = []
+    for name, metrics in report['results'].items():
+        for metric_name, value in metrics.items():
+            lines.append(f"{name + '.' + metric_name:<48} {value['value']:>14.2f} {value['unit']}")
+    return '\n'.join(lines)
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Render compare() rows as an aligned text table, regressions marked"""
+    lines = []
+    for row in rows:
+        flag = '  REGRESSION' if row['regressed'] else ''
+        lines.append(f"{row['name']:<48} {row['baseline']:>12.2f} -> {row['current']:>12.2f} "
+                     f"{row['unit']:<8} {row['change']:+7.1%}{flag}")
+    return '\n'.join(lines)
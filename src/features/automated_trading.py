@@ -1,7 +1,10 @@
 from api.moomoo_api import MooMooAPI
 from api.moomoo_openD import MooMooOpenD
+from features.strategies import STRATEGIES, Strategy, create_strategy
+from features.strategy_runtime import StrategyRuntime
+from utils.metrics import traced
+from typing import List, Optional
 import logging
-import threading
 
 class AutomatedTrading:
     """
@@ -12,81 +15,53 @@ class AutomatedTrading:
         self.api = moomoo_api
         self.stream = moomoo_openD
         self.logger = logging.getLogger('AutomatedTrading')
-        self.active_strategies = []
         self.trade_records = []
+        self.runtime = StrategyRuntime(self.api, on_order=self._record_order)
 
-    def execute_strategy(self, strategy: dict):
+    @traced('automated_trading.execute_strategy', feature='automated_trading')
+    def execute_strategy(self, strategy: dict) -> bool:
         """
         Executes a trading strategy based on the provided strategy configuration.
+
+        The strategy class is looked up by strategy['type'] in the strategy
+        registry and started on the shared runtime, which routes pushed prices
+        to it; no thread or polling loop is started per strategy.
         """
         self.logger.info(f"Executing strategy: {strategy['name']}")
-        if strategy['type'] == 'BreakoutBuy':
-            threading.Thread(target=self.breakout_buy_strategy, args=(strategy,)).start()
-        elif strategy['type'] == 'MovingAverageCrossover':
-            threading.Thread(target=self.moving_average_crossover_strategy, args=(strategy,)).start()
-        else:
+        if strategy['type'] not in STRATEGIES:
             self.logger.error(f"Unknown strategy type: {strategy['type']}")
+            return False
+        return self.runtime.start(create_strategy(strategy))
 
-    def breakout_buy_strategy(self, strategy: dict):
-        """
-        Implements the Breakout Buy Strategy.
-        """
-        symbol = strategy['symbol']
-        n_days_high = self.api.get_n_days_high(symbol, strategy['n_days'])
-
-        while True:
-            real_time_price = self.api.get_real_time_price(symbol)
-            if real_time_price > n_days_high:
-                order_details = {
-                    "symbol": symbol,
-                    "quantity": strategy['quantity'],
-                    "order_type": "market",
-                    "action": "buy"
-                }
-                order_response = self.api.place_order(order_details)
-                if order_response:
-                    self.trade_records.append(order_response)
-                    self.logger.info(f"Breakout Buy order placed for {symbol}: {order_response}")
-                break
+    @property
+    def active_strategies(self) -> List[dict]:
+        """Configurations of the strategies currently running or paused"""
+        return [strategy.config for strategy in self.runtime.strategies()]
 
-    def moving_average_crossover_strategy(self, strategy: dict):
-        """
-        Implements the Moving Average Crossover Strategy.
-        """
-        symbol = strategy['symbol']
-        short_ma_period = strategy['short_ma']
-        long_ma_period = strategy['long_ma']
+    def pause_strategy(self, name: str):
+        """Pauses a running strategy, keeping its state"""
+        self.runtime.pause(name)
 
-        short_ma = self.api.get_moving_average(symbol, short_ma_period)
-        long_ma = self.api.get_moving_average(symbol, long_ma_period)
+    def resume_strategy(self, name: str):
+        """Resumes a paused strategy"""
+        self.runtime.resume(name)
 
-        while True:
-            real_time_price = self.api.get_real_time_price(symbol)
-            new_short_ma = self.api.get_moving_average(symbol, short_ma_period)
-            new_long_ma = self.api.get_moving_average(symbol, long_ma_period)
+    def stop_strategy(self, name: str):
+        """Stops a strategy and releases its subscription"""
+        self.runtime.stop(name)
 
-            if new_short_ma > new_long_ma and short_ma <= long_ma:
-                order_details = {
-                    "symbol": symbol,
-                    "quantity": strategy['quantity'],
-                    "order_type": "limit",
-                    "action": "buy",
-                    "limit_price": real_time_price
-                }
-                order_response = self.api.place_order(order_details)
-                if order_response:
-                    self.trade_records.append(order_response)
-                    self.logger.info(f"Moving Average Crossover order placed for {symbol}: {order_response}")
-                break
+    def shutdown(self, wait: bool = True):
+        """Stops all strategies and waits for pending orders to be placed"""
+        self.runtime.shutdown(wait=wait)
 
-            short_ma = new_short_ma
-            long_ma = new_long_ma
+    def _record_order(self, strategy: Strategy, order_response):
+        if order_response:
+            self.trade_records.append(order_response)
+            self.logger.info(f"{strategy.label} order placed for {strategy.symbol}: {order_response}")
 
-    def monitor_orders(self):
+    def open_orders(self, symbol: Optional[str] = None) -> List[dict]:
         """
-        Monitors the status of placed orders.
+        Returns the open orders as last pushed by OpenD, without a request.
+        Strategies react to status changes of their own orders in on_order.
         """
-        for order in self.trade_records:
-            status = self.api.get_order_status(order['order_id'])
-            self.logger.debug(f"Order {order['order_id']} status: {status}")
-            # Update order records based on status
+        return self.api.orders.open_orders(symbol)
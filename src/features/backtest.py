@@ -0,0 +1,239 @@
+from concurrent.futures import ProcessPoolExecutor
+from moomoo import TrdSide
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import itertools
+import logging
+import numpy as np
+import pandas as pd
+
+# Parameter combinations evaluated per process task
+DEFAULT_CHUNK_SIZE = 500
+
+# Below this many combinations a sweep runs in-process; a pool costs more than it saves
+MIN_PARALLEL_RUNS = 2_000
+
+# Bar columns as contiguous arrays, plus a per-symbol cache shared by the kernels
+Bars = Dict[str, np.ndarray]
+# Returns (bar index, fill price) of the entry, None if the strategy never fires
+EntryFunc = Callable[[dict, Bars, dict], Optional[Tuple[int, float]]]
+
+# Strategy type name (the 'type' of a strategy config) to its vectorized entry rule
+BACKTESTS: Dict[str, EntryFunc] = {}
+
+
+def register_backtest(type_name: str) -> Callable[[EntryFunc], EntryFunc]:
+    """Decorator adding the entry rule of a strategy type to BACKTESTS"""
+    def register(func: EntryFunc) -> EntryFunc:
+        BACKTESTS[type_name] = func
+        return func
+    return register
+
+
+def bars_to_arrays(bars: pd.DataFrame) -> Bars:
+    """Daily bars (request_history_kline layout, oldest first) as float64 arrays"""
+    arrays = {column: np.ascontiguousarray(bars[column], dtype=np.float64)
+              for column in ('open', 'high', 'low', 'close')}
+    arrays['time_key'] = bars['time_key'].astype(str).to_numpy()
+    return arrays
+
+
+def _sma(close: np.ndarray, period: int, cache: dict) -> np.ndarray:
+    """Simple moving average per bar, NaN until `period` closes were seen"""
+    key = ('sma', period)
+    if key not in cache:
+        if 'cumsum' not in cache:
+            cache['cumsum'] = np.concatenate([[0.0], np.cumsum(close)])
+        cumsum = cache['cumsum']
+        sma = np.full(len(close), np.nan)
+        sma[period - 1:] = (cumsum[period:] - cumsum[:-period]) / period
+        cache[key] = sma
+    return cache[key]
+
+
+def _prior_high(high: np.ndarray, period: int, cache: dict) -> np.ndarray:
+    """Highest high of the `period` bars before each bar, NaN for the first `period` bars"""
+    key = ('prior_high', period)
+    if key not in cache:
+        cache[key] = pd.Series(high).rolling(period).max().shift(1).to_numpy()
+    return cache[key]
+
+
+@register_backtest('BreakoutBuy')
+def _breakout_entry(config: dict, bars: Bars, cache: dict) -> Optional[Tuple[int, float]]:
+    """
+    Buys on the first bar trading above the high of the `n_days` bars before
+    it, at the breakout level, or at the open when the bar gaps above it.
+    """
+    n_days = config['n_days']
+    if len(bars['high']) <= n_days:
+        return None
+    level = _prior_high(bars['high'], n_days, cache)
+    hits = bars['high'][n_days:] > level[n_days:]
+    if not hits.any():
+        return None
+    index = n_days + int(np.argmax(hits))
+    return index, max(bars['open'][index], level[index])
+
+
+@register_backtest('MovingAverageCrossover')
+def _crossover_entry(config: dict, bars: Bars, cache: dict) -> Optional[Tuple[int, float]]:
+    """
+    Buys at the close of the first bar whose short average closes above the
+    long one after being at or below it on the bar before.
+    """
+    short_ma, long_ma = config['short_ma'], config['long_ma']
+    close = bars['close']
+    if len(close) <= long_ma:
+        return None
+    short, long = _sma(close, short_ma, cache), _sma(close, long_ma, cache)
+    # NaN compares False, so bars before both averages are seeded never cross
+    crossed = (short[1:] > long[1:]) & (short[:-1] <= long[:-1])
+    if not crossed.any():
+        return None
+    index = 1 + int(np.argmax(crossed))
+    return index, close[index]
+
+
+def _evaluate(config: dict, bars: Bars, cache: dict) -> Dict[str, Any]:
+    """Run one strategy config over one symbol's bars"""
+    close = bars['close']
+    result = {
+        'symbol': config.get('symbol'),
+        'name': config.get('name'),
+        'filled': False,
+        'fill_time': None,
+        'fill_price': np.nan,
+        'quantity': 0,
+        'last_price': close[-1] if len(close) else np.nan,
+        'pnl': 0.0,
+        'return_pct': 0.0,
+        'max_drawdown': 0.0,
+    }
+    entry = BACKTESTS[config['type']](config, bars, cache)
+    if entry is None:
+        return result
+
+    index, price = entry
+    quantity = config['quantity']
+    # Marked to market at every close from the entry bar on; the strategies
+    # hold what they bought, so the last close sets the P&L
+    equity = (close[index:] - price) * quantity
+    peak = np.maximum.accumulate(np.concatenate([[0.0], equity]))[1:]
+    result.update(
+        filled=True,
+        fill_time=bars['time_key'][index],
+        fill_price=float(price),
+        quantity=quantity,
+        pnl=float(equity[-1]),
+        return_pct=float((close[-1] / price - 1) * 100),
+        max_drawdown=float((peak - equity).max()),
+    )
+    return result
+
+
+def _run_chunk(bars: Bars, configs: List[dict]) -> List[Dict[str, Any]]:
+    """Process-pool task: many configs over one symbol, sharing its averages and highs"""
+    cache: dict = {}
+    return [_evaluate(config, bars, cache) for config in configs]
+
+
+def parameter_grid(grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Every combination of the values in `grid`, as parameter dicts"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+class Backtester:
+    """
+    Replays the built-in strategies over historical daily bars.
+
+    Takes the same config dicts as AutomatedTrading.execute_strategy. Each
+    strategy type is evaluated as array operations over the whole history
+    instead of bar by bar, and parameter sweeps over many symbols are spread
+    across a process pool.
+    """
+
+    def __init__(self, moomoo_api=None, processes: Optional[int] = None):
+        """
+        Args:
+            moomoo_api (Optional[MooMooAPI]): Source of history for load_bars
+            processes (Optional[int]): Pool size for sweeps, the CPU count if None
+        """
+        self.api = moomoo_api
+        self.processes = processes
+        self.logger = logging.getLogger('Backtester')
+
+    def load_bars(self, symbols: List[str], num: int) -> Dict[str, pd.DataFrame]:
+        """Fetch the latest `num` daily bars of each symbol, skipping those without history"""
+        bars = {}
+        for symbol in symbols:
+            history = self.api.get_historical_k_lines(symbol, num)
+            if history is None or history.empty:
+                self.logger.error(f"No history to backtest {symbol}")
+                continue
+            bars[symbol] = history
+        return bars
+
+    def run(self, config: dict, bars: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Backtest one strategy config over `bars`.
+
+        Returns:
+            Dict[str, Any]: symbol, name, filled, fill_time, fill_price, quantity,
+            last_price, pnl, return_pct, max_drawdown and the list of fills
+        """
+        if config['type'] not in BACKTESTS:
+            raise ValueError(f"No backtest for strategy type: {config['type']}")
+        result = _evaluate(config, bars_to_arrays(bars), {})
+        result['fills'] = [{
+            'time_key': result['fill_time'],
+            'price': result['fill_price'],
+            'qty': result['quantity'],
+            'trd_side': TrdSide.BUY,
+        }] if result['filled'] else []
+        return result
+
+    def sweep(self,
+              base_config: dict,
+              grid: Dict[str, Sequence[Any]],
+              bars: Dict[str, pd.DataFrame],
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+        """
+        Backtest every parameter combination of `grid` on every symbol.
+
+        Args:
+            base_config (dict): Strategy config the grid values are laid over;
+                needs at least 'type' and any parameter not in the grid
+            grid (Dict[str, Sequence[Any]]): Parameter name to the values to try
+            bars (Dict[str, pd.DataFrame]): Daily bars per symbol
+            chunk_size (int): Combinations per process task
+
+        Returns:
+            pd.DataFrame: One row per symbol and combination, with the grid
+            parameters as columns next to the run() fields (without fills)
+        """
+        if base_config['type'] not in BACKTESTS:
+            raise ValueError(f"No backtest for strategy type: {base_config['type']}")
+        combinations = parameter_grid(grid)
+        tasks = []
+        for symbol, symbol_bars in bars.items():
+            arrays = bars_to_arrays(symbol_bars)
+            configs = [dict(base_config, **params, symbol=symbol,
+                            name=f"{base_config['type']}-{symbol}-{i}")
+                       for i, params in enumerate(combinations)]
+            for start in range(0, len(configs), chunk_size):
+                tasks.append((arrays, configs[start:start + chunk_size]))
+
+        runs = len(combinations) * len(bars)
+        self.logger.info(f"Backtesting {runs} runs of {base_config['type']} on {len(bars)} symbols")
+        if self.processes == 1 or runs < MIN_PARALLEL_RUNS or len(tasks) == 1:
+            chunks = [_run_chunk(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.processes) as pool:
+                chunks = list(pool.map(_run_chunk, *zip(*tasks)))
+
+        rows = []
+        for (_, configs), results in zip(tasks, chunks):
+            for config, result in zip(configs, results):
+                rows.append(dict({name: config[name] for name in grid}, **result))
+        return pd.DataFrame(rows)
@@ -1,18 +1,40 @@
 from api.moomoo_api import MooMooAPI
 from api.moomoo_openD import MooMooOpenD
+from api.async_api import AsyncMooMooAPI
+from api.cache import TTLCache
 from utils.data_processing import process_market_data
+from utils.indicators import SMA
+from utils.sentiment import SentimentScorer, shared_scorer
+from utils.metrics import traced
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+import asyncio
 import logging
 
+# Symbols whose seeded moving averages are kept in memory
+MOVING_AVERAGE_SYMBOLS = 4096
+
+# Threads fetching moving averages and news for analyze_stocks
+BATCH_WORKERS = 8
+
 class CompanyFeedback:
     """
     Provides investment recommendations (Buy/Sell/Hold) based on comprehensive stock analysis.
     """
 
-    def __init__(self, moomoo_api: MooMooAPI, moomoo_openD: MooMooOpenD):
+    def __init__(self, moomoo_api: MooMooAPI, moomoo_openD: MooMooOpenD,
+                 async_api: Optional[AsyncMooMooAPI] = None,
+                 scorer: Optional[SentimentScorer] = None):
         self.api = moomoo_api
         self.stream = moomoo_openD
+        self._async_api = async_api
+        # Shared with TodaysSentiment by default, so each article is scored once
+        self.scorer = scorer or shared_scorer()
         self.logger = logging.getLogger('CompanyFeedback')
+        # symbol -> {'bar_date': 'YYYY-MM-DD', 'averages': {period: SMA}}
+        self._moving_averages = TTLCache(maxsize=MOVING_AVERAGE_SYMBOLS)
 
+    @traced('company_feedback.analyze_stock', feature='company_feedback')
     def analyze_stock(self, symbol: str) -> str:
         """
         Analyzes the stock and returns a recommendation: Buy, Sell, or Hold.
@@ -22,11 +44,95 @@ class CompanyFeedback:
         if not quote:
             self.logger.error(f"No data available for symbol: {symbol}")
             return "Hold"
+        self.update_moving_averages(symbol, quote)
 
-        # Example simplified analysis logic
-        price = quote.get('current_price')
         moving_average = self.calculate_moving_average(symbol)
         sentiment = self.analyze_news_sentiment(symbol)
+        return self._recommend(symbol, quote, moving_average, sentiment)
+
+    def analyze_stocks(self, symbols: List[str], max_workers: int = BATCH_WORKERS) -> Iterator[Tuple[str, str]]:
+        """
+        Analyzes a watchlist, yielding (symbol, recommendation) as each symbol completes.
+
+        Quotes for the whole watchlist are fetched with one batched request
+        while the moving averages and news of every symbol are fetched
+        concurrently. Identical requests already in flight from other callers
+        are shared through the API's single-flight group instead of repeated.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return
+        self.logger.info(f"Analyzing {len(symbols)} stocks")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='CompanyFeedback') as pool:
+            fetches = {pool.submit(self.api.get_stock_quotes, symbols): (None, 'quotes')}
+            for symbol in symbols:
+                fetches[pool.submit(self.calculate_moving_average, symbol)] = (symbol, 'moving_average')
+                fetches[pool.submit(self.analyze_news_sentiment, symbol)] = (symbol, 'sentiment')
+
+            parts: Dict[str, dict] = {symbol: {} for symbol in symbols}
+            quotes, have_quotes = None, False
+            for future in as_completed(fetches):
+                symbol, kind = fetches[future]
+                try:
+                    value = future.result()
+                except Exception as e:
+                    self.logger.error(f"Error fetching {kind} for {symbol or 'watchlist'}: {str(e)}")
+                    value = None
+                if kind == 'quotes':
+                    quotes, have_quotes = value, True
+                    ready = [symbol for symbol in symbols if len(parts[symbol]) == 2]
+                else:
+                    parts[symbol][kind] = value
+                    ready = [symbol] if have_quotes and len(parts[symbol]) == 2 else []
+                for symbol in ready:
+                    yield symbol, self._recommend_from_batch(symbol, quotes, parts[symbol])
+
+    def _recommend_from_batch(self, symbol: str, quotes, parts: dict) -> str:
+        if quotes is None or symbol not in quotes.index:
+            self.logger.error(f"No data available for symbol: {symbol}")
+            return "Hold"
+        quote = dict(quotes.loc[symbol].to_dict(), code=symbol)
+        # The average was read alongside the quote, so it does not include it yet
+        self.update_moving_averages(symbol, quote)
+        return self._recommend(symbol, quote, parts['moving_average'] or 0,
+                               parts['sentiment'] or "Neutral")
+
+    @property
+    def async_api(self) -> AsyncMooMooAPI:
+        """The AsyncMooMooAPI used by the async entry points, created on first use"""
+        if self._async_api is None:
+            self._async_api = AsyncMooMooAPI(self.api)
+        return self._async_api
+
+    @traced('company_feedback.analyze_stock_async', feature='company_feedback')
+    async def analyze_stock_async(self, symbol: str) -> str:
+        """
+        Awaitable analyze_stock: the quote, moving average and news lookups
+        run concurrently instead of one after another.
+        """
+        self.logger.info(f"Analyzing stock: {symbol}")
+        quote, moving_average, sentiment = await asyncio.gather(
+            self.async_api.get_stock_quote(symbol),
+            self.async_api.call('kline', self.calculate_moving_average, symbol),
+            self.async_api.call('news', self.analyze_news_sentiment, symbol),
+        )
+        if not quote:
+            self.logger.error(f"No data available for symbol: {symbol}")
+            return "Hold"
+        # The average was read alongside the quote, so it does not include it yet
+        self.update_moving_averages(symbol, quote)
+        return self._recommend(symbol, quote, moving_average, sentiment)
+
+    @traced('company_feedback.analyze_stocks_async', feature='company_feedback')
+    async def analyze_stocks_async(self, symbols: List[str]) -> Dict[str, str]:
+        """Analyzes a watchlist concurrently and returns the recommendation per symbol"""
+        symbols = list(dict.fromkeys(symbols))
+        recommendations = await asyncio.gather(*(self.analyze_stock_async(symbol) for symbol in symbols))
+        return dict(zip(symbols, recommendations))
+
+    def _recommend(self, symbol: str, quote: dict, moving_average: float, sentiment: str) -> str:
+        # Example simplified analysis logic; OpenD snapshots carry last_price
+        price = quote.get('last_price', quote.get('current_price'))
 
         if price > moving_average and sentiment == "Positive":
             recommendation = "Buy"
@@ -41,33 +147,52 @@ class CompanyFeedback:
     def calculate_moving_average(self, symbol: str, period: int = 20) -> float:
         """
         Calculates the moving average for the given symbol and period.
+
+        The average is seeded from daily K-line history on first use and then
+        kept current by update_moving_averages, so later calls are a memory read.
         """
-        # Placeholder for moving average calculation
-        historical_data = self.api.get_historical_k_lines(symbol, period)
-        if not historical_data:
-            return 0
-        prices = [day['close'] for day in historical_data]
-        moving_average = sum(prices) / len(prices)
+        state = self._moving_averages.get(symbol)
+        average = state['averages'].get(period) if state else None
+        if average is None:
+            historical_data = self.api.get_historical_k_lines(symbol, period)
+            if historical_data is None or len(historical_data) < period:
+                return 0
+            average = SMA(period).seed(historical_data['close'])
+            if state is None:
+                state = {'bar_date': historical_data['time_key'].iloc[-1][:10], 'averages': {}}
+                self._moving_averages.set(symbol, state)
+            state['averages'][period] = average
+        moving_average = average.value
         self.logger.debug(f"{period}-day moving average for {symbol}: {moving_average}")
         return moving_average
 
+    def update_moving_averages(self, symbol: str, quote: dict):
+        """
+        Feeds a quote into the seeded moving averages of `symbol`: a quote from
+        the day of the latest bar revises that bar, a later one starts a new bar.
+        """
+        state = self._moving_averages.get(symbol)
+        price = quote.get('last_price')
+        quote_date = str(quote.get('update_time', ''))[:10]
+        if state is None or price is None or not quote_date:
+            return
+        if quote_date == state['bar_date']:
+            for average in state['averages'].values():
+                average.amend(price)
+        elif quote_date > state['bar_date']:
+            for average in state['averages'].values():
+                average.update(price)
+            state['bar_date'] = quote_date
+
     def analyze_news_sentiment(self, symbol: str) -> str:
         """
-        Analyzes news sentiment for the given symbol.
+        Analyzes news sentiment for the given symbol from the weighted lexicon
+        score of its articles; articles scored before are not scanned again.
         """
         news = self.api.get_company_news(symbol)
         if not news:
             return "Neutral"
 
-        positive = sum(1 for article in news if "bullish" in article['title'].lower())
-        negative = sum(1 for article in news if "bearish" in article['title'].lower())
-
-        if positive > negative:
-            sentiment = "Positive"
-        elif negative > positive:
-            sentiment = "Negative"
-        else:
-            sentiment = "Neutral"
-
+        sentiment = self.scorer.sentiment(news)
         self.logger.debug(f"News sentiment for {symbol}: {sentiment}")
         return sentiment
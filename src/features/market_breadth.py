@@ -0,0 +1,140 @@
+from api.moomoo_api import MooMooAPI
+from api.scheduler import Priority
+from moomoo import SubType
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import math
+import threading
+
+# Snapshot columns holding the 52-week range a new high or low is measured against
+HIGH_52W_COLUMN = 'highest52weeks_price'
+LOW_52W_COLUMN = 'lowest52weeks_price'
+
+
+def _number(value) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+class MarketBreadth:
+    """
+    Market breadth over a fixed universe, kept current from pushed quotes.
+
+    Each code's last contribution (advancing, declining or unchanged; at a
+    52-week high or low; turnover and turnover-weighted change) is stored,
+    so a push replaces it in O(1) and reading the breadth never touches the
+    network or scans the universe.
+    """
+
+    def __init__(self, moomoo_api: MooMooAPI, universe: List[str]):
+        """
+        Args:
+            moomoo_api (MooMooAPI): API used to seed the universe and subscribe to it
+            universe (List[str]): Codes the breadth is measured over
+        """
+        self.api = moomoo_api
+        self.universe = list(dict.fromkeys(universe))
+        self.logger = logging.getLogger('MarketBreadth')
+        self._lock = threading.Lock()
+        self._subscribed = False
+        # code -> (52-week high, 52-week low) from the seeding snapshot
+        self._ranges: Dict[str, Tuple[Optional[float], Optional[float]]] = {}
+        # code -> (direction, new_high, new_low, turnover, turnover * change_pct)
+        self._state: Dict[str, Tuple[int, bool, bool, float, float]] = {}
+        self._counts = {1: 0, 0: 0, -1: 0}
+        self._new_highs = 0
+        self._new_lows = 0
+        self._turnover = 0.0
+        self._weighted_change = 0.0
+
+    def start(self) -> bool:
+        """Seed from one snapshot of the universe, then follow its quote pushes"""
+        if not self.refresh():
+            return False
+        if not self._subscribed:
+            self._subscribed = self.api.subscriptions.subscribe(self.universe, self.on_quote, SubType.QUOTE)
+            if not self._subscribed:
+                self.logger.error(f"Could not subscribe to the {len(self.universe)} codes of the universe")
+        return self._subscribed
+
+    def stop(self):
+        """Stop following pushes; the last breadth stays readable"""
+        if self._subscribed:
+            self.api.subscriptions.unsubscribe(self.universe, self.on_quote, SubType.QUOTE)
+            self._subscribed = False
+
+    def refresh(self) -> bool:
+        """
+        Rebuild every counter from a fresh snapshot of the universe, e.g. at the
+        session open or after a reconnect. Costs one snapshot request per 400 codes.
+        """
+        snapshots = self.api.get_market_snapshot(self.universe, priority=Priority.ANALYTICS)
+        if snapshots is None:
+            self.logger.error("Failed to snapshot the breadth universe")
+            return False
+        with self._lock:
+            self._state.clear()
+            self._counts = {1: 0, 0: 0, -1: 0}
+            self._new_highs = self._new_lows = 0
+            self._turnover = self._weighted_change = 0.0
+            for row in snapshots.to_dict('records'):
+                self._ranges[row['code']] = (_number(row.get(HIGH_52W_COLUMN)), _number(row.get(LOW_52W_COLUMN)))
+                self._apply_locked(row['code'], row)
+        self.logger.debug(f"Seeded breadth from {len(snapshots)} snapshots")
+        return True
+
+    def on_quote(self, symbol: str, price: float, row: Dict[str, Any]):
+        """Subscription callback: replace the contribution of `symbol`"""
+        with self._lock:
+            self._apply_locked(symbol, row)
+
+    def _apply_locked(self, code: str, row: Dict[str, Any]):
+        last = _number(row.get('last_price'))
+        prev_close = _number(row.get('prev_close_price'))
+        if last is None or not prev_close:
+            return
+        high, low = self._ranges.get(code, (None, None))
+        turnover = _number(row.get('turnover'))
+        if turnover is None:
+            turnover = (_number(row.get('volume')) or 0.0) * last
+        change = (last - prev_close) / prev_close * 100
+        state = ((last > prev_close) - (last < prev_close),
+                 high is not None and last >= high,
+                 low is not None and last <= low,
+                 turnover,
+                 turnover * change)
+
+        old = self._state.get(code)
+        if old is not None:
+            self._counts[old[0]] -= 1
+            self._new_highs -= old[1]
+            self._new_lows -= old[2]
+            self._turnover -= old[3]
+            self._weighted_change -= old[4]
+        self._state[code] = state
+        self._counts[state[0]] += 1
+        self._new_highs += state[1]
+        self._new_lows += state[2]
+        self._turnover += state[3]
+        self._weighted_change += state[4]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        The current breadth: advancing, declining and unchanged counts, new
+        52-week highs and lows, and the turnover-weighted average change in percent.
+        """
+        with self._lock:
+            advancing, declining = self._counts[1], self._counts[-1]
+            return {
+                'advancing': advancing,
+                'declining': declining,
+                'unchanged': self._counts[0],
+                'new_highs': self._new_highs,
+                'new_lows': self._new_lows,
+                'volume_weighted_change': self._weighted_change / self._turnover if self._turnover > 0 else 0.0,
+                'advancing_declining_ratio': {'advancing': advancing, 'declining': declining},
+                'tracked': len(self._state),
+            }
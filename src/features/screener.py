@@ -0,0 +1,112 @@
+from typing import Dict, Iterable, Optional, Tuple, Union
+import logging
+import numpy as np
+import pandas as pd
+
+# A rule is either a minimum (the original preference format) or a
+# (low, high) range keeping low <= value < high; either bound may be None.
+Rule = Union[float, Tuple[Optional[float], Optional[float]]]
+Rules = Dict[str, Rule]
+
+
+def rule_bounds(rule: Rule) -> Tuple[Optional[float], Optional[float]]:
+    """Return a rule as (low, high), either of which may be None"""
+    if isinstance(rule, (tuple, list)):
+        low, high = rule
+        return low, high
+    return rule, None
+
+
+class UniverseScreener:
+    """
+    Screens a stock universe held as columns instead of per-stock dicts.
+
+    Each rule becomes one vectorized comparison over a whole column, and
+    comparisons are shared between all profiles screened in the same pass.
+    Missing values count as 0, like `stock.get(key, 0)` did.
+    """
+
+    def __init__(self, universe: Union[pd.DataFrame, Iterable[dict]]):
+        """
+        Args:
+            universe: A DataFrame or an iterable of stock dicts, one row per stock
+        """
+        if isinstance(universe, pd.DataFrame):
+            self.frame = universe.reset_index(drop=True)
+        else:
+            self.frame = pd.DataFrame.from_records(list(universe))
+        self.logger = logging.getLogger('UniverseScreener')
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a column as float64 with missing values as 0, converted once"""
+        values = self._columns.get(name)
+        if values is None:
+            if name in self.frame:
+                values = pd.to_numeric(self.frame[name], errors='coerce').to_numpy(dtype='float64')
+                values = np.nan_to_num(values, nan=0.0)
+            else:
+                values = np.zeros(len(self.frame))
+            self._columns[name] = values
+        return values
+
+    def mask(self, rules: Rules, _predicates: Optional[Dict] = None) -> np.ndarray:
+        """Return a boolean mask of the stocks meeting every rule"""
+        predicates = {} if _predicates is None else _predicates
+        selected = np.ones(len(self.frame), dtype=bool)
+        for name, rule in rules.items():
+            key = (name,) + rule_bounds(rule)
+            predicate = predicates.get(key)
+            if predicate is None:
+                low, high = key[1], key[2]
+                values = self.column(name)
+                predicate = np.ones(len(values), dtype=bool)
+                if low is not None:
+                    predicate &= values >= low
+                if high is not None:
+                    predicate &= values < high
+                predicates[key] = predicate
+            selected &= predicate
+        return selected
+
+    def _select(self, mask: np.ndarray, sort_by: Optional[str], ascending: bool,
+                top_n: Optional[int]) -> pd.DataFrame:
+        indices = np.flatnonzero(mask)
+        if sort_by is not None and len(indices):
+            keys = self.column(sort_by)[indices]
+            if not ascending:
+                keys = -keys
+            if top_n is not None and top_n < len(indices):
+                # Only the top N need ordering
+                partial = np.argpartition(keys, top_n - 1)[:top_n]
+                indices = indices[partial[np.argsort(keys[partial], kind='stable')]]
+            else:
+                indices = indices[np.argsort(keys, kind='stable')]
+        elif top_n is not None:
+            indices = indices[:top_n]
+        return self.frame.iloc[indices]
+
+    def screen(self, rules: Rules, sort_by: Optional[str] = None, ascending: bool = False,
+               top_n: Optional[int] = None) -> pd.DataFrame:
+        """
+        Return the rows meeting `rules`.
+
+        Args:
+            rules (Rules): Column name to minimum or (low, high) range
+            sort_by (Optional[str]): Column to rank by
+            ascending (bool): Rank from lowest instead of highest
+            top_n (Optional[int]): Keep only the first N rows after ranking
+        """
+        return self._select(self.mask(rules), sort_by, ascending, top_n)
+
+    def screen_many(self, profiles: Dict[str, Rules], sort_by: Optional[str] = None,
+                    ascending: bool = False, top_n: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+        """Screen several profiles in one pass, evaluating each distinct rule once"""
+        predicates: Dict = {}
+        return {
+            name: self._select(self.mask(rules, predicates), sort_by, ascending, top_n)
+            for name, rules in profiles.items()
+        }
@@ -1,10 +1,16 @@
 from src.api.moomoo_api import MooMooAPI
+from src.features.screener import UniverseScreener, rule_bounds
 from src.utils.data_processing import process_market_data
+from utils.metrics import traced
+from typing import Dict, List, Optional
 import logging
 
 class StockRecommendation:
     """
     Screens and recommends stocks based on predefined investment preferences and selection principles.
+
+    Preference rules map a field to a minimum, or to a (low, high) range
+    keeping low <= value < high with None for an open end.
     """
 
     def __init__(self, moomoo_api: MooMooAPI):
@@ -12,34 +18,60 @@ class StockRecommendation:
         self.logger = logging.getLogger('StockRecommendation')
         self.preferences = {
             "Growth": {"revenue_growth": 20, "profit_growth": 20},
-            "Value": {"pe_ratio": 20, "pb_ratio": 3}
+            "Value": {"pe_ratio": (0, 20), "pb_ratio": (0, 3)}
             # Add more preferences as needed
         }
 
-    def recommend_stocks(self, preference: str = "Growth") -> list:
+    def _load_universe(self) -> Optional[UniverseScreener]:
+        market_stocks = self.api.get_market_stock_list()
+        if market_stocks is None or len(market_stocks) == 0:
+            self.logger.error("Failed to retrieve market stock list.")
+            return None
+        return UniverseScreener(market_stocks)
+
+    def recommend_stocks(self, preference: str = "Growth", sort_by: Optional[str] = None,
+                         top_n: Optional[int] = None) -> list:
         """
         Recommends a list of stocks based on the specified investment preference.
+
+        Args:
+            preference (str): Name of the preference profile
+            sort_by (Optional[str]): Field to rank the matches by, highest first
+            top_n (Optional[int]): Keep only the N best ranked matches
         """
-        self.logger.info(f"Generating stock recommendations based on {preference} preference.")
-        market_stocks = self.api.get_market_stock_list()
-        if not market_stocks:
-            self.logger.error("Failed to retrieve market stock list.")
-            return []
+        return self.recommend_many([preference], sort_by=sort_by, top_n=top_n)[preference]
 
-        filtered_stocks = []
-        for stock in market_stocks:
-            if self.meets_criteria(stock, preference):
-                filtered_stocks.append(stock)
+    @traced('stock_recommendation.recommend', feature='stock_recommendation')
+    def recommend_many(self, preferences: List[str], sort_by: Optional[str] = None,
+                       top_n: Optional[int] = None) -> Dict[str, list]:
+        """
+        Recommends stocks for several preferences, loading and screening the
+        market universe once for all of them.
+        """
+        self.logger.info(f"Generating stock recommendations based on {', '.join(preferences)} preferences.")
+        screener = self._load_universe()
+        if screener is None:
+            return {preference: [] for preference in preferences}
 
-        self.logger.info(f"Recommended stocks: {[stock['symbol'] for stock in filtered_stocks]}")
-        return filtered_stocks
+        profiles = {preference: self.preferences.get(preference, {}) for preference in preferences}
+        selected = screener.screen_many(profiles, sort_by=sort_by, top_n=top_n)
+        recommendations = {}
+        for preference, frame in selected.items():
+            recommendations[preference] = frame.to_dict('records')
+            symbols = frame['symbol'].tolist() if 'symbol' in frame else []
+            self.logger.info(f"Recommended stocks for {preference}: {symbols}")
+        return recommendations
 
     def meets_criteria(self, stock: dict, preference: str) -> bool:
         """
         Determines if a stock meets the criteria based on the investment preference.
         """
         criteria = self.preferences.get(preference, {})
-        for key, value in criteria.items():
-            if stock.get(key, 0) < value:
+        for key, rule in criteria.items():
+            low, high = rule_bounds(rule)
+            value = stock.get(key, 0)
+            if low is not None and value < low:
+                return False
+            if high is not None and value >= high:
                 return False
         return True
@@ -0,0 +1,131 @@
+from abc import ABC, abstractmethod
+from moomoo import TrdSide, SubType
+from utils.indicators import SMA, IndicatorSet, crossed_above
+from typing import Callable, Dict, Type
+import logging
+
+# Strategy type name (the 'type' of a strategy config) to its class
+STRATEGIES: Dict[str, Type['Strategy']] = {}
+
+
+def register_strategy(type_name: str) -> Callable[[Type['Strategy']], Type['Strategy']]:
+    """Class decorator adding a Strategy to STRATEGIES under `type_name`"""
+    def register(cls: Type['Strategy']) -> Type['Strategy']:
+        STRATEGIES[type_name] = cls
+        cls.type_name = type_name
+        return cls
+    return register
+
+
+def create_strategy(config: dict) -> 'Strategy':
+    """
+    Build the strategy described by `config`.
+
+    Raises:
+        KeyError: If config['type'] is not registered
+    """
+    return STRATEGIES[config['type']](config)
+
+
+class Strategy(ABC):
+    """
+    A trading strategy run by StrategyRuntime.
+
+    The runtime routes price events for `symbol` and `subtype` to on_price on a
+    worker thread. Events for one strategy are never delivered concurrently, so
+    strategies keep plain attributes as state.
+    """
+
+    type_name = ''
+    # Label used when logging orders
+    label = ''
+    subtype = SubType.QUOTE
+
+    def __init__(self, config: dict):
+        self.config = config
+        self.name = config['name']
+        self.symbol = config['symbol']
+        self.runtime = None
+        self.logger = logging.getLogger(type(self).__name__)
+
+    def prepare(self, api) -> bool:
+        """Seed state before the first event; returning False keeps the strategy from starting"""
+        return True
+
+    @abstractmethod
+    def on_price(self, symbol: str, price: float, row: dict):
+        """Handle a price event for the strategy's symbol"""
+
+    def on_order(self, order: dict, old_status, new_status):
+        """Handle a status change of an order this strategy placed; paused strategies get them too"""
+
+    def buy(self, price: float, qty: int):
+        """Place a buy order through the runtime's order thread"""
+        self.runtime.submit_order(self, price, qty, TrdSide.BUY)
+
+    def sell(self, price: float, qty: int):
+        """Place a sell order through the runtime's order thread"""
+        self.runtime.submit_order(self, price, qty, TrdSide.SELL)
+
+    def finish(self):
+        """Stop receiving events once the strategy has done its job"""
+        self.runtime.finish(self)
+
+
+@register_strategy('BreakoutBuy')
+class BreakoutBuy(Strategy):
+    """Buys once when the price breaks above the high of the last `n_days` days"""
+
+    label = 'Breakout Buy'
+
+    def prepare(self, api) -> bool:
+        history = api.get_historical_k_lines(self.symbol, self.config['n_days'])
+        if history is None or history.empty:
+            self.logger.error(f"No history to compute the {self.config['n_days']}-day high for {self.symbol}")
+            return False
+        self.n_days_high = history['high'].max()
+        return True
+
+    def on_price(self, symbol: str, price: float, row: dict):
+        if price > self.n_days_high:
+            self.buy(price, self.config['quantity'])
+            self.finish()
+
+
+@register_strategy('MovingAverageCrossover')
+class MovingAverageCrossover(Strategy):
+    """
+    Buys once when the short moving average crosses above the long one.
+
+    Both averages are seeded once from daily history and then updated in
+    place from pushed daily K-lines, so each push costs O(1) and no request.
+    """
+
+    label = 'Moving Average Crossover'
+    subtype = SubType.K_DAY
+
+    def prepare(self, api) -> bool:
+        long_ma_period = self.config['long_ma']
+        history = api.get_historical_k_lines(self.symbol, long_ma_period)
+        if history is None or len(history) < long_ma_period:
+            self.logger.error(f"Not enough history to seed moving averages for {self.symbol}")
+            return False
+        self.averages = IndicatorSet(short=SMA(self.config['short_ma']), long=SMA(long_ma_period))
+        self.averages.seed(history['close'])
+        self.time_key = history['time_key'].iloc[-1]
+        self.short_ma = self.averages['short'].value
+        self.long_ma = self.averages['long'].value
+        return True
+
+    def on_price(self, symbol: str, price: float, bar: dict):
+        if bar['time_key'] == self.time_key:
+            self.averages.on_tick(price)
+        else:
+            self.averages.on_bar(price)
+            self.time_key = bar['time_key']
+        short_ma, long_ma = self.averages['short'].value, self.averages['long'].value
+        crossed = crossed_above(self.short_ma, self.long_ma, short_ma, long_ma)
+        self.short_ma, self.long_ma = short_ma, long_ma
+        if crossed:
+            self.buy(price, self.config['quantity'])
+            self.finish()
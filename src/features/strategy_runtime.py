@@ -0,0 +1,259 @@
+from api.moomoo_api import MooMooAPI
+from api.subscription import PRICE_COLUMNS
+from api.order_tracker import FINAL_STATUSES
+from features.strategies import Strategy
+from utils.metrics import traced
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import logging
+import threading
+
+# Worker threads shared by every strategy, however many are running
+DEFAULT_WORKERS = 4
+
+RUNNING = 'running'
+PAUSED = 'paused'
+STOPPED = 'stopped'
+FINISHED = 'finished'
+
+OrderCallback = Callable[[Strategy, Optional[dict]], None]
+
+
+class StrategyRuntime:
+    """
+    Runs many strategies on a fixed worker pool.
+
+    Each (symbol, subtype) is subscribed once however many strategies watch it,
+    and its pushes are routed through a symbol index to those strategies.
+    Pushes arriving while a symbol is still being processed are conflated to
+    the latest price, so a busy symbol costs one pass over its strategies per
+    worker turn instead of one per push. K-line pushes are only conflated
+    within the same bar, so no bar close is skipped.
+
+    Status changes of orders a strategy placed are delivered to its on_order
+    through the same per-symbol queue, so they never race its on_price.
+    """
+
+    def __init__(self, moomoo_api: MooMooAPI, workers: int = DEFAULT_WORKERS,
+                 on_order: Optional[OrderCallback] = None):
+        """
+        Args:
+            moomoo_api (MooMooAPI): API used for subscriptions, seeding and orders
+            workers (int): Threads running strategy callbacks
+            on_order (Optional[OrderCallback]): Called as on_order(strategy, response)
+                after each order request, on the order thread
+        """
+        self.api = moomoo_api
+        self.on_order = on_order
+        self.logger = logging.getLogger('StrategyRuntime')
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._strategies: Dict[str, Strategy] = {}
+        self._states: Dict[str, str] = {}
+        self._index: Dict[Tuple[str, str], List[Strategy]] = {}
+        self._callbacks: Dict[Tuple[str, str], Callable] = {}
+        # Queued ('price', price, row) and ('order', strategy, order, old, new) events
+        self._pending: Dict[Tuple[str, str], List[tuple]] = {}
+        # Order ID to the strategy that placed it, until the order is final
+        self._owners: Dict[str, Strategy] = {}
+        self._tracking = False
+        self._scheduled: Set[Tuple[str, str]] = set()
+        self._closed = False
+        self._workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='StrategyWorker')
+        # Orders are placed on their own thread so a slow trade request never
+        # holds up strategy evaluation
+        self._orders = ThreadPoolExecutor(max_workers=1, thread_name_prefix='StrategyOrders')
+
+    def strategies(self) -> List[Strategy]:
+        """Strategies currently running or paused"""
+        with self._lock:
+            return list(self._strategies.values())
+
+    def state(self, name: str) -> str:
+        """RUNNING, PAUSED, STOPPED or FINISHED"""
+        with self._lock:
+            return self._states.get(name, STOPPED)
+
+    def start(self, strategy: Strategy) -> bool:
+        """
+        Prepare `strategy` and route events for its symbol to it.
+
+        Returns:
+            bool: False if the name is taken, preparation failed or the symbol
+            could not be subscribed
+        """
+        with self._lock:
+            if strategy.name in self._strategies:
+                self.logger.error(f"Strategy {strategy.name} is already running")
+                return False
+        if not strategy.prepare(self.api):
+            return False
+
+        key = (strategy.symbol, strategy.subtype)
+        with self._lock:
+            if self._closed or strategy.name in self._strategies:
+                self.logger.error(f"Strategy {strategy.name} cannot be started")
+                return False
+            strategy.runtime = self
+            if not self._tracking:
+                self.api.orders.add_callback(self._on_order_update)
+                self._tracking = True
+            strategies = self._index.setdefault(key, [])
+            if not strategies:
+                callback = self._make_callback(key)
+                if not self.api.subscriptions.subscribe([strategy.symbol], callback, strategy.subtype):
+                    self.logger.error(f"Could not subscribe to {strategy.subtype} for {strategy.symbol}")
+                    del self._index[key]
+                    return False
+                self._callbacks[key] = callback
+            strategies.append(strategy)
+            self._strategies[strategy.name] = strategy
+            self._states[strategy.name] = RUNNING
+        self.logger.info(f"Started strategy {strategy.name} on {strategy.symbol}")
+        return True
+
+    def pause(self, name: str):
+        """Stop delivering events to a strategy without releasing its subscription"""
+        with self._lock:
+            if self._states.get(name) == RUNNING:
+                self._states[name] = PAUSED
+
+    def resume(self, name: str):
+        """Deliver events to a paused strategy again, starting with the next push"""
+        with self._lock:
+            if self._states.get(name) == PAUSED:
+                self._states[name] = RUNNING
+
+    def stop(self, name: str, state: str = STOPPED):
+        """Remove a strategy, unsubscribing its symbol if no other strategy uses it"""
+        with self._lock:
+            strategy = self._strategies.pop(name, None)
+            if strategy is None:
+                return
+            self._states[name] = state
+            key = (strategy.symbol, strategy.subtype)
+            strategies = self._index.get(key, [])
+            if strategy in strategies:
+                strategies.remove(strategy)
+            if not strategies:
+                self._index.pop(key, None)
+                self._pending.pop(key, None)
+                callback = self._callbacks.pop(key, None)
+                if callback is not None:
+                    self.api.subscriptions.unsubscribe([strategy.symbol], callback, strategy.subtype)
+        self.logger.info(f"Strategy {name} {state}")
+
+    def finish(self, strategy: Strategy):
+        """Stop a strategy that has completed"""
+        self.stop(strategy.name, FINISHED)
+
+    def submit_order(self, strategy: Strategy, price: float, qty: int, trd_side):
+        """Queue an order for the order thread"""
+        self._orders.submit(self._place_order, strategy, price, qty, trd_side)
+
+    @traced('automated_trading.place_order', feature='automated_trading')
+    def _place_order(self, strategy: Strategy, price: float, qty: int, trd_side):
+        try:
+            response = self.api.place_order(strategy.symbol, price, qty, trd_side)
+            if response:
+                self._own_order(strategy, response)
+            if self.on_order is not None:
+                self.on_order(strategy, response)
+        except Exception as e:
+            self.logger.error(f"Error placing order for {strategy.name}: {str(e)}")
+
+    def _own_order(self, strategy: Strategy, response: dict):
+        order_id = str(response['order_id'])
+        placed_status = response.get('order_status')
+        with self._lock:
+            self._owners[order_id] = strategy
+        # Pushes that beat the place_order response found no owner; catch up
+        # with the status the tracker has seen since
+        status = self.api.orders.status(order_id)
+        if status is not None and status != placed_status:
+            order = self.api.orders.get(order_id) or dict(response, order_status=status)
+            self._on_order_update(order, placed_status, status)
+
+    def _on_order_update(self, order: dict, old_status, new_status):
+        order_id = str(order['order_id'])
+        with self._lock:
+            strategy = self._owners.get(order_id)
+            if new_status in FINAL_STATUSES:
+                self._owners.pop(order_id, None)
+            if strategy is None or self._closed or self._strategies.get(strategy.name) is not strategy:
+                return
+            key = (strategy.symbol, strategy.subtype)
+            self._pending.setdefault(key, []).append(('order', strategy, order, old_status, new_status))
+            if key in self._scheduled:
+                return
+            self._scheduled.add(key)
+        self._workers.submit(self._drain, key)
+
+    def _make_callback(self, key: Tuple[str, str]):
+        is_bar = key[1] not in PRICE_COLUMNS
+
+        def on_push(symbol: str, price: float, row: dict):
+            with self._lock:
+                if self._closed or key not in self._index:
+                    return
+                pending = self._pending.setdefault(key, [])
+                if pending and pending[-1][0] == 'price' and (
+                        not is_bar or pending[-1][2].get('time_key') == row.get('time_key')):
+                    pending[-1] = ('price', price, row)
+                else:
+                    pending.append(('price', price, row))
+                if key in self._scheduled:
+                    return
+                self._scheduled.add(key)
+            self._workers.submit(self._drain, key)
+
+        return on_push
+
+    def _drain(self, key: Tuple[str, str]):
+        """Deliver the pending events of one key; only one worker drains a key at a time"""
+        while True:
+            with self._lock:
+                events = self._pending.pop(key, None)
+                if not events:
+                    self._scheduled.discard(key)
+                    self._idle.notify_all()
+                    return
+            for event in events:
+                if event[0] == 'order':
+                    self._deliver_order(*event[1:])
+                    continue
+                _, price, row = event
+                with self._lock:
+                    targets = [strategy for strategy in self._index.get(key, ())
+                               if self._states.get(strategy.name) == RUNNING]
+                for strategy in targets:
+                    try:
+                        strategy.on_price(key[0], price, row)
+                    except Exception as e:
+                        self.logger.error(f"Error in strategy {strategy.name}: {str(e)}")
+
+    def _deliver_order(self, strategy: Strategy, order: dict, old_status, new_status):
+        with self._lock:
+            if self._strategies.get(strategy.name) is not strategy:
+                return
+        try:
+            strategy.on_order(order, old_status, new_status)
+        except Exception as e:
+            self.logger.error(f"Error in strategy {strategy.name} order update: {str(e)}")
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until every received push has been delivered"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._scheduled, timeout)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stop every strategy and the worker and order threads. Pushes already
+        received are still delivered and their orders placed when `wait` is True.
+        """
+        with self._lock:
+            self._closed = True
+        self._workers.shutdown(wait=wait)
+        self._orders.shutdown(wait=wait)
+        for name in list(self._strategies):
+            self.stop(name)
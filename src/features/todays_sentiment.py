@@ -1,5 +1,10 @@
 from api.moomoo_api import MooMooAPI
 from api.moomoo_openD import MooMooOpenD
+from api.async_api import AsyncMooMooAPI
+from features.market_breadth import MarketBreadth
+from utils.sentiment import SentimentScorer, shared_scorer
+from utils.metrics import traced
+from typing import Dict, List, Optional
 import logging
 
 class TodaysSentiment:
@@ -7,17 +12,37 @@ class TodaysSentiment:
     Analyzes recent financial news and market data to determine the day's market sentiment.
     """
 
-    def __init__(self, moomoo_api: MooMooAPI, moomoo_openD: MooMooOpenD):
+    def __init__(self, moomoo_api: MooMooAPI, moomoo_openD: MooMooOpenD,
+                 async_api: Optional[AsyncMooMooAPI] = None,
+                 scorer: Optional[SentimentScorer] = None,
+                 breadth: Optional[MarketBreadth] = None):
         self.moomoo_api = moomoo_api
         self.moomoo_openD = moomoo_openD
+        self._async_api = async_api
+        # Started MarketBreadth over the configured universe; without one the
+        # market data sentiment is Neutral
+        self.breadth = breadth
+        # Shared with CompanyFeedback by default, so each article is scored once
+        self.scorer = scorer or shared_scorer()
         self.logger = logging.getLogger(__name__)
 
-    def evaluate_sentiment(self) -> str:
+    @property
+    def async_api(self) -> AsyncMooMooAPI:
+        """The AsyncMooMooAPI used by the async entry points, created on first use"""
+        if self._async_api is None:
+            self._async_api = AsyncMooMooAPI(self.moomoo_api)
+        return self._async_api
+
+    @traced('todays_sentiment.evaluate_sentiment', feature='todays_sentiment')
+    def evaluate_sentiment(self, symbols: Optional[List[str]] = None) -> str:
         """
         Evaluates and returns the current market sentiment: Optimistic, Neutral, or Pessimistic.
+
+        Args:
+            symbols (Optional[List[str]]): Stocks whose news make up the news sentiment
         """
         self.logger.info("Evaluating today's market sentiment.")
-        news_sentiment = self.analyze_news_sentiment()
+        news_sentiment = self.analyze_headlines(symbols or [])
         market_data_sentiment = self.analyze_market_data()
 
         if news_sentiment == "Positive" and market_data_sentiment == "Positive":
@@ -37,37 +62,78 @@ class TodaysSentiment:
             if not quote_data:
                 return f"Unable to analyze - no market data available for {symbol}"
 
-            # Basic sentiment based on price change
-            change_rate = quote_data.get('change_rate', 0)
-            if isinstance(change_rate, (int, float)):
-                if change_rate > 1:  # More than 1% up
-                    return "Strongly Positive"
-                elif change_rate > 0:
-                    return "Positive"
-                elif change_rate < -1:  # More than 1% down
-                    return "Strongly Negative"
-                elif change_rate < 0:
-                    return "Negative"
-            return "Neutral"
+            return self._classify_change(quote_data.get('change_rate', 0))
 
         except Exception as e:
             self.logger.error(f"Error analyzing sentiment: {str(e)}")
             return f"Error analyzing sentiment: {str(e)}"
 
+    def analyze_headlines(self, symbols: List[str]) -> str:
+        """
+        Positive, Negative or Neutral from the lexicon scores of the news of
+        `symbols`, scored in one batch and reusing scores cached by other features.
+        """
+        articles = []
+        for symbol in dict.fromkeys(symbols):
+            articles.extend(self.moomoo_api.get_company_news(symbol))
+        sentiment = self.scorer.sentiment(articles)
+        self.logger.debug(f"Headline sentiment over {len(articles)} articles: {sentiment}")
+        return sentiment
+
+    async def analyze_news_sentiment_async(self, symbols: List[str]) -> Dict[str, str]:
+        """
+        Analyze sentiment for several stocks, fetching their quotes in
+        concurrent batched requests instead of one call per symbol.
+        """
+        symbols = list(dict.fromkeys(symbols))
+        try:
+            quotes = await self.async_api.get_stock_quotes(symbols)
+        except Exception as e:
+            self.logger.error(f"Error analyzing sentiment: {str(e)}")
+            return {symbol: f"Error analyzing sentiment: {str(e)}" for symbol in symbols}
+
+        sentiments = {}
+        for symbol in symbols:
+            if quotes is None or symbol not in quotes.index:
+                sentiments[symbol] = f"Unable to analyze - no market data available for {symbol}"
+            else:
+                sentiments[symbol] = self._classify_change(quotes.at[symbol, 'change_rate']
+                                                           if 'change_rate' in quotes else 0)
+        return sentiments
+
+    @staticmethod
+    def _classify_change(change_rate) -> str:
+        # Basic sentiment based on price change
+        if isinstance(change_rate, (int, float)):
+            if change_rate > 1:  # More than 1% up
+                return "Strongly Positive"
+            elif change_rate > 0:
+                return "Positive"
+            elif change_rate < -1:  # More than 1% down
+                return "Strongly Negative"
+            elif change_rate < 0:
+                return "Negative"
+        return "Neutral"
+
     def analyze_market_data(self) -> str:
         """
         Analyzes real-time market data to determine overall sentiment.
+
+        Reads the streaming breadth counters, so this is a constant-time
+        lookup with no request to OpenD.
         """
-        market_snapshot = self.moomoo_api.get_market_snapshot()
-        if not market_snapshot:
+        if self.breadth is None:
+            return "Neutral"
+        breadth = self.breadth.snapshot()
+        if not breadth['tracked']:
             return "Neutral"
 
-        index_change = market_snapshot.get('benchmark_index_change', 0)
-        adv_decl_ratio = market_snapshot.get('advancing_declining_ratio', {'advancing': 0, 'declining': 0})
+        change = breadth['volume_weighted_change']
+        adv_decl_ratio = breadth['advancing_declining_ratio']
 
-        if index_change > 0 and adv_decl_ratio['advancing'] > adv_decl_ratio['declining']:
+        if change > 0 and adv_decl_ratio['advancing'] > adv_decl_ratio['declining']:
             sentiment = "Positive"
-        elif index_change < 0 and adv_decl_ratio['declining'] > adv_decl_ratio['advancing']:
+        elif change < 0 and adv_decl_ratio['declining'] > adv_decl_ratio['advancing']:
             sentiment = "Negative"
         else:
             sentiment = "Neutral"
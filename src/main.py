@@ -5,7 +5,9 @@ from api.moomoo_openD import MooMooOpenD
 from features.company_feedback import CompanyFeedback
 from features.stock_recommendation import StockRecommendation
 from features.todays_sentiment import TodaysSentiment
+from features.market_breadth import MarketBreadth
 from features.automated_trading import AutomatedTrading
+from utils.metrics import JsonDumper, MetricsServer, shared_metrics
 import yaml
 
 def load_config():
@@ -18,13 +20,28 @@ def main():
     Entry point for the MooMoo Investment Assistant Tool.
     Initializes the system and routes user commands.
     """
-    # Setup logger
-    logger = setup_logger('app_logger')
+    # Load configuration
+    config = load_config()
+
+    # Setup logger; file output is written by a background thread
+    logging_config = config.get('logging', {})
+    logger = setup_logger('app_logger',
+                          level=getattr(logging, str(logging_config.get('level', 'DEBUG')).upper()),
+                          log_file=logging_config.get('file'),
+                          json_format=logging_config.get('json', False),
+                          rate_limits=logging_config.get('rate_limits'))
     
+    # Export request and feature metrics if configured
+    metrics_config = config.get('metrics', {}) or {}
+    shared_metrics().tracing = bool(metrics_config.get('tracing', False))
+    exporters = []
+    if metrics_config.get('prometheus_port'):
+        exporters.append(MetricsServer(port=metrics_config['prometheus_port']).start())
+    if metrics_config.get('json_file'):
+        exporters.append(JsonDumper(metrics_config['json_file'],
+                                    interval=metrics_config.get('json_interval', 60)).start())
+
     try:
-        # Load configuration
-        config = load_config()
-        
         # Initialize MooMoo API
         moomoo_api = MooMooAPI(
             host=config.get('api', {}).get('host', '127.0.0.1'),
@@ -39,7 +56,12 @@ def main():
         # Initialize Features
         company_feedback = CompanyFeedback(moomoo_api, moomoo_openD)
         stock_recommendation = StockRecommendation(moomoo_api)
-        todays_sentiment = TodaysSentiment(moomoo_api, moomoo_openD)
+        breadth_universe = config.get('features', {}).get('todays_sentiment', {}).get('breadth_universe')
+        breadth = None
+        if breadth_universe:
+            breadth = MarketBreadth(moomoo_api, breadth_universe)
+            breadth.start()
+        todays_sentiment = TodaysSentiment(moomoo_api, moomoo_openD, breadth=breadth)
         automated_trading = AutomatedTrading(moomoo_api, moomoo_openD)
 
         # Example usage with error handling
@@ -59,6 +81,9 @@ def main():
     except Exception as e:
         logger.error(f"Application error: {str(e)}")
         raise
+    finally:
+        for exporter in exporters:
+            exporter.stop()
 
 if __name__ == "__main__":
     main()
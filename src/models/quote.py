@@ -0,0 +1,242 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional, Union
+import numpy as np
+import pandas as pd
+
+# One fixed-size record per bar. `time` is the bar's time_key as seconds since
+# the epoch, read as if it were UTC, so it round-trips to the same string.
+BAR_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<i8'),
+    ('turnover', '<f8'),
+])
+
+# One fixed-size record per quote, holding the snapshot fields the features read.
+# `time` is the update_time in seconds since the epoch, 0 if unknown.
+QUOTE_DTYPE = np.dtype([
+    ('code', '<U16'),
+    ('time', '<i8'),
+    ('last_price', '<f8'),
+    ('open_price', '<f8'),
+    ('high_price', '<f8'),
+    ('low_price', '<f8'),
+    ('prev_close_price', '<f8'),
+    ('volume', '<i8'),
+    ('turnover', '<f8'),
+])
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _to_seconds(times: pd.Series) -> np.ndarray:
+    parsed = pd.to_datetime(times, errors='coerce')
+    return np.where(parsed.isna(), 0, parsed.to_numpy(dtype='datetime64[s]').astype('<i8'))
+
+
+def _to_time_str(seconds: int) -> str:
+    return pd.Timestamp(int(seconds), unit='s').strftime(TIME_FORMAT) if seconds else ''
+
+
+def frame_to_bars(frame: pd.DataFrame) -> np.ndarray:
+    """Convert a request_history_kline frame to BAR_DTYPE records, column by column"""
+    bars = np.empty(len(frame), dtype=BAR_DTYPE)
+    bars['time'] = pd.to_datetime(frame['time_key']).to_numpy(dtype='datetime64[s]').astype('<i8')
+    for field in ('open', 'high', 'low', 'close', 'turnover'):
+        bars[field] = frame[field].to_numpy(dtype='<f8') if field in frame else np.nan
+    bars['volume'] = frame['volume'].to_numpy(dtype='<i8') if 'volume' in frame else 0
+    return bars
+
+
+def bars_to_frame(bars: np.ndarray) -> pd.DataFrame:
+    """Convert BAR_DTYPE records to the column layout of request_history_kline"""
+    frame = pd.DataFrame({name: bars[name] for name in BAR_DTYPE.names if name != 'time'})
+    frame.insert(0, 'time_key', pd.to_datetime(bars['time'], unit='s').strftime(TIME_FORMAT))
+    return frame
+
+
+@dataclass
+class Quote:
+    """A single quote, without the per-field overhead of a dict"""
+    __slots__ = ('code', 'update_time', 'last_price', 'open_price', 'high_price', 'low_price',
+                 'prev_close_price', 'volume', 'turnover')
+    code: str
+    update_time: str
+    last_price: float
+    open_price: float
+    high_price: float
+    low_price: float
+    prev_close_price: float
+    volume: int
+    turnover: float
+
+    @property
+    def change_rate(self) -> float:
+        """Change from the previous close in percent"""
+        if not self.prev_close_price:
+            return 0.0
+        return (self.last_price - self.prev_close_price) / self.prev_close_price * 100
+
+    @classmethod
+    def from_record(cls, record: np.void) -> 'Quote':
+        return cls(str(record['code']), _to_time_str(record['time']), float(record['last_price']),
+                   float(record['open_price']), float(record['high_price']), float(record['low_price']),
+                   float(record['prev_close_price']), int(record['volume']), float(record['turnover']))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+@dataclass
+class Bar:
+    """A single K-line bar"""
+    __slots__ = ('time_key', 'open', 'high', 'low', 'close', 'volume', 'turnover')
+    time_key: str
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int
+    turnover: float
+
+    @classmethod
+    def from_record(cls, record: np.void) -> 'Bar':
+        return cls(_to_time_str(record['time']), float(record['open']), float(record['high']),
+                   float(record['low']), float(record['close']), int(record['volume']),
+                   float(record['turnover']))
+
+
+class QuoteBatch:
+    """
+    Quotes of many codes in one QUOTE_DTYPE structured array.
+
+    Columns are zero-copy views of the array, so screening a batch is
+    vectorized and never creates a Python object per quote. A Quote is only
+    built when a single code is asked for.
+    """
+
+    __slots__ = ('records', '_positions')
+
+    def __init__(self, records: np.ndarray):
+        self.records = records
+        self._positions: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> 'QuoteBatch':
+        """
+        Convert a get_market_snapshot frame, column by column. The code may be a
+        column or the index, as in get_stock_quotes.
+        """
+        records = np.zeros(len(frame), dtype=QUOTE_DTYPE)
+        records['code'] = frame['code'].to_numpy(dtype=str) if 'code' in frame else frame.index.to_numpy(dtype=str)
+        if 'update_time' in frame:
+            records['time'] = _to_seconds(frame['update_time'])
+        for field in ('last_price', 'open_price', 'high_price', 'low_price', 'prev_close_price', 'turnover'):
+            records[field] = frame[field].to_numpy(dtype='<f8') if field in frame else np.nan
+        if 'volume' in frame:
+            records['volume'] = frame['volume'].to_numpy(dtype='<i8')
+        return cls(records)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._index()
+
+    def __iter__(self) -> Iterator[Quote]:
+        return (Quote.from_record(record) for record in self.records)
+
+    def __getitem__(self, item: Union[int, slice, np.ndarray]) -> Union[Quote, 'QuoteBatch']:
+        """A Quote for an integer position, a QuoteBatch for a slice or mask"""
+        if isinstance(item, (int, np.integer)):
+            return Quote.from_record(self.records[item])
+        return QuoteBatch(self.records[item])
+
+    def _index(self) -> Dict[str, int]:
+        if self._positions is None:
+            self._positions = {code: i for i, code in enumerate(self.records['code'].tolist())}
+        return self._positions
+
+    def get(self, code: str) -> Optional[Quote]:
+        """The quote of `code`, None if the batch has none"""
+        position = self._index().get(code)
+        return None if position is None else Quote.from_record(self.records[position])
+
+    def column(self, name: str) -> np.ndarray:
+        """A zero-copy view of one field across the batch"""
+        return self.records[name]
+
+    def change_rates(self) -> np.ndarray:
+        """Change from the previous close in percent, 0 where there is no previous close"""
+        prev_close = self.records['prev_close_price']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = (self.records['last_price'] - prev_close) / prev_close * 100
+        return np.where(prev_close > 0, change, 0.0)
+
+    def to_frame(self) -> pd.DataFrame:
+        frame = pd.DataFrame({name: self.records[name] for name in QUOTE_DTYPE.names if name != 'time'})
+        frame['update_time'] = [_to_time_str(seconds) for seconds in self.records['time']]
+        return frame
+
+
+class BarSeries:
+    """
+    Bars of one code in one BAR_DTYPE structured array, oldest first.
+
+    Wraps the memory-mapped arrays of the K-line store without copying;
+    slicing gives another view and field access a column view.
+    """
+
+    __slots__ = ('records',)
+
+    def __init__(self, records: np.ndarray):
+        self.records = records
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> 'BarSeries':
+        return cls(frame_to_bars(frame))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[Bar]:
+        return (Bar.from_record(record) for record in self.records)
+
+    def __getitem__(self, item: Union[int, slice, np.ndarray]) -> Union[Bar, 'BarSeries']:
+        """A Bar for an integer position, a BarSeries view for a slice or mask"""
+        if isinstance(item, (int, np.integer)):
+            return Bar.from_record(self.records[item])
+        return BarSeries(self.records[item])
+
+    def tail(self, num: int) -> 'BarSeries':
+        return BarSeries(self.records[-num:] if num > 0 else self.records[:0])
+
+    @property
+    def time(self) -> np.ndarray:
+        return self.records['time']
+
+    @property
+    def open(self) -> np.ndarray:
+        return self.records['open']
+
+    @property
+    def high(self) -> np.ndarray:
+        return self.records['high']
+
+    @property
+    def low(self) -> np.ndarray:
+        return self.records['low']
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.records['close']
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self.records['volume']
+
+    def to_frame(self) -> pd.DataFrame:
+        return bars_to_frame(self.records)
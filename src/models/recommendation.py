@@ -1,5 +1,7 @@
 # Data models for recommendations can be defined here
 class Recommendation:
+    __slots__ = ('symbol', 'recommendation', 'reasoning')
+
     def __init__(self, symbol: str, recommendation: str, reasoning: str = ""):
         self.symbol = symbol
         self.recommendation = recommendation
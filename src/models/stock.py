@@ -5,6 +5,8 @@ class Stock:
     """
     Represents a stock with relevant attributes.
     """
+    __slots__ = ('symbol', 'name', 'current_price', 'pe_ratio', 'pb_ratio',
+                 'revenue_growth', 'profit_growth', 'industry')
     symbol: str
     name: str
     current_price: float
@@ -12,4 +14,4 @@ class Stock:
     pb_ratio: float
     revenue_growth: float
     profit_growth: float
-    industry: str 
\ No newline at end of file
+    industry: str
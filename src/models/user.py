@@ -6,7 +6,8 @@ class User:
     """
     Represents a user of the MooMoo Investment Assistant Tool.
     """
+    __slots__ = ('user_id', 'api_key', 'preferences', 'portfolio')
     user_id: str
     api_key: str
     preferences: dict
-    portfolio: List[str] 
\ No newline at end of file
+    portfolio: List[str]
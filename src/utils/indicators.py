@@ -0,0 +1,279 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class Indicator(ABC):
+    """
+    Base class for rolling indicators updated in O(1) per value.
+
+    `update(value)` appends a new bar; `amend(value)` revises the latest bar,
+    e.g. when a tick moves the close of the bar that is still forming.
+    """
+
+    def seed(self, values: Iterable[float]) -> 'Indicator':
+        """Feed historical closes, oldest first"""
+        for value in values:
+            self.update(value)
+        return self
+
+    @abstractmethod
+    def update(self, value: float):
+        """Append a new bar"""
+
+    @abstractmethod
+    def amend(self, value: float):
+        """Revise the latest bar"""
+
+    @property
+    def ready(self) -> bool:
+        return self.value is not None
+
+    @property
+    @abstractmethod
+    def value(self):
+        """Current indicator value, None until enough values were seen"""
+
+
+class SMA(Indicator):
+    """Simple moving average over the last `period` values"""
+
+    def __init__(self, period: int):
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.period = period
+        self._window = deque(maxlen=period)
+        self._sum = 0.0
+
+    def update(self, value: float):
+        if len(self._window) == self.period:
+            self._sum -= self._window[0]
+        self._window.append(value)
+        self._sum += value
+
+    def amend(self, value: float):
+        if not self._window:
+            return self.update(value)
+        self._sum += value - self._window[-1]
+        self._window[-1] = value
+
+    @property
+    def value(self) -> Optional[float]:
+        if len(self._window) < self.period:
+            return None
+        return self._sum / self.period
+
+
+class EMA(Indicator):
+    """Exponential moving average, seeded with the SMA of the first `period` values"""
+
+    def __init__(self, period: int):
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self._seed = SMA(period)
+        self._value: Optional[float] = None
+        self._prev: Optional[float] = None
+
+    def update(self, value: float):
+        self._prev = self._value
+        if self._value is None:
+            self._seed.update(value)
+            self._value = self._seed.value
+        else:
+            self._value += self.alpha * (value - self._value)
+
+    def amend(self, value: float):
+        if self._prev is None:
+            if self._value is None:
+                self._seed.amend(value)
+                return
+            # The amended bar is the one that completed the seed window
+            self._seed.amend(value)
+            self._value = self._seed.value
+            return
+        self._value = self._prev + self.alpha * (value - self._prev)
+
+    @property
+    def value(self) -> Optional[float]:
+        return self._value
+
+
+class _RollingExtreme(Indicator):
+    """
+    Rolling max/min over `period` values.
+
+    Completed bars live in a monotonic deque; the forming bar is kept apart so
+    `amend` is O(1) and `update` is amortized O(1).
+    """
+
+    def __init__(self, period: int, highest: bool):
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.period = period
+        self._highest = highest
+        self._count = 0
+        self._last: Optional[float] = None
+        # (index, value) pairs of completed bars, monotonic so the extreme is at the front
+        self._extremes = deque()
+
+    def _dominates(self, a: float, b: float) -> bool:
+        return a >= b if self._highest else a <= b
+
+    def update(self, value: float):
+        if self._last is not None:
+            while self._extremes and self._dominates(self._last, self._extremes[-1][1]):
+                self._extremes.pop()
+            self._extremes.append((self._count - 1, self._last))
+        self._last = value
+        self._count += 1
+        while self._extremes and self._extremes[0][0] < self._count - self.period:
+            self._extremes.popleft()
+
+    def amend(self, value: float):
+        if self._last is None:
+            return self.update(value)
+        self._last = value
+
+    @property
+    def value(self) -> Optional[float]:
+        if self._last is None:
+            return None
+        if not self._extremes:
+            return self._last
+        front = self._extremes[0][1]
+        return self._last if self._dominates(self._last, front) else front
+
+
+class RollingHigh(_RollingExtreme):
+    """Highest value of the last `period` values, e.g. the N-day high"""
+
+    def __init__(self, period: int):
+        super().__init__(period, highest=True)
+
+
+class RollingLow(_RollingExtreme):
+    """Lowest value of the last `period` values, e.g. the N-day low"""
+
+    def __init__(self, period: int):
+        super().__init__(period, highest=False)
+
+
+class RSI(Indicator):
+    """Relative strength index with Wilder smoothing"""
+
+    def __init__(self, period: int = 14):
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.period = period
+        self._count = 0
+        self._last: Optional[float] = None
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+        self._prev_state: Optional[Tuple] = None
+
+    def _state(self) -> Tuple:
+        return self._count, self._last, self._avg_gain, self._avg_loss
+
+    def update(self, value: float):
+        self._prev_state = self._state()
+        if self._last is not None:
+            change = value - self._last
+            gain, loss = max(change, 0.0), max(-change, 0.0)
+            self._count += 1
+            if self._count <= self.period:
+                # Simple average over the first `period` changes
+                self._avg_gain += (gain - self._avg_gain) / self._count
+                self._avg_loss += (loss - self._avg_loss) / self._count
+            else:
+                self._avg_gain += (gain - self._avg_gain) / self.period
+                self._avg_loss += (loss - self._avg_loss) / self.period
+        self._last = value
+
+    def amend(self, value: float):
+        if self._prev_state is None:
+            return self.update(value)
+        self._count, self._last, self._avg_gain, self._avg_loss = self._prev_state
+        self.update(value)
+
+    @property
+    def value(self) -> Optional[float]:
+        if self._count < self.period:
+            return None
+        if self._avg_loss == 0:
+            return 100.0
+        rs = self._avg_gain / self._avg_loss
+        return 100.0 - 100.0 / (1.0 + rs)
+
+
+class MACD(Indicator):
+    """MACD line, signal line and histogram"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        if fast >= slow:
+            raise ValueError("fast period must be shorter than slow period")
+        self._fast = EMA(fast)
+        self._slow = EMA(slow)
+        self._signal = EMA(signal)
+
+    def update(self, value: float):
+        self._fast.update(value)
+        self._slow.update(value)
+        if self._slow.ready:
+            self._signal.update(self._fast.value - self._slow.value)
+
+    def amend(self, value: float):
+        self._fast.amend(value)
+        self._slow.amend(value)
+        if self._slow.ready:
+            self._signal.amend(self._fast.value - self._slow.value)
+
+    @property
+    def value(self) -> Optional[Tuple[float, float, float]]:
+        if not self._signal.ready:
+            return None
+        macd = self._fast.value - self._slow.value
+        signal = self._signal.value
+        return macd, signal, macd - signal
+
+
+class IndicatorSet:
+    """
+    Named indicators tracked together for one symbol.
+
+    Seed once from history, then feed every bar with `on_bar` and every tick
+    of the forming bar with `on_tick`; reading values never touches the network.
+    """
+
+    def __init__(self, **indicators: Indicator):
+        self.indicators: Dict[str, Indicator] = dict(indicators)
+
+    def __getitem__(self, name: str) -> Indicator:
+        return self.indicators[name]
+
+    def seed(self, closes: Iterable[float]) -> 'IndicatorSet':
+        for close in closes:
+            self.on_bar(close)
+        return self
+
+    def on_bar(self, close: float):
+        """Append a new bar to every indicator"""
+        for indicator in self.indicators.values():
+            indicator.update(close)
+
+    def on_tick(self, price: float):
+        """Revise the forming bar of every indicator"""
+        for indicator in self.indicators.values():
+            indicator.amend(price)
+
+    def values(self) -> Dict[str, object]:
+        return {name: indicator.value for name, indicator in self.indicators.items()}
+
+
+def crossed_above(prev_fast: Optional[float], prev_slow: Optional[float],
+                  fast: Optional[float], slow: Optional[float]) -> bool:
+    """True when `fast` moved from at-or-below `slow` to above it"""
+    if None in (prev_fast, prev_slow, fast, slow):
+        return False
+    return prev_fast <= prev_slow and fast > slow
@@ -1,49 +1,198 @@
+import atexit
+import json
 import logging
-import os
+import logging.handlers
+import queue
+import threading
+import time
 from pathlib import Path
+from typing import Callable, Dict, Hashable, Optional, Tuple
 
-def setup_logger(name: str) -> logging.Logger:
+# Rotate the log file at this size, keeping this many old files
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+CONSOLE_FORMAT = '%(name)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+_lock = threading.Lock()
+
+
+def default_log_file() -> Path:
+    """logs/app.log in the project root (where src is located)"""
+    return Path(__file__).parent.parent.parent / 'logs' / 'app.log'
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats each record as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `rate` records per second through per message template, in
+    bursts of up to `burst`. Records at `exempt_level` or above always pass.
+    The number of records dropped since the last one let through is set on
+    that record as `suppressed`.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None, exempt_level: int = logging.WARNING,
+                 clock: Callable[[], float] = time.monotonic):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.exempt_level = exempt_level
+        self._clock = clock
+        self._lock = threading.Lock()
+        # (logger, template) -> (tokens, last refill, dropped)
+        self._buckets: Dict[Hashable, Tuple[float, float, int]] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= self.exempt_level:
+            return True
+        key = (record.name, record.msg)
+        now = self._clock()
+        with self._lock:
+            tokens, updated, dropped = self._buckets.get(key, (self.burst, now, 0))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now, dropped + 1)
+                return False
+            self._buckets[key] = (tokens - 1, now, 0)
+        record.suppressed = dropped
+        return True
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records with their message merged but not formatted, so
+    timestamps, layout and JSON encoding happen on the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now: they may be mutated after the call returns
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def start_logging(log_file: Optional[str] = None,
+                  level: int = logging.DEBUG,
+                  console_level: int = logging.INFO,
+                  json_format: bool = False,
+                  max_bytes: int = MAX_BYTES,
+                  backup_count: int = BACKUP_COUNT) -> logging.handlers.QueueListener:
+    """
+    Route every logger through a queue to a background listener that writes
+    a rotating log file and the console, so a log call never waits on I/O.
+
+    Calling it again replaces the previous pipeline. It is stopped, and the
+    queue flushed, at interpreter exit or by stop_logging.
+
+    Args:
+        log_file (Optional[str]): Log file path, logs/app.log in the project root if None
+        level (int): Level of the file output; the root logger is set to it
+        console_level (int): Level of the console output
+        json_format (bool): Write the file as one JSON object per line
+        max_bytes (int): Size at which the file is rotated
+        backup_count (int): Rotated files kept
+    """
+    global _listener, _queue_handler
+    stop_logging()
+
+    log_file = Path(log_file) if log_file else default_log_file()
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes,
+                                                        backupCount=backup_count, encoding='utf-8')
+    file_handler.setLevel(level)
+    file_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+    console_handler = logging.StreamHandler()
+    console_handler.setLevel(console_level)
+    console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    with _lock:
+        _queue_handler = _QueueHandler(log_queue)
+        _listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler,
+                                                   respect_handler_level=True)
+        _listener.start()
+        root = logging.getLogger()
+        root.addHandler(_queue_handler)
+        root.setLevel(min(level, console_level))
+        return _listener
+
+
+def stop_logging():
+    """Flush queued records and stop the background listener"""
+    global _listener, _queue_handler
+    with _lock:
+        if _queue_handler is not None:
+            logging.getLogger().removeHandler(_queue_handler)
+            _queue_handler = None
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+atexit.register(stop_logging)
+
+
+def limit_rate(name: str, rate: float, burst: Optional[int] = None) -> RateLimitFilter:
+    """
+    Rate-limit the records of one logger below WARNING, e.g. the per-quote
+    debug messages of MooMooAPI, to `rate` per second per message.
+    """
+    rate_filter = RateLimitFilter(rate, burst)
+    logging.getLogger(name).addFilter(rate_filter)
+    return rate_filter
+
+
+def setup_logger(name: str,
+                 level: int = logging.DEBUG,
+                 log_file: Optional[str] = None,
+                 json_format: bool = False,
+                 rate_limits: Optional[Dict[str, float]] = None) -> logging.Logger:
     """
     Sets up and returns a logger with the specified name.
-    
+
+    The first call starts the queued logging pipeline for the whole process
+    (see start_logging); later calls only return the logger.
+
     Args:
         name (str): Name of the logger
-        
+        level (int): Level of the file output
+        log_file (Optional[str]): Log file path, logs/app.log in the project root if None
+        json_format (bool): Write the file as JSON lines
+        rate_limits (Optional[Dict[str, float]]): Logger name to records per second
+            per message allowed below WARNING
+
     Returns:
         logging.Logger: Configured logger instance
     """
-    # Get the project root directory (where src is located)
-    project_root = Path(__file__).parent.parent.parent
-    
-    # Create logs directory in project root
-    logs_dir = project_root / 'logs'
-    logs_dir.mkdir(exist_ok=True)
-    
-    # Configure log file path
-    log_file = logs_dir / 'app.log'
-    
-    # Set up logger
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
-
-    # Avoid duplicate handlers
-    if not logger.handlers:
-        # Create handlers
-        c_handler = logging.StreamHandler()
-        f_handler = logging.FileHandler(log_file)
-
-        c_handler.setLevel(logging.INFO)
-        f_handler.setLevel(logging.DEBUG)
-
-        # Create formatters and add to handlers
-        c_format = logging.Formatter('%(name)s - %(levelname)s - %(message)s')
-        f_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-
-        c_handler.setFormatter(c_format)
-        f_handler.setFormatter(f_format)
-
-        # Add handlers to the logger
-        logger.addHandler(c_handler)
-        logger.addHandler(f_handler)
-
-    return logger
+    if _listener is None:
+        start_logging(log_file=log_file, level=level,
+                      json_format=json_format)
+        for logger_name, rate in (rate_limits or {}).items():
+            limit_rate(logger_name, rate)
+    return logging.getLogger(name)
@@ -0,0 +1,401 @@
+from contextlib import contextmanager
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import bisect
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+# Upper bounds in seconds of the latency histogram buckets, as in Prometheus
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Return code of a successful SDK call (moomoo RET_OK); other codes count as errors
+OK = 0
+# Error code recorded when the SDK call raised instead of returning a code
+EXCEPTION = 'exception'
+# Error code recorded for a span that raised or was marked failed
+FAILED = 'failed'
+
+# Finished spans kept for inspection when tracing is enabled
+TRACE_BUFFER_SIZE = 1000
+
+# Local address of the Prometheus endpoint
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 9464
+
+# The innermost open span of the running thread or task
+_current_span: contextvars.ContextVar = contextvars.ContextVar('metrics_span', default=None)
+
+
+class Histogram:
+    """Per-bucket counts plus sum and count; exported cumulatively, as Prometheus expects"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        # One count per bound plus the +Inf bucket
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile, inf past the last bound"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+
+class _CallStats:
+    __slots__ = ('latency', 'errors', 'throttled')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.latency = Histogram(bounds)
+        # Return code -> count
+        self.errors: Dict[Any, int] = {}
+        self.throttled = 0
+
+
+class Span:
+    """A timed operation; set `failed` for failures that do not raise"""
+
+    __slots__ = ('name', 'feature', 'parent', 'start', 'duration', 'failed')
+
+    def __init__(self, name: str, feature: str, parent: Optional['Span']):
+        self.name = name
+        self.feature = feature
+        self.parent = parent
+        self.start = time.time()
+        self.duration = 0.0
+        self.failed = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'feature': self.feature,
+            'parent': self.parent.name if self.parent is not None else None,
+            'start': self.start,
+            'duration': self.duration,
+            'failed': self.failed,
+        }
+
+
+class Metrics:
+    """
+    Latency histograms, call counts, error counts by return code and
+    throttled requests per OpenD endpoint and feature, plus latency of named
+    spans. The feature of a call is that of the innermost open span.
+
+    Recording takes one short lock and never does I/O; exporting reads a
+    consistent copy under the same lock.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS,
+                 tracing: bool = False, trace_size: int = TRACE_BUFFER_SIZE):
+        """
+        Args:
+            buckets (Tuple[float, ...]): Histogram bucket upper bounds in seconds
+            tracing (bool): Keep the last `trace_size` finished spans for traces()
+            trace_size (int): Finished spans kept when tracing
+        """
+        self.buckets = buckets
+        self.tracing = tracing
+        self._lock = threading.Lock()
+        # (endpoint, feature) -> stats of OpenD calls
+        self._calls: Dict[Tuple[str, str], _CallStats] = {}
+        # (span, feature) -> stats of spans
+        self._spans: Dict[Tuple[str, str], _CallStats] = {}
+        self._traces: deque = deque(maxlen=trace_size)
+
+    @staticmethod
+    def current_feature() -> str:
+        span = _current_span.get()
+        return span.feature if span is not None else ''
+
+    def _stats_locked(self, table: Dict, key: Tuple[str, str]) -> _CallStats:
+        stats = table.get(key)
+        if stats is None:
+            stats = table[key] = _CallStats(self.buckets)
+        return stats
+
+    def observe_call(self, endpoint: str, seconds: float, code: Any = OK):
+        """Record one OpenD call and its return code"""
+        key = (endpoint, self.current_feature())
+        with self._lock:
+            stats = self._stats_locked(self._calls, key)
+            stats.latency.observe(seconds)
+            if code != OK:
+                stats.errors[code] = stats.errors.get(code, 0) + 1
+
+    def count_throttled(self, endpoint: str):
+        """Record a call held back because its endpoint's rate limit was used up"""
+        key = (endpoint, self.current_feature())
+        with self._lock:
+            self._stats_locked(self._calls, key).throttled += 1
+
+    @contextmanager
+    def span(self, name: str, feature: Optional[str] = None) -> Iterator[Span]:
+        """
+        Time the enclosed block as span `name`. OpenD calls made inside it are
+        attributed to `feature`, or to the feature of the enclosing span if None.
+        """
+        parent = _current_span.get()
+        if feature is None:
+            feature = parent.feature if parent is not None else ''
+        span = Span(name, feature, parent)
+        token = _current_span.set(span)
+        started = time.perf_counter()
+        try:
+            yield span
+        except BaseException:
+            span.failed = True
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            _current_span.reset(token)
+            with self._lock:
+                stats = self._stats_locked(self._spans, (name, feature))
+                stats.latency.observe(span.duration)
+                if span.failed:
+                    stats.errors[FAILED] = stats.errors.get(FAILED, 0) + 1
+                if self.tracing:
+                    self._traces.append(span)
+
+    def traces(self) -> List[Dict[str, Any]]:
+        """Finished spans, oldest first; empty unless tracing is enabled"""
+        with self._lock:
+            return [span.to_dict() for span in self._traces]
+
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+            self._spans.clear()
+            self._traces.clear()
+
+    @staticmethod
+    def _rows(table: Dict[Tuple[str, str], _CallStats], label: str) -> List[Dict[str, Any]]:
+        return [
+            {
+                label: name,
+                'feature': feature,
+                'calls': stats.latency.count,
+                'errors': {str(code): count for code, count in stats.errors.items()},
+                'throttled': stats.throttled,
+                'latency': stats.latency.to_dict(),
+            }
+            for (name, feature), stats in sorted(table.items())
+        ]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Every counter as plain data, for the JSON dump"""
+        with self._lock:
+            return {
+                'time': time.time(),
+                'endpoints': self._rows(self._calls, 'endpoint'),
+                'spans': self._rows(self._spans, 'span'),
+            }
+
+    def to_prometheus(self) -> str:
+        """Every counter in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self._lock:
+            self._histogram_lines(lines, 'moomoo_openapi_request_seconds',
+                                  'Latency of OpenD requests', 'endpoint', self._calls)
+            self._histogram_lines(lines, 'moomoo_span_seconds',
+                                  'Latency of traced operations', 'span', self._spans)
+            lines.append('# HELP moomoo_openapi_errors_total OpenD requests that failed, by return code')
+            lines.append('# TYPE moomoo_openapi_errors_total counter')
+            for (name, feature), stats in sorted(self._calls.items()):
+                for code, count in stats.errors.items():
+                    labels = _labels(endpoint=name, feature=feature, code=code)
+                    lines.append(f'moomoo_openapi_errors_total{labels} {count}')
+            lines.append('# HELP moomoo_openapi_throttled_total OpenD requests held back by a rate limit')
+            lines.append('# TYPE moomoo_openapi_throttled_total counter')
+            for (name, feature), stats in sorted(self._calls.items()):
+                if stats.throttled:
+                    labels = _labels(endpoint=name, feature=feature)
+                    lines.append(f'moomoo_openapi_throttled_total{labels} {stats.throttled}')
+            lines.append('# HELP moomoo_span_errors_total Traced operations that failed')
+            lines.append('# TYPE moomoo_span_errors_total counter')
+            for (name, feature), stats in sorted(self._spans.items()):
+                failed = stats.errors.get(FAILED, 0)
+                if failed:
+                    lines.append(f'moomoo_span_errors_total{_labels(span=name, feature=feature)} {failed}')
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _histogram_lines(lines: List[str], metric: str, help_text: str, label: str,
+                         table: Dict[Tuple[str, str], _CallStats]):
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} histogram')
+        for (name, feature), stats in sorted(table.items()):
+            histogram = stats.latency
+            cumulative = 0
+            for bound, count in zip(histogram.bounds + ('+Inf',), histogram.counts):
+                cumulative += count
+                labels = _labels(**{label: name, 'feature': feature, 'le': bound})
+                lines.append(f'{metric}_bucket{labels} {cumulative}')
+            labels = _labels(**{label: name, 'feature': feature})
+            lines.append(f'{metric}_sum{labels} {histogram.sum}')
+            lines.append(f'{metric}_count{labels} {histogram.count}')
+
+
+def _labels(**labels) -> str:
+    def escape(value) -> str:
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels.items()) + '}'
+
+
+_shared_metrics: Optional[Metrics] = None
+_shared_lock = threading.Lock()
+
+
+def shared_metrics() -> Metrics:
+    """The process-wide metrics every MooMooAPI and feature records to by default"""
+    global _shared_metrics
+    with _shared_lock:
+        if _shared_metrics is None:
+            _shared_metrics = Metrics()
+        return _shared_metrics
+
+
+def traced(name: str, feature: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """
+    Decorator timing every call of a function or coroutine function as a span
+    of the shared metrics, e.g. a feature entry point.
+    """
+    def decorate(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def run_async(*args, **kwargs):
+                with shared_metrics().span(name, feature):
+                    return await func(*args, **kwargs)
+            return run_async
+
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            with shared_metrics().span(name, feature):
+                return func(*args, **kwargs)
+        return run
+
+    return decorate
+
+
+class MetricsServer:
+    """
+    Serves the metrics on a local HTTP port from a daemon thread:
+    /metrics in the Prometheus text format, /metrics.json as the snapshot.
+    """
+
+    def __init__(self, metrics: Optional[Metrics] = None, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.metrics = metrics or shared_metrics()
+        self.logger = logging.getLogger('MetricsServer')
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body, content_type = metrics.to_prometheus(), 'text/plain; version=0.0.4'
+                elif self.path == '/metrics.json':
+                    body, content_type = json.dumps(metrics.snapshot(), default=str), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                payload = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        """The bound port, useful when started on port 0"""
+        return self._server.server_address[1]
+
+    def start(self) -> 'MetricsServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='metrics-server', daemon=True)
+        self._thread.start()
+        self.logger.info("Serving metrics on http://%s:%d/metrics", *self._server.server_address[:2])
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+
+class JsonDumper:
+    """Writes the metrics snapshot to a JSON file every `interval` seconds"""
+
+    def __init__(self, path: str, interval: float = 60.0, metrics: Optional[Metrics] = None):
+        self.path = Path(path)
+        self.interval = interval
+        self.metrics = metrics or shared_metrics()
+        self.logger = logging.getLogger('JsonDumper')
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def dump(self):
+        """Write the snapshot now; readers never see a partial file"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        tmp.write_text(json.dumps(self.metrics.snapshot(), default=str, indent=2))
+        os.replace(tmp, self.path)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.dump()
+            except Exception as e:
+                self.logger.error("Error dumping metrics: %s", e)
+
+    def start(self) -> 'JsonDumper':
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name='metrics-dump', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop and write a final snapshot"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.dump()
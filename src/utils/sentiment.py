@@ -0,0 +1,131 @@
+from api.cache import TTLCache
+from typing import Any, Dict, Hashable, List, Optional
+import logging
+import re
+import threading
+
+# Weighted financial lexicon. Phrases match across any whitespace; inflected
+# forms are listed explicitly so "miss" does not match "mission".
+FINANCIAL_LEXICON: Dict[str, float] = {
+    # Positive
+    'bullish': 1.0, 'bull run': 1.0, 'rally': 0.8, 'rallies': 0.8, 'rallied': 0.8,
+    'surge': 1.0, 'surges': 1.0, 'surged': 1.0, 'soar': 1.0, 'soars': 1.0, 'soared': 1.0,
+    'jump': 0.6, 'jumps': 0.6, 'jumped': 0.6, 'gain': 0.5, 'gains': 0.5, 'gained': 0.5,
+    'beat': 0.8, 'beats': 0.8, 'tops estimates': 1.0, 'record high': 1.0, 'all-time high': 1.0,
+    'upgrade': 1.2, 'upgrades': 1.2, 'upgraded': 1.2, 'outperform': 1.0, 'overweight': 0.8,
+    'buy rating': 1.0, 'price target raised': 1.2, 'raises guidance': 1.5, 'raised guidance': 1.5,
+    'strong demand': 0.8, 'profit rises': 1.0, 'buyback': 0.6, 'dividend hike': 0.8,
+    'breakthrough': 0.8, 'approval': 0.6, 'approved': 0.6,
+    # Negative
+    'bearish': -1.0, 'sell-off': -1.0, 'selloff': -1.0, 'plunge': -1.2, 'plunges': -1.2,
+    'plunged': -1.2, 'tumble': -1.0, 'tumbles': -1.0, 'tumbled': -1.0, 'slump': -1.0,
+    'slumps': -1.0, 'slumped': -1.0, 'drop': -0.6, 'drops': -0.6, 'dropped': -0.6,
+    'fall': -0.5, 'falls': -0.5, 'fell': -0.5, 'miss': -0.8, 'misses': -0.8, 'missed': -0.8,
+    'downgrade': -1.2, 'downgrades': -1.2, 'downgraded': -1.2, 'underperform': -1.0,
+    'underweight': -0.8, 'sell rating': -1.0, 'price target cut': -1.2, 'cuts guidance': -1.5,
+    'lowers guidance': -1.5, 'profit warning': -1.5, 'lawsuit': -0.8, 'probe': -0.8,
+    'investigation': -0.8, 'recall': -0.8, 'layoffs': -0.6, 'bankruptcy': -2.0, 'defaults': -1.2,
+    'fraud': -2.0, 'record low': -1.0,
+}
+
+# Headlines carry more signal per word than article bodies
+TITLE_WEIGHT = 1.0
+BODY_WEIGHT = 0.5
+
+# Scores whose magnitude stays below this classify as Neutral
+NEUTRAL_BAND = 0.0
+
+# Articles whose scores are remembered
+ARTICLE_CACHE_SIZE = 100_000
+
+
+def _compile(lexicon: Dict[str, float]) -> 're.Pattern':
+    # Longest terms first so a phrase wins over a word it starts with
+    terms = sorted(lexicon, key=len, reverse=True)
+    alternatives = '|'.join(r'\s+'.join(map(re.escape, term.split())) for term in terms)
+    return re.compile(rf'\b(?:{alternatives})\b', re.IGNORECASE)
+
+
+def classify(score: float, neutral_band: float = NEUTRAL_BAND) -> str:
+    """Positive, Negative or Neutral for a sentiment score"""
+    if score > neutral_band:
+        return "Positive"
+    if score < -neutral_band:
+        return "Negative"
+    return "Neutral"
+
+
+class SentimentScorer:
+    """
+    Scores news articles against a weighted lexicon.
+
+    The lexicon is compiled once into a single regular expression, so an
+    article is scanned in one pass whatever the lexicon size. Scores are
+    cached by article ID, so the same article seen by several features or
+    several analyses is scored once.
+    """
+
+    def __init__(self, lexicon: Optional[Dict[str, float]] = None, cache_size: int = ARTICLE_CACHE_SIZE):
+        """
+        Args:
+            lexicon (Optional[Dict[str, float]]): Term to weight, FINANCIAL_LEXICON if None
+            cache_size (int): Articles whose scores are kept
+        """
+        lexicon = FINANCIAL_LEXICON if lexicon is None else lexicon
+        self.weights = {' '.join(term.lower().split()): weight for term, weight in lexicon.items()}
+        self.pattern = _compile(self.weights)
+        self.cache = TTLCache(maxsize=cache_size)
+        self.logger = logging.getLogger('SentimentScorer')
+
+    def score_text(self, text: Optional[str]) -> float:
+        """Sum of the weights of the lexicon terms found in `text`"""
+        if not text:
+            return 0.0
+        weights = self.weights
+        return sum(weights[' '.join(term.lower().split())] for term in self.pattern.findall(text))
+
+    @staticmethod
+    def article_key(article: Dict[str, Any]) -> Hashable:
+        """The article's 'id', or its text when it has none"""
+        article_id = article.get('id')
+        if article_id is not None:
+            return article_id
+        return ('text', article.get('title'), article.get('body'))
+
+    def score_article(self, article: Dict[str, Any]) -> float:
+        """Weighted score of an article's title and body, cached by article ID"""
+        return self.score_articles([article])[0]
+
+    def score_articles(self, articles: List[Dict[str, Any]]) -> List[float]:
+        """Scores of many articles, scoring only those not already cached"""
+        keys = [self.article_key(article) for article in articles]
+        cached, missing = self.cache.get_many(keys)
+        if missing:
+            missing = set(missing)
+            scored = {}
+            for key, article in zip(keys, articles):
+                if key in missing and key not in scored:
+                    scored[key] = (TITLE_WEIGHT * self.score_text(article.get('title'))
+                                   + BODY_WEIGHT * self.score_text(article.get('body')))
+            self.cache.set_many(scored)
+            cached.update(scored)
+        return [cached[key] for key in keys]
+
+    def sentiment(self, articles: List[Dict[str, Any]]) -> str:
+        """Positive, Negative or Neutral for the combined score of `articles`"""
+        if not articles:
+            return "Neutral"
+        return classify(sum(self.score_articles(articles)))
+
+
+_shared_scorer: Optional[SentimentScorer] = None
+_shared_lock = threading.Lock()
+
+
+def shared_scorer() -> SentimentScorer:
+    """The process-wide scorer, so every feature shares one article cache"""
+    global _shared_scorer
+    with _shared_lock:
+        if _shared_scorer is None:
+            _shared_scorer = SentimentScorer()
+        return _shared_scorer
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+from src.api.moomoo_api import MooMooAPI, SNAPSHOT_MAX_CODES
+from src.api.async_api import AsyncMooMooAPI
+
+
+@pytest.fixture
+def api():
+    return Mock(spec=MooMooAPI)
+
+
+def test_calls_run_concurrently_within_endpoint_limit(api):
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow_k_lines(symbol, num, ktype):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return pd.DataFrame({'close': [1.0] * num})
+
+    api.get_historical_k_lines.side_effect = slow_k_lines
+    async_api = AsyncMooMooAPI(api, concurrency={'kline': 3})
+
+    async def main():
+        return await async_api.get_historical_k_lines_many([f'US.S{i}' for i in range(9)], 2)
+
+    frames = asyncio.run(main())
+    async_api.close()
+
+    assert len(frames) == 9
+    assert peak[0] == 3
+
+
+def test_get_stock_quotes_splits_large_lists(api):
+    api.get_stock_quotes.side_effect = lambda codes: pd.DataFrame({'last_price': 1.0}, index=codes)
+    async_api = AsyncMooMooAPI(api)
+    symbols = [f'US.S{i}' for i in range(SNAPSHOT_MAX_CODES + 1)]
+
+    quotes = asyncio.run(async_api.get_stock_quotes(symbols))
+    async_api.close()
+
+    assert list(quotes.index) == symbols
+    assert api.get_stock_quotes.call_count == 2
+
+
+def test_get_market_snapshot_drops_failed_chunks(api):
+    api.get_market_snapshot.side_effect = lambda codes: pd.DataFrame({'code': codes}) if codes[0] == 'US.S0' else None
+    async_api = AsyncMooMooAPI(api)
+    codes = [f'US.S{i}' for i in range(SNAPSHOT_MAX_CODES + 1)]
+
+    snapshot = asyncio.run(async_api.get_market_snapshot(codes))
+    async_api.close()
+
+    assert snapshot['code'].tolist() == codes[:SNAPSHOT_MAX_CODES]
+
+
+def test_semaphores_are_recreated_for_each_loop(api):
+    api.get_stock_quote.return_value = {'code': 'US.AAPL'}
+    async_api = AsyncMooMooAPI(api)
+
+    asyncio.run(async_api.get_stock_quote('US.AAPL'))
+    assert asyncio.run(async_api.get_stock_quote('US.AAPL')) == {'code': 'US.AAPL'}
+    async_api.close()
@@ -1,5 +1,10 @@
+import itertools
+import pandas as pd
 import pytest
+from moomoo import OrderStatus, RET_OK, SubType
 from src.api.moomoo_api import MooMooAPI
+from src.api.order_tracker import OrderTracker
+from src.api.subscription import SubscriptionManager, UNSUBSCRIBE_MIN_AGE
 from src.features.automated_trading import AutomatedTrading
 from unittest.mock import Mock, patch
 
@@ -17,7 +22,72 @@ def automated_trading(mock_moomoo_api, mock_moomoo_openD):
 
 def test_automated_trading_initialization(automated_trading):
     assert automated_trading is not None
-    assert automated_trading.moomoo_api is not None
-    assert automated_trading.moomoo_openD is not None
+    assert automated_trading.api is not None
+    assert automated_trading.stream is not None
 
 # Add more test cases as needed
+
+
+@pytest.fixture
+def subscriptions(mock_moomoo_api):
+    quote_ctx = Mock()
+    quote_ctx.subscribe.return_value = (RET_OK, None)
+    quote_ctx.unsubscribe.return_value = (RET_OK, None)
+    # Every clock read is a minute later, so OpenD always allows unsubscribing
+    ticks = itertools.count(0, UNSUBSCRIBE_MIN_AGE)
+    mock_moomoo_api.subscriptions = SubscriptionManager(quote_ctx, quota=10, clock=lambda: next(ticks))
+    mock_moomoo_api.orders = OrderTracker(Mock())
+    return mock_moomoo_api.subscriptions
+
+
+def test_breakout_buy_orders_once_on_pushed_breakout(automated_trading, mock_moomoo_api, subscriptions):
+    mock_moomoo_api.get_historical_k_lines.return_value = pd.DataFrame({'high': [95.0, 100.0, 98.0]})
+    mock_moomoo_api.place_order.return_value = {'order_id': '1'}
+
+    automated_trading.execute_strategy({'name': 'b', 'type': 'BreakoutBuy', 'symbol': 'US.AAPL',
+                                        'n_days': 3, 'quantity': 10})
+    for price in (99.0, 100.0, 101.0, 102.0):
+        subscriptions.dispatch_frame(SubType.QUOTE, pd.DataFrame({'code': ['US.AAPL'], 'last_price': [price]}))
+        automated_trading.runtime.wait_idle(5)
+    automated_trading.shutdown()
+
+    mock_moomoo_api.get_historical_k_lines.assert_called_once_with('US.AAPL', 3)
+    mock_moomoo_api.place_order.assert_called_once()
+    assert mock_moomoo_api.place_order.call_args.args[:3] == ('US.AAPL', 101.0, 10)
+    assert automated_trading.trade_records == [{'order_id': '1'}]
+    assert subscriptions.used == 0
+
+
+def test_moving_average_crossover_uses_pushed_bars(automated_trading, mock_moomoo_api, subscriptions):
+    mock_moomoo_api.get_historical_k_lines.return_value = pd.DataFrame({
+        'time_key': ['d1', 'd2', 'd3', 'd4'], 'close': [10.0, 10.0, 10.0, 10.0]})
+    mock_moomoo_api.place_order.return_value = {'order_id': '2'}
+
+    automated_trading.execute_strategy({'name': 'ma', 'type': 'MovingAverageCrossover', 'symbol': 'US.AAPL',
+                                        'short_ma': 2, 'long_ma': 4, 'quantity': 5})
+
+    def push(time_key, close):
+        subscriptions.dispatch_frame(SubType.K_DAY, pd.DataFrame(
+            {'code': ['US.AAPL'], 'time_key': [time_key], 'close': [close], 'k_type': [SubType.K_DAY]}))
+
+    push('d4', 9.0)
+    automated_trading.runtime.wait_idle(5)
+    push('d5', 12.0)
+    automated_trading.shutdown()
+
+    mock_moomoo_api.get_historical_k_lines.assert_called_once()
+    mock_moomoo_api.place_order.assert_called_once()
+    assert mock_moomoo_api.place_order.call_args.args[:3] == ('US.AAPL', 12.0, 5)
+
+
+def test_unknown_strategy_type_is_rejected(automated_trading, subscriptions):
+    assert not automated_trading.execute_strategy({'name': 'x', 'type': 'Nope', 'symbol': 'US.AAPL'})
+    assert automated_trading.active_strategies == []
+
+
+def test_open_orders_come_from_pushes(automated_trading, mock_moomoo_api, subscriptions):
+    mock_moomoo_api.orders.on_order_frame(pd.DataFrame([
+        {'order_id': '7', 'code': 'US.AAPL', 'order_status': OrderStatus.SUBMITTED}]))
+
+    assert [order['order_id'] for order in automated_trading.open_orders('US.AAPL')] == ['7']
+    assert automated_trading.open_orders('US.MSFT') == []
@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+from src.api.moomoo_api import MooMooAPI
+from src.api.simulator import synthetic_bars
+from src.features import backtest as backtest_module
+from src.features.backtest import Backtester, parameter_grid
+from src.utils.indicators import SMA, IndicatorSet, crossed_above
+
+
+def bars(opens, highs, closes):
+    return pd.DataFrame({
+        'time_key': pd.bdate_range('2026-01-01', periods=len(closes)).strftime('%Y-%m-%d 00:00:00'),
+        'open': opens, 'high': highs, 'low': [min(o, c) for o, c in zip(opens, closes)], 'close': closes,
+        'volume': 100, 'turnover': 100.0,
+    })
+
+
+BREAKOUT = {'name': 'b', 'type': 'BreakoutBuy', 'symbol': 'US.AAPL', 'n_days': 3, 'quantity': 10}
+CROSSOVER = {'name': 'm', 'type': 'MovingAverageCrossover', 'symbol': 'US.AAPL',
+             'short_ma': 5, 'long_ma': 20, 'quantity': 10}
+
+
+@pytest.mark.parametrize('open_price, fill_price', [(9.5, 10.0), (10.5, 10.5)])
+def test_breakout_fills_at_level_or_gap_open(open_price, fill_price):
+    history = bars([9, 9, 9, open_price, 11, 9], [10, 9.5, 9.8, 12, 13, 11], [9, 9, 9, 11, 12, 9])
+
+    result = Backtester().run(BREAKOUT, history)
+
+    assert result['filled']
+    assert result['fill_time'] == history['time_key'][3]
+    assert result['fill_price'] == fill_price
+    assert result['pnl'] == pytest.approx((9 - fill_price) * 10)
+    # Equity peaked at the 12 close and ended at the 9 close
+    assert result['max_drawdown'] == pytest.approx(30.0)
+    assert result['fills'] == [{'time_key': history['time_key'][3], 'price': fill_price,
+                                'qty': 10, 'trd_side': 'BUY'}]
+
+
+def test_no_fill_without_breakout():
+    result = Backtester().run(BREAKOUT, bars([9] * 5, [10] * 5, [9] * 5))
+    assert not result['filled']
+    assert result['pnl'] == 0.0
+    assert result['fills'] == []
+
+
+def test_crossover_matches_live_strategy_logic():
+    history = synthetic_bars(300, seed=3)
+    # The live strategy: seed with long_ma bars, then compare averages bar by bar
+    averages = IndicatorSet(short=SMA(5), long=SMA(20)).seed(history['close'][:20])
+    previous = (averages['short'].value, averages['long'].value)
+    live_index = None
+    for index in range(20, len(history)):
+        averages.on_bar(history['close'][index])
+        current = (averages['short'].value, averages['long'].value)
+        if crossed_above(*previous, *current):
+            live_index = index
+            break
+        previous = current
+
+    result = Backtester().run(CROSSOVER, history)
+
+    assert live_index is not None
+    assert result['fill_time'] == history['time_key'][live_index]
+    assert result['fill_price'] == history['close'][live_index]
+
+
+def test_unknown_strategy_type_is_rejected():
+    with pytest.raises(ValueError):
+        Backtester().run(dict(BREAKOUT, type='Nope'), bars([9], [10], [9]))
+
+
+def test_sweep_matches_single_runs_in_a_process_pool(monkeypatch):
+    monkeypatch.setattr(backtest_module, 'MIN_PARALLEL_RUNS', 0)
+    history = {'US.A': synthetic_bars(200, seed=1), 'US.B': synthetic_bars(200, seed=2)}
+    grid = {'short_ma': [3, 5, 10], 'long_ma': [20, 30]}
+
+    results = Backtester(processes=2).sweep(CROSSOVER, grid, history, chunk_size=2)
+
+    assert len(results) == 12
+    for row in results.itertuples():
+        single = Backtester().run(dict(CROSSOVER, short_ma=row.short_ma, long_ma=row.long_ma),
+                                  history[row.symbol])
+        assert row.filled == single['filled']
+        assert row.pnl == pytest.approx(single['pnl'])
+        assert row.max_drawdown == pytest.approx(single['max_drawdown'])
+
+
+def test_parameter_grid_and_load_bars():
+    assert parameter_grid({'a': [1, 2], 'b': [3]}) == [{'a': 1, 'b': 3}, {'a': 2, 'b': 3}]
+    api = Mock(spec=MooMooAPI)
+    api.get_historical_k_lines.side_effect = lambda symbol, num: synthetic_bars(num) if symbol == 'US.A' else None
+
+    assert list(Backtester(api).load_bars(['US.A', 'US.B'], 50)) == ['US.A']
@@ -0,0 +1,51 @@
+import pytest
+from src.benchmarks import cases
+from src.benchmarks.harness import (
+    HIGHER, LOWER, BENCHMARKS, compare, load_results, metric, percentile,
+    register_benchmark, run_benchmarks, save_results,
+)
+
+
+def report(**metrics):
+    return {'meta': {}, 'results': {'bench': metrics}}
+
+
+def test_compare_flags_regressions_in_the_worse_direction():
+    baseline = report(rate=metric(100, 'calls/s', HIGHER), latency=metric(10, 'ms', LOWER),
+                      dropped=metric(1, 'ms', LOWER))
+    current = report(rate=metric(80, 'calls/s', HIGHER), latency=metric(9, 'ms', LOWER),
+                     added=metric(1, 'ms', LOWER))
+
+    rows = {row['name']: row for row in compare(baseline, current, tolerance=0.1)}
+
+    assert set(rows) == {'bench.rate', 'bench.latency'}
+    assert rows['bench.rate']['change'] == pytest.approx(-0.2)
+    assert rows['bench.rate']['regressed']
+    assert rows['bench.latency']['change'] == pytest.approx(0.1)
+    assert not rows['bench.latency']['regressed']
+
+
+def test_percentile_uses_nearest_rank():
+    samples = list(range(1, 101))
+    assert (percentile(samples, 50), percentile(samples, 95), percentile(samples, 100)) == (50, 95, 100)
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_results_round_trip_through_json(tmp_path):
+    register_benchmark('constant')(lambda quick: {'value': metric(2 if quick else 1, 'x')})
+    try:
+        results = run_benchmarks(['constant'], quick=True)
+    finally:
+        BENCHMARKS.pop('constant')
+    save_results(results, tmp_path / 'out' / 'run.json')
+
+    loaded = load_results(tmp_path / 'out' / 'run.json')
+    assert loaded['results'] == {'constant': {'value': {'value': 2.0, 'unit': 'x', 'better': HIGHER}}}
+    assert loaded['meta']['quick'] is True
+
+
+@pytest.mark.parametrize('bench', [cases.bench_quotes, cases.bench_tick_to_order])
+def test_benchmarks_run_against_the_simulator(bench):
+    results = bench(True)
+    assert results
+    assert all(value['value'] > 0 for value in results.values())
@@ -0,0 +1,64 @@
+import pytest
+from src.api.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+    cache.set('a', 1)
+
+    clock.now = 5
+    assert cache.get('a') == 1
+    clock.now = 5.1
+    assert cache.get('a') is None
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 0}
+
+
+def test_least_recently_used_is_evicted():
+    cache = TTLCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert 'a' in cache and 'c' in cache
+    assert 'b' not in cache
+    assert cache.stats()['evictions'] == 1
+
+
+def test_get_many_and_invalidate():
+    cache = TTLCache()
+    cache.set_many({'a': 1, 'b': False})
+
+    found, missing = cache.get_many(['a', 'b', 'c'])
+    assert found == {'a': 1, 'b': False}
+    assert missing == ['c']
+
+    cache.invalidate(['a'])
+    assert 'a' not in cache and 'b' in cache
+    cache.invalidate()
+    assert len(cache) == 0
+
+
+def test_rejects_non_positive_maxsize():
+    with pytest.raises(ValueError):
+        TTLCache(maxsize=0)
+
+
+def test_per_entry_ttl_overrides_default():
+    clock = FakeClock()
+    cache = TTLCache(ttl=100, clock=clock)
+    cache.set('short', 1, ttl=1)
+    cache.set('long', 2)
+
+    clock.now = 2
+    assert 'short' not in cache
+    assert 'long' in cache
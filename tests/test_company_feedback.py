@@ -1,11 +1,19 @@
+import asyncio
 import unittest
+import pandas as pd
+import pytest
+from unittest.mock import Mock
 from src.api.moomoo_api import MooMooAPI
+from src.api.simulator import SimulatedMarket, SimulatedQuoteContext, SimulatedTradeContext, synthetic_bars
 from src.api.moomoo_openD import MooMooOpenD
 from src.features.company_feedback import CompanyFeedback
 
 class TestCompanyFeedback(unittest.TestCase):
     def setUp(self):
-        self.api = MooMooAPI(api_key="test_api_key")
+        market = SimulatedMarket()
+        self.api = MooMooAPI(api_key="test_api_key",
+                             quote_ctx=SimulatedQuoteContext(market),
+                             trade_ctx=SimulatedTradeContext(market))
         self.stream = MooMooOpenD(stream_url="wss://test_stream_url")
         self.feedback = CompanyFeedback(self.api, self.stream)
 
@@ -46,5 +54,63 @@ class TestCompanyFeedback(unittest.TestCase):
         result = self.feedback.analyze_stock("AAPL")
         self.assertEqual(result, "Hold")
 
+
+@pytest.fixture
+def kline_api():
+    kline_api = Mock(spec=MooMooAPI)
+    kline_api.get_historical_k_lines.return_value = pd.DataFrame({
+        'time_key': ['2026-10-14 00:00:00', '2026-10-15 00:00:00', '2026-10-16 00:00:00'],
+        'close': [10.0, 11.0, 12.0],
+    })
+    return kline_api
+
+
+def test_moving_average_is_seeded_once_and_fed_by_quotes(kline_api):
+    feedback = CompanyFeedback(kline_api, Mock())
+
+    assert feedback.calculate_moving_average('US.AAPL', 3) == pytest.approx(11.0)
+    feedback.update_moving_averages('US.AAPL', {'last_price': 15.0, 'update_time': '2026-10-16 15:00:00'})
+    assert feedback.calculate_moving_average('US.AAPL', 3) == pytest.approx(12.0)
+    feedback.update_moving_averages('US.AAPL', {'last_price': 18.0, 'update_time': '2026-10-19 10:00:00'})
+    assert feedback.calculate_moving_average('US.AAPL', 3) == pytest.approx((11.0 + 15.0 + 18.0) / 3)
+
+    kline_api.get_historical_k_lines.assert_called_once_with('US.AAPL', 3)
+
+
+def test_moving_average_needs_a_full_window(kline_api):
+    feedback = CompanyFeedback(kline_api, Mock())
+
+    assert feedback.calculate_moving_average('US.AAPL', 20) == 0
+
+
 if __name__ == '__main__':
     unittest.main()
+
+
+def test_analyze_stocks_async_returns_recommendation_per_symbol(kline_api):
+    kline_api.get_stock_quote.side_effect = lambda symbol: {'current_price': 20.0} if symbol == 'US.AAPL' else None
+    feedback = CompanyFeedback(kline_api, Mock())
+    feedback.analyze_news_sentiment = lambda symbol: "Positive"
+
+    result = asyncio.run(feedback.analyze_stocks_async(['US.AAPL', 'US.NONE', 'US.AAPL']))
+    feedback.async_api.close()
+
+    assert result == {'US.AAPL': 'Buy', 'US.NONE': 'Hold'}
+
+
+def test_analyze_stocks_streams_recommendations_with_batched_quotes(tmp_path):
+    market = SimulatedMarket()
+    for i, code in enumerate(['US.A', 'US.B', 'US.C']):
+        market.add_bars(code, synthetic_bars(30, end='2026-10-16', seed=i))
+    market.tick('US.A', 1000.0, 1, '2026-10-19 10:00:00')
+    market.tick('US.B', 1.0, 1, '2026-10-19 10:00:00')
+    news = {'US.A': [{'title': 'Bullish call'}], 'US.B': [{'title': 'Bearish call'}]}
+    api = MooMooAPI(kline_dir=tmp_path, quote_ctx=SimulatedQuoteContext(market),
+                    trade_ctx=SimulatedTradeContext(market), news_source=lambda symbol: news.get(symbol))
+    feedback = CompanyFeedback(api, Mock())
+
+    result = dict(feedback.analyze_stocks(['US.A', 'US.B', 'US.C', 'US.NONE', 'US.A']))
+    api.cleanup()
+
+    assert result == {'US.A': 'Buy', 'US.B': 'Sell', 'US.C': 'Hold', 'US.NONE': 'Hold'}
+    assert market.request_counts['get_market_snapshot'] == 1
@@ -0,0 +1,90 @@
+import random
+import pytest
+from src.utils.indicators import (
+    Indicator, SMA, EMA, RollingHigh, RollingLow, RSI, MACD, IndicatorSet, crossed_above
+)
+
+
+@pytest.fixture
+def prices():
+    rng = random.Random(7)
+    values, price = [], 100.0
+    for _ in range(200):
+        price += rng.uniform(-2, 2)
+        values.append(price)
+    return values
+
+
+def naive_ema(values, period):
+    ema = sum(values[:period]) / period
+    for value in values[period:]:
+        ema += 2 / (period + 1) * (value - ema)
+    return ema
+
+
+def test_sma_matches_naive_average(prices):
+    sma = SMA(20).seed(prices)
+    assert sma.value == pytest.approx(sum(prices[-20:]) / 20)
+    assert SMA(20).seed(prices[:19]).value is None
+
+
+def test_ema_matches_naive(prices):
+    assert EMA(12).seed(prices).value == pytest.approx(naive_ema(prices, 12))
+
+
+def test_rolling_extremes(prices):
+    high, low = RollingHigh(10).seed(prices), RollingLow(10).seed(prices)
+    assert high.value == max(prices[-10:])
+    assert low.value == min(prices[-10:])
+
+
+@pytest.mark.parametrize('indicator_cls', [
+    lambda: SMA(5), lambda: EMA(5), lambda: RollingHigh(5), lambda: RollingLow(5),
+    lambda: RSI(5), lambda: MACD(3, 6, 4),
+])
+def test_amend_equals_updating_with_final_value(indicator_cls, prices):
+    amended = indicator_cls().seed(prices[:-1])
+    amended.update(prices[-1] + 50)
+    amended.amend(prices[-1] - 50)
+    amended.amend(prices[-1])
+    assert amended.value == pytest.approx(indicator_cls().seed(prices).value)
+
+
+def test_rsi_bounds():
+    assert RSI(3).seed([1, 2, 3, 4]).value == 100.0
+    assert RSI(3).seed([4, 3, 2, 1]).value == 0.0
+    assert RSI(3).seed([1, 2, 3]).value is None
+
+
+def test_macd_line_is_ema_difference(prices):
+    macd, signal, histogram = MACD().seed(prices).value
+    assert macd == pytest.approx(naive_ema(prices, 12) - naive_ema(prices, 26))
+    assert histogram == pytest.approx(macd - signal)
+
+
+def test_indicator_set_crossover():
+    averages = IndicatorSet(short=SMA(2), long=SMA(4)).seed([10, 10, 10, 10])
+    before = (averages['short'].value, averages['long'].value)
+    averages.on_tick(14)
+
+    assert averages.values() == {'short': 12.0, 'long': 11.0}
+    assert crossed_above(*before, averages['short'].value, averages['long'].value)
+    assert not crossed_above(None, 1, 2, 1)
+
+
+def test_rolling_extremes_track_every_window(prices):
+    high, low = RollingHigh(7), RollingLow(7)
+    for end, price in enumerate(prices, start=1):
+        high.update(price)
+        low.update(price)
+        assert high.value == max(prices[max(0, end - 7):end])
+        assert low.value == min(prices[max(0, end - 7):end])
+
+
+def test_incomplete_indicator_cannot_be_created():
+    class Partial(Indicator):
+        def update(self, value):
+            pass
+
+    with pytest.raises(TypeError):
+        Partial()
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+from moomoo import RET_OK, RET_ERROR, KLType
+from src.api.kline_store import KLineStore, BAR_DTYPE, frame_to_bars, bars_to_frame
+
+
+def kline_frame(days, closes):
+    return pd.DataFrame({
+        'time_key': [f'2026-10-{day:02d} 00:00:00' for day in days],
+        'open': closes, 'high': closes, 'low': closes, 'close': closes,
+        'volume': [100] * len(days), 'turnover': [1000.0] * len(days),
+    })
+
+
+@pytest.fixture
+def quote_ctx():
+    return Mock()
+
+
+@pytest.fixture
+def store(quote_ctx, tmp_path):
+    return KLineStore(quote_ctx, tmp_path, sync_interval=0)
+
+
+def test_sync_pages_then_only_fetches_the_tail(store, quote_ctx):
+    quote_ctx.request_history_kline.side_effect = [
+        (RET_OK, kline_frame([12, 13], [1.0, 2.0]), 'page-2'),
+        (RET_OK, kline_frame([14], [3.0]), None),
+        (RET_OK, kline_frame([14, 15], [3.5, 4.0]), None),
+    ]
+
+    assert store.sync('US.AAPL') == 3
+    assert store.sync('US.AAPL') == 2
+
+    bars = store.read('US.AAPL')
+    assert list(bars['close']) == [1.0, 2.0, 3.5, 4.0]
+    assert quote_ctx.request_history_kline.call_args.kwargs['start'] == '2026-10-14'
+
+
+def test_reads_are_memory_mapped(store):
+    store.append('US.AAPL', frame_to_bars(kline_frame([12, 13], [1.0, 2.0])))
+
+    bars = store.read('US.AAPL')
+    assert isinstance(bars, np.memmap)
+    assert bars.dtype == BAR_DTYPE
+    assert not bars.flags.writeable
+
+
+def test_torn_trailing_record_is_ignored_and_repaired(store):
+    store.append('US.AAPL', frame_to_bars(kline_frame([12], [1.0])))
+    with open(store.path('US.AAPL'), 'ab') as f:
+        f.write(b'\x00' * 5)
+
+    assert len(store.read('US.AAPL')) == 1
+    store.append('US.AAPL', frame_to_bars(kline_frame([13], [2.0])))
+    assert list(store.read('US.AAPL')['close']) == [1.0, 2.0]
+
+
+def test_tail_and_frame_round_trip(store, quote_ctx):
+    quote_ctx.request_history_kline.return_value = (RET_OK, kline_frame([12, 13, 14], [1.0, 2.0, 3.0]), None)
+
+    frame = bars_to_frame(store.tail('US.AAPL', 2, KLType.K_DAY))
+
+    assert list(frame['time_key']) == ['2026-10-13 00:00:00', '2026-10-14 00:00:00']
+    assert list(frame['close']) == [2.0, 3.0]
+
+
+def test_sync_failure_returns_none(store, quote_ctx):
+    quote_ctx.request_history_kline.return_value = (RET_ERROR, 'frequency limit', None)
+
+    assert store.sync('US.AAPL') is None
+    assert len(store.read('US.AAPL')) == 0
@@ -0,0 +1,63 @@
+import json
+import logging
+import pytest
+from src.utils.logger import RateLimitFilter, _QueueHandler, start_logging, stop_logging
+
+
+def _record(msg, *args, level=logging.DEBUG, name='MooMooAPI'):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield tmp_path / 'app.log'
+    stop_logging()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def test_records_are_written_by_the_listener_as_json_lines(pipeline):
+    start_logging(log_file=str(pipeline), json_format=True)
+    logger = logging.getLogger('MooMooAPI')
+    logger.debug("Got snapshots for %d of %d codes", 3, 4)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Error getting quotes")
+    stop_logging()
+
+    entries = [json.loads(line) for line in pipeline.read_text().splitlines()]
+    assert entries[0]['message'] == "Got snapshots for 3 of 4 codes"
+    assert entries[0]['logger'] == 'MooMooAPI'
+    assert entries[1]['level'] == 'ERROR'
+    assert 'ValueError: boom' in entries[1]['exc_info']
+
+
+def test_queue_handler_merges_arguments_before_enqueueing():
+    codes = ['US.AAPL']
+    record = _QueueHandler(None).prepare(_record("Codes %s", codes))
+    codes.append('US.MSFT')
+    assert record.getMessage() == "Codes ['US.AAPL']"
+    assert record.args is None
+
+
+def test_rate_limit_drops_records_per_template_and_counts_them():
+    now = [0.0]
+    rate_filter = RateLimitFilter(rate=1, burst=2, clock=lambda: now[0])
+
+    passed = [rate_filter.filter(_record("Quote %s", i)) for i in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert rate_filter.filter(_record("Other template"))
+
+    now[0] = 1.0
+    record = _record("Quote %s", 5)
+    assert rate_filter.filter(record)
+    assert record.suppressed == 3
+
+
+def test_rate_limit_never_drops_warnings():
+    rate_filter = RateLimitFilter(rate=1, burst=1, clock=lambda: 0.0)
+    assert rate_filter.filter(_record("Retrying %s", 1))
+    assert all(rate_filter.filter(_record("Retrying %s", 1, level=logging.WARNING)) for _ in range(10))
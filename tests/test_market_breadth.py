@@ -0,0 +1,68 @@
+import pytest
+from unittest.mock import Mock
+from src.api.moomoo_api import MooMooAPI
+from src.api.simulator import SimulatedMarket, SimulatedQuoteContext, SimulatedTradeContext
+from src.features.market_breadth import MarketBreadth
+from src.features.todays_sentiment import TodaysSentiment
+
+
+@pytest.fixture
+def market():
+    market = SimulatedMarket()
+    market.add_stock('US.A', 10.0, highest52weeks_price=12.0, lowest52weeks_price=8.0)
+    market.add_stock('US.B', 20.0, highest52weeks_price=30.0, lowest52weeks_price=19.0)
+    market.add_stock('US.C', 30.0)
+    return market
+
+
+@pytest.fixture
+def api(market, tmp_path):
+    api = MooMooAPI(kline_dir=tmp_path, quote_ctx=SimulatedQuoteContext(market),
+                    trade_ctx=SimulatedTradeContext(market))
+    yield api
+    api.cleanup()
+
+
+def test_breadth_follows_pushed_quotes(market, api):
+    breadth = MarketBreadth(api, ['US.A', 'US.B', 'US.C'])
+    assert breadth.start()
+    assert breadth.snapshot()['unchanged'] == 3
+
+    market.tick('US.A', 12.5, 100)
+    market.tick('US.B', 18.0, 100)
+    snapshot = breadth.snapshot()
+    assert (snapshot['advancing'], snapshot['declining'], snapshot['unchanged']) == (1, 1, 1)
+    assert (snapshot['new_highs'], snapshot['new_lows']) == (1, 1)
+    # 100 * 12.5 turnover at +25%, 100 * 18 turnover at -10%
+    assert snapshot['volume_weighted_change'] == pytest.approx((1250 * 25 - 1800 * 10) / 3050)
+
+    # A later push replaces the code's contribution rather than adding to it
+    market.tick('US.A', 9.0, 100)
+    snapshot = breadth.snapshot()
+    assert (snapshot['advancing'], snapshot['declining'], snapshot['new_highs']) == (0, 2, 0)
+    assert snapshot['tracked'] == 3
+
+    breadth.stop()
+    market.tick('US.C', 40.0, 100)
+    assert breadth.snapshot()['advancing'] == 0
+
+
+def test_market_data_sentiment_reads_breadth(market, api):
+    breadth = MarketBreadth(api, ['US.A', 'US.B', 'US.C'])
+    breadth.start()
+    sentiment = TodaysSentiment(api, Mock(), breadth=breadth)
+    assert sentiment.analyze_market_data() == "Neutral"
+
+    market.tick('US.A', 11.0, 100)
+    market.tick('US.C', 31.0, 100)
+    assert sentiment.analyze_market_data() == "Positive"
+    assert TodaysSentiment(api, Mock()).analyze_market_data() == "Neutral"
+
+
+def test_refresh_failure_does_not_subscribe():
+    api = Mock(spec=MooMooAPI)
+    api.get_market_snapshot.return_value = None
+    api.subscriptions = Mock()
+
+    assert not MarketBreadth(api, ['US.A']).start()
+    api.subscriptions.subscribe.assert_not_called()
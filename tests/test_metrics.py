@@ -0,0 +1,104 @@
+import asyncio
+import json
+import urllib.request
+import pytest
+from src.api.scheduler import RequestScheduler
+from src.utils.metrics import JsonDumper, Metrics, MetricsServer, shared_metrics, traced
+
+
+def _endpoint(metrics, endpoint, feature=''):
+    rows = [row for row in metrics.snapshot()['endpoints']
+            if row['endpoint'] == endpoint and row['feature'] == feature]
+    return rows[0] if rows else None
+
+
+def test_scheduler_records_latency_and_errors_by_return_code():
+    metrics = Metrics()
+    scheduler = RequestScheduler({}, metrics=metrics)
+    scheduler.run('get_market_snapshot', lambda: (0, 'data'))
+    scheduler.run('get_market_snapshot', lambda: (-1, 'frequency limit'))
+
+    def fail():
+        raise ConnectionError("disconnected")
+
+    with pytest.raises(ConnectionError):
+        scheduler.run('get_market_snapshot', fail)
+
+    row = _endpoint(metrics, 'get_market_snapshot')
+    assert row['calls'] == 3
+    assert row['errors'] == {'-1': 1, 'exception': 1}
+    assert row['latency']['count'] == 3
+
+
+def test_scheduler_counts_requests_held_back_by_the_rate_limit():
+    metrics = Metrics()
+    scheduler = RequestScheduler({'place_order': (1, 0.05)}, metrics=metrics)
+    scheduler.run('place_order', lambda: (0, None))
+    assert _endpoint(metrics, 'place_order')['throttled'] == 0
+    scheduler.run('place_order', lambda: (0, None))
+    assert _endpoint(metrics, 'place_order')['throttled'] == 1
+
+
+def test_calls_are_attributed_to_the_feature_of_the_enclosing_span():
+    metrics = Metrics(tracing=True)
+    scheduler = RequestScheduler({}, metrics=metrics)
+    with metrics.span('analyze_stock', feature='company_feedback'):
+        with metrics.span('get_stock_quote') as span:
+            scheduler.run('get_market_snapshot', lambda: (0, None))
+            span.failed = True
+    scheduler.run('get_market_snapshot', lambda: (0, None))
+
+    assert _endpoint(metrics, 'get_market_snapshot', 'company_feedback')['calls'] == 1
+    assert _endpoint(metrics, 'get_market_snapshot')['calls'] == 1
+    spans = {row['span']: row for row in metrics.snapshot()['spans']}
+    assert spans['get_stock_quote']['feature'] == 'company_feedback'
+    assert spans['get_stock_quote']['errors'] == {'failed': 1}
+    assert [(t['name'], t['parent']) for t in metrics.traces()] == [
+        ('get_stock_quote', 'analyze_stock'), ('analyze_stock', None)]
+
+
+def test_traced_times_coroutines_until_they_finish():
+    metrics = shared_metrics()
+    metrics.reset()
+
+    @traced('slow_feature', feature='test')
+    async def slow():
+        await asyncio.sleep(0.02)
+        return 'done'
+
+    assert asyncio.run(slow()) == 'done'
+    row = metrics.snapshot()['spans'][0]
+    assert (row['span'], row['feature'], row['calls']) == ('slow_feature', 'test', 1)
+    assert row['latency']['sum'] >= 0.02
+    metrics.reset()
+
+
+def test_prometheus_text_has_cumulative_buckets():
+    metrics = Metrics(buckets=(0.01, 0.1))
+    for seconds in (0.005, 0.05, 0.5):
+        metrics.observe_call('get_market_state', seconds)
+    metrics.observe_call('get_market_state', 0.005, code=-1)
+    text = metrics.to_prometheus()
+    assert 'moomoo_openapi_request_seconds_bucket{endpoint="get_market_state",feature="",le="0.01"} 2' in text
+    assert 'moomoo_openapi_request_seconds_bucket{endpoint="get_market_state",feature="",le="+Inf"} 4' in text
+    assert 'moomoo_openapi_request_seconds_count{endpoint="get_market_state",feature=""} 4' in text
+    assert 'moomoo_openapi_errors_total{endpoint="get_market_state",feature="",code="-1"} 1' in text
+
+
+def test_server_and_json_dump_export_the_snapshot(tmp_path):
+    metrics = Metrics()
+    metrics.observe_call('accinfo_query', 0.01)
+
+    server = MetricsServer(metrics, port=0).start()
+    try:
+        url = f'http://127.0.0.1:{server.port}'
+        with urllib.request.urlopen(url + '/metrics', timeout=5) as response:
+            assert 'endpoint="accinfo_query"' in response.read().decode()
+        with urllib.request.urlopen(url + '/metrics.json', timeout=5) as response:
+            assert json.loads(response.read())['endpoints'][0]['calls'] == 1
+    finally:
+        server.stop()
+
+    dumper = JsonDumper(str(tmp_path / 'metrics.json'), interval=3600, metrics=metrics).start()
+    dumper.stop()
+    assert json.loads((tmp_path / 'metrics.json').read_text())['endpoints'][0]['endpoint'] == 'accinfo_query'
@@ -0,0 +1,131 @@
+import pandas as pd
+import pytest
+from unittest.mock import patch
+from moomoo import RET_OK, RET_ERROR, Market
+from src.api.moomoo_api import MooMooAPI, SNAPSHOT_MAX_CODES, NEGATIVE_CACHE_TTL
+
+
+@pytest.fixture
+def api(tmp_path):
+    with patch('src.api.moomoo_api.OpenQuoteContext') as quote_cls, \
+            patch('src.api.moomoo_api.OpenSecTradeContext'):
+        quote_ctx = quote_cls.return_value
+        quote_ctx.get_market_state.side_effect = lambda codes: (
+            RET_OK, pd.DataFrame({'code': codes, 'market_state': ['MORNING'] * len(codes)}))
+        quote_ctx.get_stock_basicinfo.side_effect = lambda market, stock_type, codes: (
+            RET_OK, pd.DataFrame({'code': [c for c in codes if c != 'US.BOGUS']}))
+        quote_ctx.get_market_snapshot.side_effect = lambda codes: (
+            RET_OK, pd.DataFrame({'code': codes, 'last_price': [float(i) for i in range(len(codes))]}))
+        yield MooMooAPI(kline_dir=tmp_path)
+
+
+def test_get_stock_quotes_batches_requests(api):
+    symbols = [f'US.S{i}' for i in range(SNAPSHOT_MAX_CODES + 10)]
+    quotes = api.get_stock_quotes(symbols)
+
+    assert list(quotes.index) == symbols
+    assert (quotes['market_state'] == 'MORNING').all()
+    assert api.quote_ctx.get_market_snapshot.call_count == 2
+    assert api.quote_ctx.get_market_state.call_count == 2
+    assert max(len(c.args[0]) for c in api.quote_ctx.get_market_snapshot.call_args_list) == SNAPSHOT_MAX_CODES
+
+
+def test_get_stock_quotes_skips_unknown_codes(api):
+    quotes = api.get_stock_quotes(['US.AAPL', 'US.BOGUS', 'HK.00700'])
+
+    assert list(quotes.index) == ['US.AAPL', 'HK.00700']
+    assert api.quote_ctx.get_stock_basicinfo.call_count == 2
+
+
+def test_get_stock_quote_wraps_batch(api):
+    quote = api.get_stock_quote('US.AAPL')
+
+    assert quote['code'] == 'US.AAPL'
+    assert quote['last_price'] == 0.0
+    assert quote['market_state'] == 'MORNING'
+
+
+def test_get_stock_quote_snapshot_failure(api):
+    api.quote_ctx.get_market_snapshot.side_effect = lambda codes: (RET_ERROR, 'unknown stock')
+
+    assert api.get_stock_quote('US.AAPL') is None
+
+
+def test_metadata_is_cached_between_quotes(api):
+    api.get_stock_quote('US.AAPL')
+    api.get_stock_quote('US.AAPL')
+
+    assert api.quote_ctx.get_market_state.call_count == 1
+    assert api.quote_ctx.get_stock_basicinfo.call_count == 1
+    assert api.quote_ctx.get_market_snapshot.call_count == 2
+    assert api.cache_stats()['market_state']['hits'] == 1
+
+
+def test_invalidate_cache_refetches_market_state(api):
+    api.get_stock_quote('US.AAPL')
+    api.invalidate_cache('market_state')
+    api.get_stock_quote('US.AAPL')
+
+    assert api.quote_ctx.get_market_state.call_count == 2
+    assert api.quote_ctx.get_stock_basicinfo.call_count == 1
+
+
+def test_basicinfo_is_queried_per_code_market(api):
+    api.get_stock_quotes(['SH.600519', 'SZ.000001', 'US.AAPL'])
+
+    markets = {c.args[0] for c in api.quote_ctx.get_stock_basicinfo.call_args_list}
+    assert markets == {Market.SH, Market.SZ, Market.US}
+
+
+def test_unknown_codes_expire_quickly(api):
+    api.get_stock_quotes(['US.BOGUS', 'US.AAPL'])
+
+    cache = api.cache['stock_basicinfo']
+    expiries = {key: entry[0] for key, entry in cache._data.items()}
+    assert expiries['US.BOGUS'] < expiries['US.AAPL']
+    assert expiries['US.AAPL'] - expiries['US.BOGUS'] > NEGATIVE_CACHE_TTL
+
+
+def test_get_historical_k_lines_reads_from_local_store(api):
+    api.quote_ctx.request_history_kline.return_value = (RET_OK, pd.DataFrame({
+        'time_key': ['2026-10-14 00:00:00', '2026-10-15 00:00:00', '2026-10-16 00:00:00'],
+        'open': [1.0, 2.0, 3.0], 'high': [1.5, 2.5, 3.5], 'low': [0.5, 1.5, 2.5],
+        'close': [1.0, 2.0, 3.0], 'volume': [10, 20, 30], 'turnover': [10.0, 40.0, 90.0],
+    }), None)
+
+    bars = api.get_historical_k_lines('US.AAPL', 2)
+    again = api.get_historical_k_lines('US.AAPL', 2)
+
+    assert list(bars['close']) == [2.0, 3.0]
+    assert list(again['time_key']) == ['2026-10-15 00:00:00', '2026-10-16 00:00:00']
+    api.quote_ctx.request_history_kline.assert_called_once()
+
+
+def test_get_market_stock_list_merges_listing_and_snapshots(api):
+    listings = {Market.US: ['US.AAPL', 'US.MSFT'], Market.HK: ['HK.00700']}
+    api.quote_ctx.get_stock_basicinfo.side_effect = lambda market, stock_type: (
+        RET_OK, pd.DataFrame({'code': listings[market], 'name': ['n'] * len(listings[market])}))
+
+    stocks = api.get_market_stock_list()
+
+    assert stocks['symbol'].tolist() == ['US.AAPL', 'US.MSFT', 'HK.00700']
+    assert stocks['last_price'].tolist() == [0.0, 1.0, 2.0]
+    assert api.quote_ctx.get_market_snapshot.call_count == 1
+    assert 'US.MSFT' in api.cache['stock_basicinfo']
+
+
+def test_cancel_order_goes_through_scheduler(api):
+    api.trade_ctx.modify_order.return_value = (RET_OK, pd.DataFrame({'order_id': ['42']}))
+
+    assert api.cancel_order('42') == {'order_id': '42'}
+    assert api.scheduler.stats()['modify_order']['requests'] == 1
+
+
+def test_place_order_is_tracked_until_pushed_final(api):
+    api.trade_ctx.place_order.return_value = (RET_OK, pd.DataFrame(
+        {'order_id': ['5'], 'code': ['US.AAPL'], 'order_status': ['SUBMITTING']}))
+
+    api.place_order('US.AAPL', 10.0, 1, 'BUY')
+    assert api.orders.get('5')['order_status'] == 'SUBMITTING'
+    api.orders.on_order_frame(pd.DataFrame({'order_id': ['5'], 'code': ['US.AAPL'], 'order_status': ['FILLED_ALL']}))
+    assert api.orders.open_orders() == []
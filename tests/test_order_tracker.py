@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+from moomoo import OrderStatus, RET_OK
+from src.api.order_tracker import OrderTracker
+
+
+def order(order_id, status, code='US.AAPL', **fields):
+    return dict({'order_id': order_id, 'code': code, 'order_status': status}, **fields)
+
+
+@pytest.fixture
+def tracker():
+    tracker = OrderTracker(Mock())
+    tracker.transitions = []
+    tracker.add_callback(lambda o, old, new: tracker.transitions.append((o['order_id'], old, new)))
+    return tracker
+
+
+def test_handlers_are_registered_with_trade_context(tracker):
+    assert tracker.trade_ctx.set_handler.call_count == 2
+
+
+def test_open_orders_are_indexed_by_id_and_symbol(tracker):
+    tracker.track(order('1', OrderStatus.SUBMITTING))
+    tracker.on_order_frame(pd.DataFrame([order('2', OrderStatus.SUBMITTED, code='US.MSFT')]))
+
+    assert tracker.get('1')['order_status'] == OrderStatus.SUBMITTING
+    assert [o['order_id'] for o in tracker.open_orders('US.MSFT')] == ['2']
+    assert len(tracker.open_orders()) == 2
+
+
+def test_transitions_fire_once_and_final_orders_are_dropped(tracker):
+    tracker.track(order('1', OrderStatus.SUBMITTING))
+    push = pd.DataFrame([order('1', OrderStatus.FILLED_PART, dealt_qty=5)])
+    tracker.on_order_frame(push)
+    tracker.on_order_frame(push)
+    tracker.on_order_frame(pd.DataFrame([order('1', OrderStatus.FILLED_ALL, dealt_qty=10)]))
+    # A late push after the final status is ignored
+    tracker.on_order_frame(pd.DataFrame([order('1', OrderStatus.SUBMITTED)]))
+
+    assert tracker.transitions == [
+        ('1', None, OrderStatus.SUBMITTING),
+        ('1', OrderStatus.SUBMITTING, OrderStatus.FILLED_PART),
+        ('1', OrderStatus.FILLED_PART, OrderStatus.FILLED_ALL),
+    ]
+    assert tracker.open_orders() == []
+    assert tracker.status('1') == OrderStatus.FILLED_ALL
+
+
+def test_response_after_push_keeps_pushed_state(tracker):
+    tracker.on_order_frame(pd.DataFrame([order('1', OrderStatus.SUBMITTED)]))
+    tracker.track(order('1', OrderStatus.SUBMITTING))
+
+    assert tracker.get('1')['order_status'] == OrderStatus.SUBMITTED
+
+
+def test_symbol_callbacks_and_deals(tracker):
+    seen, deals = [], []
+    tracker.add_callback(lambda o, old, new: seen.append(o['order_id']), symbol='US.MSFT')
+    tracker.add_deal_callback(deals.append)
+
+    tracker.on_order_frame(pd.DataFrame([order('1', OrderStatus.SUBMITTED), order('2', OrderStatus.SUBMITTED, code='US.MSFT')]))
+    tracker.on_deal_frame(pd.DataFrame([{'deal_id': 'd1', 'order_id': '2', 'code': 'US.MSFT', 'qty': 1, 'price': 9.0}]))
+
+    assert seen == ['2']
+    assert [deal['deal_id'] for deal in deals] == ['d1']
+
+
+def test_sync_loads_open_orders(tracker):
+    tracker.trade_ctx.order_list_query.return_value = (RET_OK, pd.DataFrame([order('9', OrderStatus.SUBMITTED)]))
+
+    assert tracker.sync()
+    assert tracker.get('9') is not None
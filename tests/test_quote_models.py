@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.api.moomoo_api import MooMooAPI
+from src.api.simulator import SimulatedMarket, SimulatedQuoteContext, SimulatedTradeContext, synthetic_bars
+from src.models.quote import Bar, QuoteBatch
+from src.models.stock import Stock
+
+
+@pytest.fixture
+def quotes():
+    return pd.DataFrame({
+        'last_price': [110.0, 95.0],
+        'prev_close_price': [100.0, 0.0],
+        'volume': [10, 20],
+        'turnover': [1100.0, 1900.0],
+        'update_time': ['2026-10-16 15:59:59', ''],
+    }, index=pd.Index(['US.AAPL', 'HK.00700'], name='code'))
+
+
+def test_quote_batch_converts_columns_and_views_without_copies(quotes):
+    batch = QuoteBatch.from_frame(quotes)
+
+    assert len(batch) == 2 and 'US.AAPL' in batch and 'US.NONE' not in batch
+    assert np.shares_memory(batch.column('last_price'), batch.records)
+    assert batch.change_rates().tolist() == [pytest.approx(10.0), 0.0]
+
+    quote = batch.get('US.AAPL')
+    assert (quote.code, quote.update_time, quote.volume) == ('US.AAPL', '2026-10-16 15:59:59', 10)
+    assert quote.change_rate == pytest.approx(10.0)
+    assert batch.get('HK.00700').update_time == ''
+    assert [q.code for q in batch[batch.column('last_price') > 100]] == ['US.AAPL']
+
+
+def test_records_are_slotted():
+    stock = Stock('US.AAPL', 'Apple', 1.0, 2.0, 3.0, 4.0, 5.0, 'Tech')
+    with pytest.raises(AttributeError):
+        stock.extra = 1
+    assert not hasattr(Bar('2026-01-02 00:00:00', 1, 2, 0.5, 1.5, 10, 15.0), '__dict__')
+
+
+def test_api_serves_batches_and_zero_copy_bar_series(tmp_path):
+    market = SimulatedMarket()
+    market.add_bars('US.AAPL', synthetic_bars(30, end='2026-10-16', seed=1))
+    api = MooMooAPI(kline_dir=tmp_path, quote_ctx=SimulatedQuoteContext(market),
+                    trade_ctx=SimulatedTradeContext(market))
+
+    batch = api.get_quote_batch(['US.AAPL'])
+    series = api.get_bar_series('US.AAPL', 10)
+    api.cleanup()
+
+    assert batch.get('US.AAPL').last_price == pytest.approx(market.history('US.AAPL')['close'].iloc[-1])
+    assert len(series) == 10
+    assert isinstance(series.records, np.memmap)
+    assert series[-1].time_key == '2026-10-16 00:00:00'
+    assert series.tail(3).close.tolist() == series.to_frame()['close'].tail(3).tolist()
@@ -0,0 +1,71 @@
+import threading
+import time
+import pytest
+from src.api.scheduler import RequestScheduler, Priority, TokenBucket
+
+
+def test_token_bucket_refills_over_time():
+    now = [0.0]
+    bucket = TokenBucket(2, 10, clock=lambda: now[0])
+
+    assert bucket.try_take() and bucket.try_take()
+    assert not bucket.try_take()
+    assert bucket.time_until_token() == pytest.approx(5.0)
+    now[0] = 5.0
+    assert bucket.try_take()
+
+
+def test_requests_over_the_limit_are_queued_not_rejected():
+    scheduler = RequestScheduler(rate_limits={'get_market_snapshot': (2, 0.2)})
+    started = time.monotonic()
+
+    results = [scheduler.run('get_market_snapshot', lambda i=i: i) for i in range(4)]
+
+    assert results == [0, 1, 2, 3]
+    # The last two waited for the bucket to refill
+    assert time.monotonic() - started >= 0.15
+    stats = scheduler.stats()['get_market_snapshot']
+    assert stats['requests'] == 4
+    assert stats['queued'] == 0
+    assert stats['max_wait'] > 0
+
+
+def test_trading_takes_the_next_free_slot_before_queued_analytics():
+    scheduler = RequestScheduler(max_in_flight=1)
+    release = threading.Event()
+    order = []
+
+    def hold():
+        release.wait(5)
+
+    blocker = threading.Thread(target=scheduler.run, args=('get_market_snapshot', hold))
+    blocker.start()
+    while not scheduler.stats().get('get_market_snapshot', {}).get('requests'):
+        time.sleep(0.001)
+
+    threads = [threading.Thread(target=scheduler.run, args=('request_history_kline', order.append, 'kline'))]
+    threads[0].start()
+    while scheduler.queue_depth() < 1:
+        time.sleep(0.001)
+    threads.append(threading.Thread(target=scheduler.run, args=('place_order', order.append, 'order')))
+    threads[1].start()
+    while scheduler.queue_depth() < 2:
+        time.sleep(0.001)
+
+    release.set()
+    for thread in [blocker] + threads:
+        thread.join(5)
+
+    assert order == ['order', 'kline']
+
+
+def test_exhausted_endpoint_does_not_block_other_endpoints():
+    scheduler = RequestScheduler(rate_limits={'place_order': (1, 60)}, max_in_flight=2)
+    scheduler.run('place_order', lambda: None)
+    waiting = threading.Thread(target=scheduler.run, args=('place_order', lambda: None), daemon=True)
+    waiting.start()
+    while scheduler.queue_depth() < 1:
+        time.sleep(0.001)
+
+    assert scheduler.run('get_market_state', lambda: 'state', priority=Priority.ANALYTICS) == 'state'
+    assert scheduler.stats()['place_order']['queued'] == 1
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.features.screener import UniverseScreener
+
+
+@pytest.fixture
+def screener():
+    return UniverseScreener([
+        {'symbol': 'A', 'pe_ratio': 10.0, 'revenue_growth': 30.0},
+        {'symbol': 'B', 'pe_ratio': 25.0, 'revenue_growth': 50.0},
+        {'symbol': 'C', 'pe_ratio': -5.0, 'revenue_growth': 40.0},
+        {'symbol': 'D', 'revenue_growth': 10.0},
+    ])
+
+
+def test_minimum_rule_treats_missing_as_zero(screener):
+    assert screener.screen({'pe_ratio': 0})['symbol'].tolist() == ['A', 'B', 'D']
+
+
+def test_range_rule(screener):
+    assert screener.screen({'pe_ratio': (0, 20)})['symbol'].tolist() == ['A', 'D']
+    assert screener.screen({'pe_ratio': (None, 10)})['symbol'].tolist() == ['C', 'D']
+
+
+def test_sort_and_top_n(screener):
+    top = screener.screen({'revenue_growth': 20}, sort_by='revenue_growth', top_n=2)
+    assert top['symbol'].tolist() == ['B', 'C']
+    bottom = screener.screen({}, sort_by='revenue_growth', ascending=True)
+    assert bottom['symbol'].tolist() == ['D', 'A', 'C', 'B']
+
+
+def test_screen_many_shares_predicates(screener):
+    results = screener.screen_many({
+        'growth': {'revenue_growth': 20},
+        'cheap_growth': {'revenue_growth': 20, 'pe_ratio': (0, 20)},
+    })
+    assert results['growth']['symbol'].tolist() == ['A', 'B', 'C']
+    assert results['cheap_growth']['symbol'].tolist() == ['A']
+
+
+def test_accepts_dataframe_and_empty_universe():
+    frame = pd.DataFrame({'symbol': ['X'], 'pe_ratio': ['n/a']}, index=[7])
+    assert UniverseScreener(frame).screen({'pe_ratio': (None, 1)})['symbol'].tolist() == ['X']
+    assert UniverseScreener([]).screen({'pe_ratio': 1}, sort_by='pe_ratio').empty
@@ -0,0 +1,35 @@
+import pytest
+from src.utils.sentiment import SentimentScorer, classify
+
+
+@pytest.fixture
+def scorer():
+    return SentimentScorer({'bullish': 1.0, 'bearish': -1.0, 'price target raised': 1.5, 'miss': -0.5})
+
+
+def test_terms_and_phrases_match_case_insensitively_on_word_boundaries(scorer):
+    assert scorer.score_text('BULLISH on chips; Price  Target Raised') == pytest.approx(2.5)
+    assert scorer.score_text('Mission accomplished, not a miss') == pytest.approx(-0.5)
+    assert scorer.score_text('') == 0.0
+
+
+def test_body_counts_half_and_scores_are_cached_by_id(scorer):
+    article = {'id': 7, 'title': 'Bullish', 'body': 'bearish bearish'}
+    assert scorer.score_article(article) == pytest.approx(0.0)
+
+    # A cached article is not rescanned even if its text changed
+    assert scorer.score_articles([dict(article, title='bearish'), {'title': 'bearish'}]) == [0.0, -1.0]
+    assert scorer.cache.stats()['hits'] >= 1
+
+
+def test_sentiment_classifies_the_combined_score(scorer):
+    assert scorer.sentiment([{'title': 'bullish'}, {'title': 'bullish'}, {'title': 'bearish'}]) == "Positive"
+    assert scorer.sentiment([{'title': 'a miss'}]) == "Negative"
+    assert scorer.sentiment([]) == "Neutral"
+    assert classify(0.2, neutral_band=0.5) == "Neutral"
+
+
+def test_default_lexicon_reads_financial_headlines():
+    scorer = SentimentScorer()
+    assert scorer.sentiment([{'title': 'Apple beats estimates and raises guidance'}]) == "Positive"
+    assert scorer.sentiment([{'title': 'Shares plunge after profit warning'}]) == "Negative"
@@ -0,0 +1,112 @@
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+from moomoo import KLType, OrderStatus, RET_OK, RET_ERROR, SubType, TrdSide
+from src.api.moomoo_api import MooMooAPI
+from src.api.simulator import (
+    SimulatedMarket, SimulatedQuoteContext, SimulatedTradeContext, TickReplayer,
+    synthetic_bars, synthetic_ticks,
+)
+from src.features.automated_trading import AutomatedTrading
+
+
+@pytest.fixture
+def market():
+    market = SimulatedMarket()
+    market.add_stock('US.AAPL', 100.0, pe_ratio=25.0)
+    market.add_bars('US.AAPL', synthetic_bars(30, end='2026-10-16', seed=1))
+    return market
+
+
+@pytest.fixture
+def api(market, tmp_path):
+    api = MooMooAPI(kline_dir=tmp_path,
+                    quote_ctx=SimulatedQuoteContext(market),
+                    trade_ctx=SimulatedTradeContext(market))
+    yield api
+    api.cleanup()
+
+
+def test_moomoo_api_runs_against_simulator(api):
+    quote = api.get_stock_quote('US.AAPL')
+    history = api.get_historical_k_lines('US.AAPL', 10)
+
+    assert quote['last_price'] == 100.0
+    assert quote['pe_ratio'] == 25.0
+    assert len(history) == 10
+    assert api.get_stock_quote('US.NOPE') is None
+
+
+def test_rate_limits_are_enforced_and_scalable():
+    now = [0.0]
+    market = SimulatedMarket(rate_limits={'get_market_snapshot': (2, 30)}, clock=lambda: now[0])
+    market.add_stock('US.AAPL', 1.0)
+    quote_ctx = SimulatedQuoteContext(market)
+
+    assert [quote_ctx.get_market_snapshot(['US.AAPL'])[0] for _ in range(3)] == [RET_OK, RET_OK, RET_ERROR]
+    now[0] = 30.0
+    assert quote_ctx.get_market_snapshot(['US.AAPL'])[0] == RET_OK
+    assert market.rejections == {'get_market_snapshot': 1}
+    assert SimulatedMarket(rate_limits={'x': (2, 30)}, rate_scale=10).rate_limits == {'x': (20, 30)}
+
+
+def test_unsubscribe_is_refused_within_a_minute():
+    now = [0.0]
+    quote_ctx = SimulatedQuoteContext(SimulatedMarket(clock=lambda: now[0]))
+
+    quote_ctx.subscribe(['US.AAPL'], [SubType.QUOTE])
+    assert quote_ctx.unsubscribe(['US.AAPL'], [SubType.QUOTE])[0] == RET_ERROR
+    now[0] = 60.0
+    assert quote_ctx.unsubscribe(['US.AAPL'], [SubType.QUOTE])[0] == RET_OK
+
+
+def test_history_pages_and_includes_forming_bar(market):
+    quote_ctx = SimulatedQuoteContext(market)
+    market.tick('US.AAPL', 101.0, 5, '2026-10-19 10:00:00')
+
+    ret, first, key = quote_ctx.request_history_kline('US.AAPL', ktype=KLType.K_DAY, max_count=20)
+    ret, rest, key2 = quote_ctx.request_history_kline('US.AAPL', max_count=20, page_req_key=key)
+
+    assert (len(first), len(rest), key2) == (20, 11, None)
+    assert rest.iloc[-1]['time_key'] == '2026-10-19 00:00:00'
+    assert rest.iloc[-1]['close'] == 101.0
+
+
+def test_limit_orders_fill_when_price_crosses(market):
+    trade_ctx = SimulatedTradeContext(market)
+    ret, order = trade_ctx.place_order(99.0, 10, 'US.AAPL', TrdSide.BUY)
+    order_id = order['order_id'][0]
+
+    assert market.orders[order_id]['order_status'] == OrderStatus.SUBMITTED
+    market.tick('US.AAPL', 98.5)
+    assert market.orders[order_id]['order_status'] == OrderStatus.FILLED_ALL
+    assert market.positions == {'US.AAPL': 10}
+    assert trade_ctx.position_list_query()[1]['qty'].tolist() == [10]
+
+
+def test_breakout_strategy_trades_through_replayed_ticks(api, market):
+    trading = AutomatedTrading(api, Mock())
+    high = market.history('US.AAPL')['high'].tail(5).max()
+    trading.execute_strategy({'name': 'b', 'type': 'BreakoutBuy', 'symbol': 'US.AAPL',
+                              'n_days': 5, 'quantity': 10})
+
+    ticks = pd.DataFrame({'time': ['2026-10-19 09:30:00', '2026-10-19 09:30:01'],
+                          'code': ['US.AAPL', 'US.AAPL'], 'price': [high - 1, high + 1]})
+    TickReplayer(market, ticks, speed=None).run()
+    trading.runtime.wait_idle(5)
+    trading.shutdown()
+
+    assert len(trading.trade_records) == 1
+    assert market.positions == {'US.AAPL': 10}
+    assert api.orders.open_orders() == []
+
+
+def test_synthetic_ticks_replay_in_order():
+    ticks = synthetic_ticks(['US.A', 'US.B'], 50, interval=0.001, seed=3)
+    market = SimulatedMarket()
+    replayer = TickReplayer(market, ticks, speed=10)
+    replayer.start()
+    replayer.join(5)
+
+    assert replayer.replayed == 100
+    assert market.history('US.B')['close'].iloc[-1] == ticks['price'].iloc[-1]
@@ -0,0 +1,52 @@
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from src.api.singleflight import SingleFlight
+
+
+def test_concurrent_calls_with_the_same_key_share_one_execution():
+    group = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fetch(key):
+        calls.append(key)
+        release.wait(5)
+        return {'key': key}
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(group.do, 'US.AAPL', fetch, 'US.AAPL') for _ in range(3)]
+        other = pool.submit(group.do, 'US.MSFT', fetch, 'US.MSFT')
+        while group.stats()['shared'] < 2:
+            pass
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert calls.count('US.AAPL') == 1
+    assert other.result() == {'key': 'US.MSFT'}
+    assert all(result is results[0] for result in results)
+    assert group.stats() == {'calls': 2, 'shared': 2}
+    assert group.in_flight() == 0
+
+
+def test_errors_reach_every_waiter_and_the_key_is_released():
+    group = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("OpenD down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        leader = pool.submit(group.do, 'k', fail)
+        started.wait(5)
+        follower = pool.submit(group.do, 'k', fail)
+        while group.stats()['shared'] < 1:
+            pass
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+    assert group.do('k', lambda: 42) == 42
@@ -1,15 +1,61 @@
 import unittest
 from unittest.mock import MagicMock
 from src.api.moomoo_api import MooMooAPI
+from src.api.simulator import SimulatedMarket, SimulatedQuoteContext, SimulatedTradeContext
 from src.features.stock_recommendation import StockRecommendation
 
 class TestStockRecommendation(unittest.TestCase):
     def test_recommend_stocks(self):
-        mock_api = MooMooAPI(api_key="test_key")
-        sr = StockRecommendation(api=mock_api, preference="Growth")
-        stocks = sr.recommend_stocks()
+        market = SimulatedMarket()
+        market.add_stock('US.GROW', 10.0, revenue_growth=30, profit_growth=25)
+        market.add_stock('US.SLOW', 10.0, revenue_growth=2, profit_growth=1)
+        mock_api = MooMooAPI(api_key="test_key",
+                             quote_ctx=SimulatedQuoteContext(market),
+                             trade_ctx=SimulatedTradeContext(market))
+        sr = StockRecommendation(mock_api)
+        stocks = sr.recommend_stocks("Growth")
         self.assertIsInstance(stocks, list)
         self.assertGreater(len(stocks), 0)
 
 if __name__ == '__main__':
     unittest.main()
+
+
+from unittest.mock import Mock
+import pytest
+
+UNIVERSE = [
+    {'symbol': 'US.A', 'revenue_growth': 25, 'profit_growth': 30, 'pe_ratio': 15, 'pb_ratio': 2},
+    {'symbol': 'US.B', 'revenue_growth': 40, 'profit_growth': 21, 'pe_ratio': 45, 'pb_ratio': 9},
+    {'symbol': 'HK.00700', 'revenue_growth': 5, 'profit_growth': 5, 'pe_ratio': 12, 'pb_ratio': 1},
+]
+
+
+@pytest.fixture
+def recommender():
+    api = Mock(spec=MooMooAPI)
+    api.get_market_stock_list.return_value = UNIVERSE
+    return StockRecommendation(api)
+
+
+def test_recommend_stocks_ranks_matches(recommender):
+    stocks = recommender.recommend_stocks('Growth', sort_by='revenue_growth', top_n=1)
+    assert [stock['symbol'] for stock in stocks] == ['US.B']
+
+
+def test_recommend_many_loads_universe_once(recommender):
+    result = recommender.recommend_many(['Growth', 'Value'])
+    assert [stock['symbol'] for stock in result['Growth']] == ['US.A', 'US.B']
+    assert [stock['symbol'] for stock in result['Value']] == ['US.A', 'HK.00700']
+    recommender.api.get_market_stock_list.assert_called_once()
+
+
+def test_meets_criteria_matches_screener(recommender):
+    for preference in ('Growth', 'Value'):
+        expected = {s['symbol'] for s in recommender.recommend_stocks(preference)}
+        assert {s['symbol'] for s in UNIVERSE if recommender.meets_criteria(s, preference)} == expected
+
+
+def test_recommend_stocks_without_universe(recommender):
+    recommender.api.get_market_stock_list.return_value = None
+    assert recommender.recommend_stocks() == []
@@ -0,0 +1,176 @@
+import itertools
+import threading
+import pandas as pd
+import pytest
+from moomoo import OrderStatus, RET_OK, SubType, TrdSide
+from unittest.mock import Mock
+from src.api.moomoo_api import MooMooAPI
+from src.api.order_tracker import OrderTracker
+from src.api.subscription import SubscriptionManager, UNSUBSCRIBE_MIN_AGE
+from src.features.strategies import Strategy, STRATEGIES, register_strategy, create_strategy
+from src.features.strategy_runtime import StrategyRuntime, RUNNING, PAUSED, FINISHED, STOPPED
+
+
+class Recorder(Strategy):
+    """Records every price it sees and buys when told to"""
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.prices = []
+        self.order_updates = []
+        self.gate = config.get('gate')
+
+    def on_price(self, symbol, price, row):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.prices.append(price)
+        if price >= self.config.get('buy_at', float('inf')):
+            self.buy(price, 1)
+            if self.config.get('finish', True):
+                self.finish()
+
+    def on_order(self, order, old_status, new_status):
+        self.order_updates.append((order['order_id'], old_status, new_status))
+
+
+@pytest.fixture
+def api():
+    api = Mock(spec=MooMooAPI)
+    quote_ctx = Mock()
+    quote_ctx.subscribe.return_value = (RET_OK, None)
+    quote_ctx.unsubscribe.return_value = (RET_OK, None)
+    ticks = itertools.count(0, UNSUBSCRIBE_MIN_AGE)
+    api.subscriptions = SubscriptionManager(quote_ctx, quota=10, clock=lambda: next(ticks))
+    api.orders = OrderTracker(Mock())
+
+    def place_order(code, price, qty, trd_side):
+        # Like MooMooAPI.place_order, start tracking the placed order
+        response = {'order_id': '1', 'code': code, 'order_status': OrderStatus.SUBMITTING}
+        api.orders.track(response)
+        return response
+
+    api.place_order.side_effect = place_order
+    return api
+
+
+@pytest.fixture
+def runtime(api):
+    orders = []
+    runtime = StrategyRuntime(api, workers=2, on_order=lambda strategy, resp: orders.append((strategy.name, resp)))
+    runtime.orders = orders
+    yield runtime
+    runtime.shutdown()
+
+
+def push(api, symbol, price):
+    api.subscriptions.dispatch_frame(SubType.QUOTE, pd.DataFrame({'code': [symbol], 'last_price': [price]}))
+
+
+def test_strategies_on_one_symbol_share_a_subscription(api, runtime):
+    first, second = Recorder({'name': 'a', 'symbol': 'US.AAPL'}), Recorder({'name': 'b', 'symbol': 'US.AAPL'})
+    other = Recorder({'name': 'c', 'symbol': 'US.MSFT'})
+    for strategy in (first, second, other):
+        assert runtime.start(strategy)
+
+    push(api, 'US.AAPL', 1.0)
+    runtime.wait_idle(5)
+
+    assert api.subscriptions.used == 2
+    assert first.prices == second.prices == [1.0]
+    assert other.prices == []
+
+
+def test_pushes_are_conflated_while_a_symbol_is_busy(api, runtime):
+    gate = threading.Event()
+    strategy = Recorder({'name': 'a', 'symbol': 'US.AAPL', 'gate': gate})
+    runtime.start(strategy)
+
+    for price in (1.0, 2.0, 3.0, 4.0):
+        push(api, 'US.AAPL', price)
+    gate.set()
+    runtime.wait_idle(5)
+
+    assert strategy.prices[0] == 1.0
+    assert strategy.prices[-1] == 4.0
+    assert len(strategy.prices) <= 2
+
+
+def test_pause_resume_and_stop(api, runtime):
+    strategy = Recorder({'name': 'a', 'symbol': 'US.AAPL'})
+    runtime.start(strategy)
+
+    runtime.pause('a')
+    push(api, 'US.AAPL', 1.0)
+    runtime.wait_idle(5)
+    assert runtime.state('a') == PAUSED
+    runtime.resume('a')
+    push(api, 'US.AAPL', 2.0)
+    runtime.wait_idle(5)
+    runtime.stop('a')
+
+    assert strategy.prices == [2.0]
+    assert runtime.state('a') == STOPPED
+    assert api.subscriptions.used == 0
+
+
+def test_finished_strategy_orders_once_and_releases_symbol(api, runtime):
+    runtime.start(Recorder({'name': 'a', 'symbol': 'US.AAPL', 'buy_at': 2.0}))
+
+    for price in (1.0, 2.0, 3.0):
+        push(api, 'US.AAPL', price)
+        runtime.wait_idle(5)
+    runtime.shutdown()
+
+    api.place_order.assert_called_once_with('US.AAPL', 2.0, 1, TrdSide.BUY)
+    assert [(name, resp['order_id']) for name, resp in runtime.orders] == [('a', '1')]
+    assert runtime.state('a') == FINISHED
+    assert api.subscriptions.used == 0
+
+
+def test_duplicate_names_are_rejected(runtime):
+    assert runtime.start(Recorder({'name': 'a', 'symbol': 'US.AAPL'}))
+    assert not runtime.start(Recorder({'name': 'a', 'symbol': 'US.MSFT'}))
+
+
+def test_registry_builds_strategies_by_type():
+    register_strategy('Recorder')(Recorder)
+    try:
+        assert isinstance(create_strategy({'name': 'r', 'type': 'Recorder', 'symbol': 'US.AAPL'}), Recorder)
+    finally:
+        STRATEGIES.pop('Recorder')
+
+
+def test_order_updates_reach_the_strategy_that_placed_them(api, runtime):
+    strategy = Recorder({'name': 'a', 'symbol': 'US.AAPL', 'buy_at': 1.0, 'finish': False})
+    bystander = Recorder({'name': 'b', 'symbol': 'US.AAPL'})
+    runtime.start(strategy)
+    runtime.start(bystander)
+
+    push(api, 'US.AAPL', 1.0)
+    runtime.wait_idle(5)
+    runtime._orders.submit(lambda: None).result(5)
+    api.orders.on_order_frame(pd.DataFrame([
+        {'order_id': '1', 'code': 'US.AAPL', 'order_status': OrderStatus.FILLED_ALL}]))
+    runtime.wait_idle(5)
+
+    assert strategy.order_updates == [('1', OrderStatus.SUBMITTING, OrderStatus.FILLED_ALL)]
+    assert bystander.order_updates == []
+
+
+def test_fill_pushed_before_the_order_response_is_delivered(api, runtime):
+    def place_order(*args):
+        # OpenD pushes the fill while place_order is still returning
+        api.orders.on_order_frame(pd.DataFrame([
+            {'order_id': '1', 'code': 'US.AAPL', 'order_status': OrderStatus.FILLED_ALL}]))
+        return {'order_id': '1', 'code': 'US.AAPL', 'order_status': OrderStatus.SUBMITTING}
+
+    api.place_order.side_effect = place_order
+    strategy = Recorder({'name': 'a', 'symbol': 'US.AAPL', 'buy_at': 1.0, 'finish': False})
+    runtime.start(strategy)
+
+    push(api, 'US.AAPL', 1.0)
+    runtime.wait_idle(5)
+    runtime._orders.submit(lambda: None).result(5)
+    runtime.wait_idle(5)
+
+    assert strategy.order_updates == [('1', OrderStatus.SUBMITTING, OrderStatus.FILLED_ALL)]
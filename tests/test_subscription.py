@@ -0,0 +1,92 @@
+import pandas as pd
+import pytest
+from unittest.mock import Mock
+from moomoo import RET_OK, RET_ERROR, SubType
+from src.api.subscription import SubscriptionManager, UNSUBSCRIBE_MIN_AGE
+
+
+@pytest.fixture
+def quote_ctx():
+    ctx = Mock()
+    ctx.subscribe.return_value = (RET_OK, None)
+    ctx.unsubscribe.return_value = (RET_OK, None)
+    ctx.query_subscription.return_value = (RET_OK, {'remain': 3})
+    return ctx
+
+
+def quote_frame(prices):
+    return pd.DataFrame({'code': list(prices), 'last_price': list(prices.values())})
+
+
+def test_updates_fan_out_only_on_price_change(quote_ctx):
+    manager = SubscriptionManager(quote_ctx)
+    first, second, other = Mock(), Mock(), Mock()
+    assert manager.subscribe(['US.AAPL'], first)
+    assert manager.subscribe(['US.AAPL'], second)
+    assert manager.subscribe(['US.MSFT'], other)
+
+    manager.dispatch_frame(SubType.QUOTE, quote_frame({'US.AAPL': 100.0}))
+    manager.dispatch_frame(SubType.QUOTE, quote_frame({'US.AAPL': 100.0}))
+    manager.dispatch_frame(SubType.QUOTE, quote_frame({'US.AAPL': 101.0}))
+
+    assert first.call_count == 2
+    assert second.call_count == 2
+    assert first.call_args.args[:2] == ('US.AAPL', 101.0)
+    other.assert_not_called()
+    assert quote_ctx.subscribe.call_count == 2
+    assert quote_ctx.set_handler.call_count == 1
+
+
+def test_quota_is_respected(quote_ctx):
+    manager = SubscriptionManager(quote_ctx)
+
+    assert manager.subscribe(['US.A', 'US.B'], Mock())
+    assert not manager.subscribe(['US.C', 'US.D'], Mock())
+    assert manager.subscribe(['US.C'], Mock())
+    assert manager.used == 3
+
+
+def test_unsubscribe_keeps_idle_codes_until_released(quote_ctx):
+    clock = Mock(return_value=0.0)
+    manager = SubscriptionManager(quote_ctx, quota=10, clock=clock)
+    callback = Mock()
+    manager.subscribe(['US.AAPL'], callback)
+
+    clock.return_value = UNSUBSCRIBE_MIN_AGE
+    quote_ctx.unsubscribe.return_value = (RET_ERROR, 'subscribed less than one minute')
+    manager.unsubscribe(['US.AAPL'], callback)
+    assert manager.used == 1
+    manager._release_timer.cancel()
+
+    quote_ctx.unsubscribe.return_value = (RET_OK, None)
+    manager.release_idle()
+    assert manager.used == 0
+
+
+def test_callback_errors_do_not_stop_fan_out(quote_ctx):
+    manager = SubscriptionManager(quote_ctx, quota=10)
+    failing, healthy = Mock(side_effect=RuntimeError('boom')), Mock()
+    manager.subscribe(['US.AAPL'], failing)
+    manager.subscribe(['US.AAPL'], healthy)
+
+    manager.dispatch_frame(SubType.QUOTE, quote_frame({'US.AAPL': 1.0}))
+
+    healthy.assert_called_once()
+
+
+def test_idle_codes_are_released_once_old_enough(quote_ctx):
+    clock = Mock(return_value=0.0)
+    manager = SubscriptionManager(quote_ctx, quota=10, clock=clock)
+    callback = Mock()
+    manager.subscribe(['US.AAPL'], callback)
+
+    manager.unsubscribe(['US.AAPL'], callback)
+    quote_ctx.unsubscribe.assert_not_called()
+    assert manager.used == 1
+    assert manager._release_timer is not None
+    manager._release_timer.cancel()
+
+    clock.return_value = UNSUBSCRIBE_MIN_AGE
+    manager.subscribe(['US.MSFT'], Mock())
+    quote_ctx.unsubscribe.assert_called_once_with(['US.AAPL'], [SubType.QUOTE])
+    assert manager.used == 1
@@ -1,14 +1,39 @@
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, Mock
 from src.api.moomoo_api import MooMooAPI
+from src.api.simulator import SimulatedMarket, SimulatedQuoteContext, SimulatedTradeContext
 from src.features.todays_sentiment import TodaysSentiment
 
 class TestTodaysSentiment(unittest.TestCase):
     def test_analyze_sentiment(self):
-        mock_api = MooMooAPI(api_key="test_key")
-        ts = TodaysSentiment(api=mock_api)
-        sentiment = ts.analyze_sentiment()
-        self.assertIn(sentiment, ["Optimistic", "Neutral", "Pessimistic", "Error"])
+        market = SimulatedMarket()
+        market.add_stock('US.AAPL', 100.0, change_rate=0.5)
+        mock_api = MooMooAPI(api_key="test_key",
+                             quote_ctx=SimulatedQuoteContext(market),
+                             trade_ctx=SimulatedTradeContext(market))
+        ts = TodaysSentiment(mock_api, Mock())
+        sentiment = ts.analyze_news_sentiment('US.AAPL')
+        self.assertIn(sentiment, ["Strongly Positive", "Positive", "Neutral", "Negative", "Strongly Negative"])
 
 if __name__ == '__main__':
     unittest.main()
+
+
+import asyncio
+import pandas as pd
+from unittest.mock import Mock
+
+
+def test_analyze_news_sentiment_async_batches_quotes():
+    api = Mock(spec=MooMooAPI)
+    api.get_stock_quotes.return_value = pd.DataFrame(
+        {'change_rate': [2.5, -0.5]}, index=['US.AAPL', 'US.MSFT'])
+    ts = TodaysSentiment(api, Mock())
+
+    result = asyncio.run(ts.analyze_news_sentiment_async(['US.AAPL', 'US.MSFT', 'US.NONE']))
+    ts.async_api.close()
+
+    assert result['US.AAPL'] == "Strongly Positive"
+    assert result['US.MSFT'] == "Negative"
+    assert result['US.NONE'].startswith("Unable to analyze")
+    api.get_stock_quotes.assert_called_once_with(['US.AAPL', 'US.MSFT', 'US.NONE'])